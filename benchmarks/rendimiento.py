@@ -0,0 +1,348 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from services.almacenamiento import TIPOS_ALMACENAMIENTO, crear_almacenamiento
+from services.gestor_notas import GestorNotas
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows no expone getrusage.
+    resource = None
+
+# Orden de ejecución: la restauración necesita el pickle que genera `exportar_pickle`.
+OPERACIONES = (
+    "inicializar",
+    "leer",
+    "listar",
+    "contar",
+    "buscar",
+    "consultar",
+    "editar",
+    "exportar_json",
+    "exportar_pickle",
+    "restaurar_desde_pickle",
+)
+
+# Operaciones que recorren el corpus completo: cada muestra fría usa una instancia nueva.
+OPERACIONES_GLOBALES = (
+    "inicializar",
+    "listar",
+    "contar",
+    "exportar_json",
+    "exportar_pickle",
+    "restaurar_desde_pickle",
+)
+
+SILABAS = ("ka", "lo", "mi", "su", "te", "ra", "no", "pe", "di", "sa", "vu", "re", "ma", "to", "li", "ne")
+
+
+def generar_vocabulario(tamano=2000, semilla=0):
+    """Genera palabras sintéticas deterministas para poblar los cuerpos."""
+    aleatorio = random.Random(semilla)
+    vocabulario = []
+    vistas = set()
+    while len(vocabulario) < tamano:
+        palabra = "".join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(2, 4)))
+        if palabra not in vistas:
+            vistas.add(palabra)
+            vocabulario.append(palabra)
+    return vocabulario
+
+
+def generar_corpus(almacenamiento, notas, tamano_cuerpo=512, semilla=0, tamano_lote=1000):
+    """
+    Escribe `notas` notas sintéticas directamente en el almacenamiento.
+
+    Las palabras siguen una distribución aproximadamente de Zipf, así que
+    hay términos muy frecuentes y otros raros, como en un corpus real.
+    Devuelve el vocabulario utilizado.
+    """
+    aleatorio = random.Random(semilla)
+    vocabulario = generar_vocabulario(semilla=semilla)
+    pesos = [1.0 / (posicion + 1) for posicion in range(len(vocabulario))]
+    acumulados = []
+    total = 0.0
+    for peso in pesos:
+        total += peso
+        acumulados.append(total)
+
+    palabras_por_nota = max(1, tamano_cuerpo // 6)
+    fecha = datetime(2024, 1, 1).strftime("%Y-%m-%d %H:%M:%S")
+    lote = []
+    for numero in range(notas):
+        cuerpo = " ".join(aleatorio.choices(vocabulario, cum_weights=acumulados, k=palabras_por_nota))
+        lote.append((f"nota_{numero:07d}", f"Fecha: {fecha}\n\n{cuerpo[:tamano_cuerpo]}"))
+        if len(lote) >= tamano_lote:
+            almacenamiento.escribir_lote(lote)
+            lote = []
+    if lote:
+        almacenamiento.escribir_lote(lote)
+    return vocabulario
+
+
+def percentil(muestras, porcentaje):
+    """Percentil por rango más cercano sobre una lista de muestras."""
+    if not muestras:
+        return 0.0
+    ordenadas = sorted(muestras)
+    posicion = max(0, min(len(ordenadas) - 1, math.ceil(porcentaje / 100 * len(ordenadas)) - 1))
+    return ordenadas[posicion]
+
+
+def pico_rss_kb():
+    """
+    Pico de memoria residente del proceso en KiB (`None` si no está
+    disponible). `ru_maxrss` nunca baja, así que es el máximo de todo lo
+    ejecutado hasta ahora y no sirve para atribuir memoria a una operación.
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS lo informa en bytes y Linux en KiB.
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def resumir(muestras, notas_por_muestra=1):
+    """Latencias p50/p95/p99 en milisegundos y rendimiento de una serie de muestras."""
+    total = sum(muestras)
+    return {
+        "muestras": len(muestras),
+        "p50_ms": round(percentil(muestras, 50) * 1000, 4),
+        "p95_ms": round(percentil(muestras, 95) * 1000, 4),
+        "p99_ms": round(percentil(muestras, 99) * 1000, 4),
+        "max_ms": round(max(muestras) * 1000, 4) if muestras else 0.0,
+        "operaciones_por_segundo": round(len(muestras) / total, 2) if total else 0.0,
+        "notas_por_segundo": round(len(muestras) * notas_por_muestra / total, 2) if total else 0.0,
+    }
+
+
+class BancoPruebas:
+    """
+    Mide cada operación de `GestorNotas` sobre un corpus ya generado.
+
+    En frío, las operaciones globales usan una instancia recién creada por
+    muestra (catálogo e índice cargados desde disco, caché de lectura vacía) y
+    las operaciones por nota usan entradas distintas que aún no se leyeron. En
+    caliente se repiten las mismas entradas sobre una instancia ya usada. La
+    caché de páginas del sistema operativo no se vacía: eso requiere permisos
+    de administrador y queda fuera del alcance del banco.
+    """
+
+    def __init__(self, carpeta, notas, vocabulario, almacenamiento="texto", repeticiones=20, semilla=0):
+        self.carpeta = carpeta
+        self.notas = notas
+        self.vocabulario = vocabulario
+        self.almacenamiento = almacenamiento
+        self.repeticiones = repeticiones
+        self.aleatorio = random.Random(semilla)
+
+    def _gestor(self):
+        return GestorNotas(carpeta=self.carpeta, almacenamiento=self.almacenamiento)
+
+    def _entradas(self, operacion):
+        """Argumentos de cada muestra de una operación por nota."""
+        if operacion in ("leer", "editar"):
+            indices = self.aleatorio.sample(range(self.notas), min(self.repeticiones, self.notas))
+            return [(f"nota_{indice:07d}",) for indice in indices]
+        if operacion == "buscar":
+            return [(self.aleatorio.choice(self.vocabulario),) for _ in range(self.repeticiones)]
+        if operacion == "consultar":
+            return [
+                (" ".join(self.aleatorio.sample(self.vocabulario[:200], 2)),)
+                for _ in range(self.repeticiones)
+            ]
+        return [()] * self.repeticiones
+
+    def _llamada(self, gestor, operacion):
+        if operacion == "editar":
+            return lambda nombre: gestor.editar(nombre, f"contenido editado {time.perf_counter_ns()}")
+        return getattr(gestor, operacion)
+
+    def medir(self, operacion):
+        """Devuelve el resumen frío y caliente de una operación."""
+        global_ = operacion in OPERACIONES_GLOBALES
+        notas_por_muestra = self.notas if global_ else 1
+        repeticiones_frias = max(1, self.repeticiones // 5) if global_ else self.repeticiones
+
+        frias = []
+        if global_:
+            for _ in range(repeticiones_frias):
+                inicio = time.perf_counter()
+                gestor = self._gestor()
+                if operacion != "inicializar":
+                    inicio = time.perf_counter()
+                    self._llamada(gestor, operacion)()
+                frias.append(time.perf_counter() - inicio)
+                gestor.cerrar()
+            if operacion == "inicializar":
+                return {"frio": resumir(frias, notas_por_muestra), "caliente": None}
+            entradas = [()] * self.repeticiones
+        else:
+            entradas = self._entradas(operacion)
+
+        gestor = self._gestor()
+        try:
+            llamada = self._llamada(gestor, operacion)
+            if not global_:
+                for argumentos in entradas:
+                    inicio = time.perf_counter()
+                    llamada(*argumentos)
+                    frias.append(time.perf_counter() - inicio)
+
+            if global_:
+                llamada()
+            calientes = []
+            for argumentos in entradas:
+                inicio = time.perf_counter()
+                llamada(*argumentos)
+                calientes.append(time.perf_counter() - inicio)
+        finally:
+            gestor.cerrar()
+
+        return {
+            "frio": resumir(frias, notas_por_muestra),
+            "caliente": resumir(calientes, notas_por_muestra),
+        }
+
+    def ejecutar(self, operaciones=OPERACIONES, informar=None):
+        resultados = {}
+        for operacion in operaciones:
+            resultados[operacion] = self.medir(operacion)
+            if informar:
+                informar(operacion, resultados[operacion])
+        return resultados
+
+
+def _commit_actual():
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def ejecutar_banco(
+    notas,
+    tamano_cuerpo=512,
+    almacenamiento="texto",
+    repeticiones=20,
+    operaciones=OPERACIONES,
+    carpeta=None,
+    semilla=0,
+    informar=None,
+):
+    """
+    Genera un corpus de `notas` notas (en un directorio temporal salvo que se
+    indique `carpeta`) y mide todas las operaciones. Devuelve el informe
+    completo listo para serializarse como JSON.
+    """
+    with tempfile.TemporaryDirectory(prefix="banco_notas_") as temporal:
+        carpeta = carpeta or os.path.join(temporal, "notas")
+        backend = crear_almacenamiento(almacenamiento, carpeta)
+        inicio = time.perf_counter()
+        try:
+            vocabulario = generar_corpus(backend, notas, tamano_cuerpo, semilla)
+        finally:
+            backend.cerrar()
+        segundos_generacion = time.perf_counter() - inicio
+
+        banco = BancoPruebas(carpeta, notas, vocabulario, almacenamiento, repeticiones, semilla)
+        resultados = banco.ejecutar(operaciones, informar)
+
+    return {
+        "metadatos": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_actual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "notas": notas,
+            "tamano_cuerpo": tamano_cuerpo,
+            "almacenamiento": almacenamiento,
+            "repeticiones": repeticiones,
+            "segundos_generacion": round(segundos_generacion, 3),
+        },
+        "resultados": resultados,
+        "pico_rss_kb": pico_rss_kb(),
+    }
+
+
+def comparar(anterior, actual):
+    """Devuelve, por operación y fase, el cociente p50 actual / p50 anterior."""
+    cocientes = {}
+    for operacion, fases in actual["resultados"].items():
+        previas = anterior["resultados"].get(operacion)
+        if not previas:
+            continue
+        for fase in ("frio", "caliente"):
+            if not fases.get(fase) or not previas.get(fase) or not previas[fase]["p50_ms"]:
+                continue
+            cocientes[f"{operacion}.{fase}"] = round(fases[fase]["p50_ms"] / previas[fase]["p50_ms"], 3)
+    return cocientes
+
+
+def _informar(operacion, resultado):
+    frio = resultado["frio"]
+    caliente = resultado["caliente"]
+    linea = f"{operacion:<24} frío p50={frio['p50_ms']:.3f} ms p99={frio['p99_ms']:.3f} ms"
+    if caliente:
+        linea += f" | caliente p50={caliente['p50_ms']:.3f} ms p99={caliente['p99_ms']:.3f} ms"
+    print(linea)
+
+
+def main(argumentos=None):
+    """Punto de entrada de `python -m benchmarks.rendimiento`."""
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de GestorNotas con corpus sintéticos.")
+    parser.add_argument("--notas", type=int, nargs="+", default=[1000], help="Tamaños de corpus (p. ej. 1000 100000 1000000).")
+    parser.add_argument("--tamano-cuerpo", type=int, default=512, help="Caracteres por cuerpo de nota.")
+    parser.add_argument("--almacenamiento", choices=TIPOS_ALMACENAMIENTO, default="texto")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Muestras por operación y fase.")
+    parser.add_argument("--operaciones", nargs="+", choices=OPERACIONES, default=list(OPERACIONES))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=os.path.join("benchmarks", "resultados"), help="Carpeta de los informes JSON.")
+    parser.add_argument("--comparar", help="Informe JSON previo con el que comparar las medianas.")
+    opciones = parser.parse_args(argumentos)
+
+    os.makedirs(opciones.salida, exist_ok=True)
+    for notas in opciones.notas:
+        print(f"\n== {notas} notas ({opciones.almacenamiento}, cuerpo {opciones.tamano_cuerpo}) ==")
+        informe = ejecutar_banco(
+            notas,
+            tamano_cuerpo=opciones.tamano_cuerpo,
+            almacenamiento=opciones.almacenamiento,
+            repeticiones=opciones.repeticiones,
+            operaciones=opciones.operaciones,
+            semilla=opciones.semilla,
+            informar=_informar,
+        )
+        marca = datetime.now().strftime("%Y%m%d-%H%M%S")
+        nombre = f"{marca}_{informe['metadatos']['commit'] or 'sin-commit'}_{opciones.almacenamiento}_{notas}.json"
+        ruta = os.path.join(opciones.salida, nombre)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=4, ensure_ascii=False)
+        print(f"Pico de RSS: {informe['pico_rss_kb']} KiB. Informe guardado en {ruta}")
+
+        if opciones.comparar:
+            with open(opciones.comparar, "r", encoding="utf-8") as archivo:
+                anterior = json.load(archivo)
+            for clave, cociente in comparar(anterior, informe).items():
+                print(f"{clave:<36} x{cociente}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
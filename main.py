@@ -1,7 +1,318 @@
-from models.nota import Nota
-from services.gestor_notas import GestorNotas
+import argparse
+import json
+import sys
+
+from services import ordenes
+from services.almacenamiento import TIPOS_ALMACENAMIENTO
+from services.indice_fechas import ORDENES_FECHA
+
+# Aquí solo se importan módulos ligeros: el servicio y sus dependencias se
+# cargan al ejecutar una orden (`abrir_gestor`), así que `--help`, un error de
+# argumentos o una orden sencilla como `contar` arrancan en milisegundos.
+
+
+def abrir_gestor(opciones):
+    """Crea el `GestorNotas` con las opciones globales; devuelve también su instrumentación."""
+    from services.gestor_notas import GestorNotas
+
+    instrumentacion = None
+    if opciones.instrumentar or opciones.perfil or opciones.estadisticas:
+        from services.instrumentacion import Instrumentacion
+
+        instrumentacion = Instrumentacion(perfilar=opciones.perfil)
+    gestor = GestorNotas(
+        carpeta=opciones.carpeta,
+        almacenamiento=opciones.almacenamiento,
+        instrumentacion=instrumentacion,
+        compresion=opciones.compresion,
+    )
+    if opciones.vigilar:
+        gestor.vigilar()
+    return gestor, instrumentacion
+
+
+# Suborden: (ayuda, argumentos de argparse como pares (nombres, opciones)), una por
+# cada entrada de `services.ordenes.ORDENES`.
+ARGUMENTOS = {
+    "crear": (
+        "Crea una nota o reemplaza la que tenga el mismo nombre.",
+        [
+            (("nombre",), {}),
+            (("contenido",), {"nargs": "?", "help": "Si se omite, se lee de la entrada estándar."}),
+        ],
+    ),
+    "leer": ("Muestra el contenido de una nota.", [(("nombre",), {})]),
+    "listar": (
+        "Lista los nombres de las notas, opcionalmente por fecha de creación.",
+        [
+            (("--desde",), {"help": "Fecha inicial incluida (AAAA-MM-DD o AAAA-MM-DD HH:MM:SS)."}),
+            (("--hasta",), {"help": "Fecha final incluida (AAAA-MM-DD abarca el día entero)."}),
+            (("--limite",), {"type": int, "help": "Número máximo de notas."}),
+            (("--orden",), {"choices": ORDENES_FECHA, "help": "asc: antiguas primero; desc: recientes primero."}),
+        ],
+    ),
+    "contar": ("Cuenta las notas.", []),
+    "buscar": (
+        "Lista las notas que contienen una palabra.",
+        [
+            (("palabra",), {}),
+            (("--recorrer",), {"action": "store_true", "help": "Lee todas las notas en lugar de usar el índice."}),
+            (("--limite",), {"type": int, "help": "Detiene el recorrido tras este número de coincidencias."}),
+        ],
+    ),
+    "consultar": (
+        "Consulta con ranking BM25 (AND/OR/NOT, frases y prefijos).",
+        [
+            (("consulta",), {}),
+            (("--limite",), {"type": int, "default": 10}),
+            (("--desplazamiento",), {"type": int, "default": 0}),
+        ],
+    ),
+    "editar": (
+        "Reemplaza el contenido de una nota y guarda el anterior en el historial.",
+        [
+            (("nombre",), {}),
+            (("contenido",), {"nargs": "?", "help": "Si se omite, se lee de la entrada estándar."}),
+        ],
+    ),
+    "eliminar": ("Elimina una nota.", [(("nombre",), {})]),
+    "versiones": ("Lista las versiones anteriores de una nota.", [(("nombre",), {})]),
+    "revertir": (
+        "Devuelve una nota a una versión anterior.",
+        [(("nombre",), {}), (("version",), {"type": int})],
+    ),
+    "exportar": (
+        "Exporta todas las notas a JSON, JSON Lines o pickle (en notas/exports/).",
+        [
+            (("--formato",), {"choices": ("json", "jsonl", "pickle"), "default": "json"}),
+            (("--archivo",), {"help": "Nombre del archivo dentro de exports/."}),
+            (("--comprimir",), {"choices": ("gz", "xz")}),
+            (("--desde",), {"help": "Exporta solo las notas creadas desde esta fecha."}),
+            (("--hasta",), {"help": "Exporta solo las notas creadas hasta esta fecha."}),
+        ],
+    ),
+    "restaurar": (
+        "Restaura las notas de una exportación pickle.",
+        [(("--archivo",), {"default": "notas.pkl"})],
+    ),
+}
+
+
+def ejecutar_orden(gestor, orden, argumentos):
+    """Ejecuta una orden de `services.ordenes`; los argumentos desconocidos o ausentes se informan como fallo."""
+    try:
+        return ordenes.ejecutar_orden(gestor, orden, argumentos)
+    except ordenes.OrdenInvalida as error:
+        return False, str(error)
+
+
+def ejecutar_lote(gestor, lineas, salida, como_json, parar_en_error=False):
+    """
+    Ejecuta una operación por línea JSON (`{"orden": "crear", "nombre": ...,
+    "contenido": ...}`) sobre un mismo gestor y escribe un resultado por línea.
+    Un campo `id` opcional se devuelve tal cual para emparejar respuestas.
+    Devuelve el número de operaciones fallidas.
+    """
+    fallidas = 0
+    for numero, linea in enumerate(lineas, start=1):
+        if not linea.strip():
+            continue
+        try:
+            operacion = json.loads(linea)
+        except ValueError as error:
+            operacion = error
+        if isinstance(operacion, dict):
+            identificador = operacion.pop("id", None)
+            orden = operacion.pop("orden", None)
+            try:
+                exito, resultado = ejecutar_orden(gestor, orden, operacion)
+            except Exception as error:
+                # Un fallo inesperado en una línea no debe abortar el resto del lote.
+                exito, resultado = False, f"Línea {numero}: error inesperado en {orden}: {error!r}"
+        else:
+            identificador = orden = None
+            detalle = operacion if isinstance(operacion, ValueError) else "se esperaba un objeto JSON"
+            exito, resultado = False, f"Línea {numero} no válida: {detalle}"
+        if not exito:
+            fallidas += 1
+        if como_json:
+            respuesta = {"orden": orden, "exito": exito, "resultado": resultado}
+            if identificador is not None:
+                respuesta["id"] = identificador
+            salida.write(json.dumps(respuesta, ensure_ascii=False) + "\n")
+        else:
+            salida.write(formatear(resultado) + "\n")
+        if not exito and parar_en_error:
+            break
+    return fallidas
+
+
+def formatear(resultado):
+    """Presenta un resultado para personas: listas una entrada por línea y estructuras como JSON."""
+    if isinstance(resultado, str):
+        return resultado
+    if isinstance(resultado, list) and all(isinstance(elemento, str) for elemento in resultado):
+        return "\n".join(resultado) if resultado else "Sin resultados."
+    if isinstance(resultado, (dict, list)):
+        return json.dumps(resultado, ensure_ascii=False, indent=2)
+    return str(resultado)
+
+
+def crear_parser():
+    """Construye el parser de la línea de órdenes con una suborden por entrada de `ARGUMENTOS`."""
+    salida_json = argparse.ArgumentParser(add_help=False)
+    salida_json.add_argument(
+        "--json",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Escribe el resultado en JSON (JSON Lines en los lotes).",
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Gestor de notas en consola. Sin orden, abre el menú interactivo."
+    )
+    parser.add_argument("--carpeta", default="notas", help="Carpeta de trabajo de las notas.")
+    parser.add_argument("--almacenamiento", choices=TIPOS_ALMACENAMIENTO, help="Backend de almacenamiento.")
+    parser.add_argument("--compresion", help="Comprime las notas que se escriban (zlib o lzma).")
+    parser.add_argument("--json", action="store_true", help="Escribe el resultado en JSON (JSON Lines en los lotes).")
+    parser.add_argument("--instrumentar", action="store_true", help="Mide tiempos y E/S de cada operación.")
+    parser.add_argument("--perfil", action="store_true", help="Captura un perfil con cProfile (implica --instrumentar).")
+    parser.add_argument("--estadisticas", action="store_true", help="Muestra las estadísticas al salir (implica --instrumentar).")
+    parser.add_argument("--vigilar", action="store_true", help="Detecta en segundo plano los cambios hechos por otras herramientas.")
+
+    subordenes = parser.add_subparsers(dest="suborden", metavar="orden")
+    for nombre, (ayuda, argumentos) in ARGUMENTOS.items():
+        subparser = subordenes.add_parser(nombre, help=ayuda, description=ayuda, parents=[salida_json])
+        destinos = []
+        for nombres, opciones in argumentos:
+            destinos.append(subparser.add_argument(*nombres, **opciones).dest)
+        subparser.set_defaults(destinos=destinos)
+
+    lote = subordenes.add_parser(
+        "lote",
+        help="Ejecuta las operaciones de un archivo JSON Lines en un solo proceso.",
+        description='Cada línea es un objeto como {"orden": "crear", "nombre": "n", "contenido": "..."}.',
+        parents=[salida_json],
+    )
+    lote.add_argument("archivo", nargs="?", default="-", help="Archivo JSON Lines; por omisión, la entrada estándar.")
+    lote.add_argument("--parar-en-error", action="store_true", help="Se detiene en la primera operación fallida.")
+
+    servir = subordenes.add_parser(
+        "servir",
+        help="Atiende las órdenes por JSON-RPC con el estado siempre en memoria.",
+        description="Servidor JSON-RPC 2.0 por socket Unix y, opcionalmente, HTTP local (ver services/cliente.py).",
+    )
+    servir.add_argument("--socket", help="Ruta del socket Unix; por omisión, <carpeta>/.servidor.sock.")
+    servir.add_argument("--http", type=int, metavar="PUERTO", help="Atiende también por HTTP en este puerto.")
+    servir.add_argument("--host", default="127.0.0.1", help="Dirección del servidor HTTP (solo local).")
+    servir.add_argument("--hilos", type=int, default=4, help="Hilos que ejecutan las órdenes a la vez.")
+    subordenes.add_parser("menu", help="Abre el menú interactivo.")
+    return parser
+
+
+def mostrar_estadisticas(gestor, instrumentacion, salida=None):
+    """Imprime las métricas por operación, la caché de lectura y el perfil si está activo."""
+    salida = salida or sys.stdout
+    if instrumentacion is None:
+        print("La instrumentación está desactivada. Inicie el programa con --instrumentar.", file=salida)
+        return
+    print(instrumentacion.informe(), file=salida)
+    cache = gestor.cache.estadisticas()
+    print(
+        f"\nCaché de lectura: {cache['aciertos']} aciertos, {cache['fallos']} fallos, "
+        f"{cache['expulsiones']} expulsiones, {cache['bytes']} bytes ocupados.",
+        file=salida,
+    )
+    if instrumentacion.perfilando:
+        print(instrumentacion.informe_perfil(), file=salida)
+
+
+def servir(opciones):
+    """Arranca el servidor JSON-RPC y lo atiende hasta Ctrl+C o SIGTERM; devuelve el código de salida."""
+    import asyncio
+    import os
+    import signal
+
+    from services import servidor
+
+    try:
+        gestor, instrumentacion = abrir_gestor(opciones)
+    except (OSError, ValueError) as error:
+        print(f"No fue posible abrir la carpeta de notas: {error}", file=sys.stderr)
+        return 1
+    ruta_socket = opciones.socket or os.path.join(opciones.carpeta, ".servidor.sock")
+
+    async def atender():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        async with servidor.ServidorNotas(gestor, max_hilos=opciones.hilos) as atendiendo:
+            # Con el vigilante, lo que otras herramientas cambien en la carpeta llega al estado en memoria.
+            gestor.vigilar()
+            await atendiendo.iniciar(ruta_socket, opciones.http, opciones.host)
+            destinos = [f"socket {ruta_socket}"]
+            if atendiendo.puerto_http is not None:
+                destinos.append(f"http://{opciones.host}:{atendiendo.puerto_http}/")
+            print(f"Atendiendo en {' y '.join(destinos)}. Ctrl+C para terminar.", file=sys.stderr)
+            await atendiendo.servir()
+
+    try:
+        asyncio.run(atender())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    except OSError as error:
+        print(f"No fue posible arrancar el servidor: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if opciones.estadisticas:
+            mostrar_estadisticas(gestor, instrumentacion, sys.stderr)
+    return 0
+
+
+def main(argumentos=None):
+    """Punto de entrada de `python main.py`; devuelve el código de salida."""
+    opciones = crear_parser().parse_args(argumentos)
+    if opciones.suborden in (None, "menu"):
+        gestor, instrumentacion = abrir_gestor(opciones)
+        menu(gestor, instrumentacion, opciones)
+        return 0
+    if opciones.suborden == "servir":
+        return servir(opciones)
+
+    parametros = {}
+    if opciones.suborden != "lote":
+        parametros = {destino: getattr(opciones, destino) for destino in opciones.destinos}
+        if parametros.get("contenido", "") is None:
+            parametros["contenido"] = sys.stdin.read()
+
+    try:
+        gestor, instrumentacion = abrir_gestor(opciones)
+    except (OSError, ValueError) as error:
+        print(f"No fue posible abrir la carpeta de notas: {error}", file=sys.stderr)
+        return 1
+    try:
+        if opciones.suborden == "lote":
+            if opciones.archivo == "-":
+                fallidas = ejecutar_lote(gestor, sys.stdin, sys.stdout, opciones.json, opciones.parar_en_error)
+            else:
+                try:
+                    with open(opciones.archivo, "r", encoding="utf-8") as archivo:
+                        fallidas = ejecutar_lote(gestor, archivo, sys.stdout, opciones.json, opciones.parar_en_error)
+                except OSError:
+                    print(f"No fue posible leer el lote {opciones.archivo}.", file=sys.stderr)
+                    return 1
+            exito = not fallidas
+        else:
+            exito, resultado = ejecutar_orden(gestor, opciones.suborden, parametros)
+            if opciones.json:
+                print(json.dumps({"exito": exito, "resultado": resultado}, ensure_ascii=False))
+            else:
+                print(formatear(resultado), file=sys.stdout if exito else sys.stderr)
+    finally:
+        gestor.cerrar()
+        if opciones.estadisticas:
+            # Por la salida de errores para no mezclarlas con un resultado en JSON.
+            mostrar_estadisticas(gestor, instrumentacion, sys.stderr)
+    return 0 if exito else 1
 
-gestor = GestorNotas()
 
 def mostrar_menu():
     """Muestra las opciones disponibles de la aplicación en consola."""
@@ -16,94 +327,123 @@ def mostrar_menu():
     print("8. Exportar notas a JSON")
     print("9. Exportar notas a Pickle")
     print("10. Restaurar notas desde Pickle")
-    print("11. Salir")
+    print("11. Ver estadísticas de rendimiento")
+    print("12. Activar/desactivar perfil cProfile")
+    print("13. Salir")
 
-def restaurar_desde_pickle():
+def restaurar_desde_pickle(gestor):
     """Restaura las notas que existan en el archivo pickle al almacenamiento en disco."""
-    datos = gestor.cargar_desde_pickle()
-    if not datos:
+    resumen = gestor.restaurar_desde_pickle()
+    if not resumen["resultados"]:
         print("No se encontraron datos en notas.pkl.")
         return
 
-    restauradas = 0
-    for nombre, campos in datos.items():
-        contenido = campos.get("contenido", "")
-        fecha = campos.get("fecha")
-        nota = Nota(nombre, contenido)
-        if fecha:
-            nota.fecha = fecha
-        exito, _ = gestor.guardar(nota)
-        if exito:
-            restauradas += 1
-
-    print(f"Se restauraron {restauradas} notas desde notas.pkl.")
-
-while True:
-    mostrar_menu()
-    opcion = input("Seleccione una opción: ").strip()
-
-    if opcion == "1":
-        nombre = input("Nombre de la nota: ").strip()
-        contenido = input("Contenido: ").strip()
-        if len(nombre) > 0 and len(contenido) > 5:
-            nota = Nota(nombre, contenido)
-            exito, mensaje = gestor.guardar(nota)
+    print(
+        f"Se restauraron {resumen['guardadas']} notas desde notas.pkl "
+        f"en {resumen['segundos']:.2f} s."
+    )
+    for nombre, exito, mensaje in resumen["resultados"]:
+        if not exito:
+            print(f"- {nombre}: {mensaje}")
+
+def alternar_perfil(instrumentacion):
+    """Activa o desactiva la captura de cProfile durante la sesión."""
+    if instrumentacion is None:
+        print("La instrumentación está desactivada. Inicie el programa con --instrumentar.")
+        return
+    instrumentacion.perfilar(not instrumentacion.perfilando)
+    estado = "activada" if instrumentacion.perfilando else "desactivada"
+    print(f"Captura de perfil {estado}.")
+
+def menu(gestor, instrumentacion, opciones):
+    """Bucle interactivo guiado por `input()`."""
+    from models.nota import Nota
+
+    while True:
+        mostrar_menu()
+        opcion = input("Seleccione una opción: ").strip()
+
+        if opcion == "1":
+            nombre = input("Nombre de la nota: ").strip()
+            contenido = input("Contenido: ").strip()
+            if len(nombre) > 0 and len(contenido) > 5:
+                nota = Nota(nombre, contenido)
+                exito, mensaje = gestor.guardar(nota)
+                print(mensaje)
+            else:
+                print("El nombre o el contenido no son válidos.")
+
+        elif opcion == "2":
+            nombre = input("Nombre de la nota: ").strip()
+            print(gestor.leer(nombre))
+
+        elif opcion == "3":
+            exito, resultado = gestor.listar()
+            if exito:
+                print("Notas disponibles:", resultado if resultado else "No hay notas guardadas.")
+            else:
+                print(resultado)
+
+        elif opcion == "4":
+            palabra = input("Palabra a buscar: ").strip()
+            resultados = gestor.buscar(palabra)
+            if resultados:
+                print("Coincidencias encontradas:", resultados)
+            else:
+                print("No se encontraron coincidencias.")
+
+        elif opcion == "5":
+            nombre = input("Nombre de la nota a editar: ").strip()
+            nuevo = input("Nuevo contenido: ").strip()
+            exito, mensaje = gestor.editar(nombre, nuevo)
+            # Las operaciones del servicio definen el mensaje para centralizar el tratamiento de errores de E/S.
             print(mensaje)
-        else:
-            print("El nombre o el contenido no son válidos.")
 
-    elif opcion == "2":
-        nombre = input("Nombre de la nota: ").strip()
-        print(gestor.leer(nombre))
+        elif opcion == "6":
+            nombre = input("Nombre de la nota a eliminar: ").strip()
+            exito, mensaje = gestor.eliminar(nombre)
+            print(mensaje)
 
-    elif opcion == "3":
-        exito, resultado = gestor.listar()
-        if exito:
-            print("Notas disponibles:", resultado if resultado else "No hay notas guardadas.")
-        else:
-            print(resultado)
+        elif opcion == "7":
+            total = gestor.contar()
+            print(f"Número total de notas: {total}")
 
-    elif opcion == "4":
-        palabra = input("Palabra a buscar: ").strip()
-        resultados = gestor.buscar(palabra)
-        if resultados:
-            print("Coincidencias encontradas:", resultados)
-        else:
-            print("No se encontraron coincidencias.")
-
-    elif opcion == "5":
-        nombre = input("Nombre de la nota a editar: ").strip()
-        nuevo = input("Nuevo contenido: ").strip()
-        exito, mensaje = gestor.editar(nombre, nuevo)
-        # Las operaciones del servicio definen el mensaje para centralizar el tratamiento de errores de E/S.
-        print(mensaje)
-
-    elif opcion == "6":
-        nombre = input("Nombre de la nota a eliminar: ").strip()
-        exito, mensaje = gestor.eliminar(nombre)
-        print(mensaje)
-
-    elif opcion == "7":
-        total = gestor.contar()
-        print(f"Número total de notas: {total}")
-
-    elif opcion == "8":
-        gestor.exportar_json()
-        print("Notas exportadas a notas.json correctamente.")
-
-    elif opcion == "9":
-        exito = gestor.exportar_pickle()
-        if exito:
-            print("Notas exportadas a notas.pkl correctamente.")
-        else:
-            print("No fue posible exportar las notas a pickle.")
+        elif opcion == "8":
+            if gestor.exportar_json():
+                estadisticas = gestor.ultima_exportacion
+                print(
+                    f"Notas exportadas a notas.json correctamente "
+                    f"({estadisticas['procesadas']} notas, {estadisticas['notas_por_segundo']} notas/s)."
+                )
+            else:
+                print("No fue posible exportar las notas a JSON.")
+
+        elif opcion == "9":
+            exito = gestor.exportar_pickle()
+            if exito:
+                print("Notas exportadas a notas.pkl correctamente.")
+            else:
+                print("No fue posible exportar las notas a pickle.")
+
+        elif opcion == "10":
+            restaurar_desde_pickle(gestor)
+
+        elif opcion == "11":
+            mostrar_estadisticas(gestor, instrumentacion)
 
-    elif opcion == "10":
-        restaurar_desde_pickle()
+        elif opcion == "12":
+            alternar_perfil(instrumentacion)
+
+        elif opcion == "13":
+            gestor.cerrar()
+            if opciones.estadisticas:
+                mostrar_estadisticas(gestor, instrumentacion)
+            print("Programa finalizado.")
+            break
+
+        else:
+            print("Opción no válida.")
 
-    elif opcion == "11":
-        print("Programa finalizado.")
-        break
 
-    else:
-        print("Opción no válida.")
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,13 +1,79 @@
+import time
 from datetime import datetime
 
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def marca_desde_fecha(fecha):
+    """Convierte una fecha con `FORMATO_FECHA` en segundos desde la época, o `None` si no la sigue."""
+    try:
+        return int(datetime.strptime(fecha, FORMATO_FECHA).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
 class Nota:
-    """Modelo de nota que almacena el contenido y la fecha de creación."""
+    """
+    Modelo de nota que almacena el contenido y la fecha de creación.
 
-    def __init__(self, nombre, contenido):
+    Usa `__slots__` para que cada instancia ocupe lo mínimo: la fecha se guarda
+    como segundos desde la época (`marca`) y el cuerpo puede cargarse de forma
+    diferida mediante `cargador(nombre)` la primera vez que se accede a
+    `contenido`, de modo que recorrer encabezados no lee los cuerpos.
+    """
+
+    __slots__ = ("nombre", "marca", "_fecha_texto", "_contenido", "_cargador")
+
+    def __init__(self, nombre, contenido=None, marca=None, cargador=None):
         """Genera una nueva nota a partir del nombre y el cuerpo recibido."""
         self.nombre = nombre.strip()
-        self.contenido = contenido.strip()
-        self.fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._contenido = contenido.strip() if contenido is not None else None
+        self._cargador = cargador
+        self.marca = int(time.time()) if marca is None else int(marca)
+        self._fecha_texto = None
+
+    @classmethod
+    def desde_encabezado(cls, nombre, fecha, cargador=None):
+        """Crea una nota diferida a partir de la fecha leída en su encabezado."""
+        nota = cls(nombre, cargador=cargador, marca=0)
+        nota.fecha = fecha
+        return nota
+
+    @property
+    def fecha(self):
+        """Fecha de creación con el formato persistido en el encabezado."""
+        if self._fecha_texto is not None:
+            return self._fecha_texto
+        return datetime.fromtimestamp(self.marca).strftime(FORMATO_FECHA)
+
+    @fecha.setter
+    def fecha(self, valor):
+        marca = marca_desde_fecha(valor)
+        if marca is None:
+            # Fechas escritas a mano o por otras herramientas se conservan tal cual.
+            self._fecha_texto = valor
+        else:
+            self.marca = marca
+            self._fecha_texto = None
+
+    @property
+    def contenido(self):
+        """Cuerpo de la nota; se lee del almacenamiento solo al primer acceso."""
+        if self._contenido is None:
+            self._contenido = self._cargador(self.nombre) if self._cargador else ""
+        return self._contenido
+
+    @contenido.setter
+    def contenido(self, valor):
+        self._contenido = valor.strip()
+
+    @property
+    def cargada(self):
+        """Indica si el cuerpo ya está en memoria."""
+        return self._contenido is not None
+
+    def __repr__(self):
+        return f"Nota(nombre={self.nombre!r}, fecha={self.fecha!r})"
 
     def __str__(self):
         """Devuelve la representación lista para persistirla en un archivo."""
@@ -0,0 +1,144 @@
+import os
+from collections import namedtuple
+
+EstadoNota = namedtuple("EstadoNota", ["mtime", "tamano"])
+"""Metadatos mínimos de una nota: mtime en nanosegundos y tamaño en bytes."""
+
+TIPOS_ALMACENAMIENTO = ("texto", "fragmentado", "sqlite")
+
+
+class Almacenamiento:
+    """
+    Contrato que cumplen los backends de persistencia usados por `GestorNotas`.
+
+    Los métodos trabajan con el texto completo de la nota (encabezado
+    `Fecha: ...` incluido) y señalan los fallos con `OSError`; una nota
+    inexistente se indica con `FileNotFoundError`, igual que al abrir un
+    archivo. `GestorNotas` es quien traduce esas excepciones a mensajes.
+    """
+
+    # Indica si `firma` cambia también cuando una nota se reescribe en su
+    # sitio. El mtime de una carpeta solo cambia con altas, bajas y
+    # renombrados, así que en los backends de archivos el catálogo compara
+    # además el estado de cada entrada al arrancar.
+    firma_cubre_ediciones = False
+
+    def firma(self):
+        """Valor barato que cambia cuando el almacenamiento se modifica; `None` si no es fiable."""
+        raise NotImplementedError
+
+    def firma_tras_cambio(self, nombre, firma_anterior):
+        """
+        Firma después de un cambio propio sobre `nombre`. Por omisión se
+        recalcula entera; los backends cuya firma es cara la actualizan a
+        partir de `firma_anterior`.
+        """
+        return self.firma()
+
+    def carpetas_vigiladas(self, desde=None):
+        """
+        Carpetas que hay que observar para detectar cambios en las notas, o
+        las que cuelgan de `desde` cuando esa carpeta acaba de aparecer. Una
+        lista vacía indica que el backend no guarda las notas en archivos y
+        solo admite vigilancia por sondeo.
+        """
+        return []
+
+    def nombre_en_ruta(self, ruta):
+        """Nombre de la nota almacenada en `ruta` o `None` si la ruta no es una nota."""
+        return None
+
+    def ruta_archivo(self, nombre):
+        """
+        Ruta del archivo que guarda la nota, para que otros procesos puedan
+        leerlo directamente; `None` si el backend no usa un archivo por nota.
+        """
+        return None
+
+    def decodificador(self):
+        """
+        Función (serializable con pickle) que convierte el contenido de un
+        archivo de `ruta_archivo` en el texto de la nota, o `None` si los
+        archivos son UTF-8 plano.
+        """
+        return None
+
+    def entradas(self):
+        """Recorre las notas existentes como pares `(nombre, EstadoNota)`."""
+        raise NotImplementedError
+
+    def estado(self, nombre):
+        """Devuelve el `EstadoNota` de una nota o `None` si no existe."""
+        raise NotImplementedError
+
+    def existe(self, nombre):
+        """Indica si existe una nota con ese nombre."""
+        return self.estado(nombre) is not None
+
+    def leer(self, nombre):
+        """Devuelve el texto completo de la nota."""
+        raise NotImplementedError
+
+    def leer_encabezado(self, nombre):
+        """Devuelve solo la primera línea de la nota."""
+        return self.leer(nombre).split("\n", 1)[0]
+
+    def escribir(self, nombre, texto):
+        """Crea o reemplaza la nota y devuelve su nuevo `EstadoNota`."""
+        raise NotImplementedError
+
+    def escribir_lote(self, notas):
+        """
+        Escribe varias notas `(nombre, texto)` y devuelve sus estados en orden.
+
+        La implementación base escribe una a una; los backends con
+        transacciones la sobrescriben para agrupar la escritura.
+        """
+        return [self.escribir(nombre, texto) for nombre, texto in notas]
+
+    def eliminar(self, nombre):
+        """Borra la nota definitivamente."""
+        raise NotImplementedError
+
+    def recuperar(self):
+        """
+        Completa las escrituras interrumpidas por un corte anterior. Devuelve
+        cuántas notas se corrigieron; los backends transaccionales no
+        necesitan hacer nada.
+        """
+        return 0
+
+    def buscar(self, palabra):
+        """
+        Búsqueda nativa del backend. Devuelve `None` cuando no la ofrece, en
+        cuyo caso `GestorNotas` usa su índice invertido.
+        """
+        return None
+
+    def cerrar(self):
+        """Libera los recursos abiertos por el backend."""
+
+
+def crear_almacenamiento(tipo, carpeta, compresion=None):
+    """
+    Construye el backend indicado (`texto`, `fragmentado` o `sqlite`) sobre
+    una carpeta. `texto` detecta las carpetas ya fragmentadas y usa su
+    distribución. `compresion` (`"zlib"` o `"lzma"`) solo se admite en los
+    backends de archivos.
+    """
+    if tipo in ("texto", "fragmentado"):
+        from services.almacenamiento_fragmentado import AlmacenamientoFragmentado, leer_distribucion
+        from services.almacenamiento_texto import AlmacenamientoTexto
+
+        distribucion = leer_distribucion(carpeta) if os.path.isdir(carpeta) else None
+        if tipo == "fragmentado" or distribucion is not None:
+            return AlmacenamientoFragmentado(carpeta, compresion=compresion, **(distribucion or {}))
+        return AlmacenamientoTexto(carpeta, compresion=compresion)
+    if tipo == "sqlite":
+        if compresion is not None:
+            # El índice FTS5 necesita el texto sin comprimir.
+            raise ValueError("El backend SQLite no admite compresión por nota.")
+        from services.almacenamiento_sqlite import AlmacenamientoSQLite
+
+        return AlmacenamientoSQLite(carpeta)
+    raise ValueError(f"Tipo de almacenamiento desconocido: {tipo}")
@@ -0,0 +1,151 @@
+import json
+import os
+import time
+import zlib
+
+from services.almacenamiento import EstadoNota
+from services.almacenamiento_texto import MARGEN_FIRMA_NS, AlmacenamientoTexto
+
+ARCHIVO_DISTRIBUCION = ".distribucion"
+# Los `_bak.txt` heredados de la distribución plana se apartan aquí al fragmentar.
+CARPETA_RESPALDOS = ".respaldos"
+DIGITOS_HEX = frozenset("0123456789abcdef")
+
+
+def leer_distribucion(carpeta):
+    """Devuelve los parámetros de la distribución fragmentada o `None` si la carpeta es plana."""
+    try:
+        with open(os.path.join(carpeta, ARCHIVO_DISTRIBUCION), "r", encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+    except FileNotFoundError:
+        return None
+    return {"niveles": datos["niveles"], "ancho": datos["ancho"]}
+
+
+def escribir_distribucion(carpeta, niveles, ancho):
+    """Marca la carpeta como fragmentada de forma atómica."""
+    ruta = os.path.join(carpeta, ARCHIVO_DISTRIBUCION)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"distribucion": "fragmentada", "niveles": niveles, "ancho": ancho}, archivo)
+    os.replace(temporal, ruta)
+
+
+def fragmentos_de(nombre, niveles=2, ancho=2):
+    """Subcarpetas de la nota: prefijos hexadecimales del CRC32 de su nombre."""
+    resumen = f"{zlib.crc32(nombre.encode('utf-8')):08x}"
+    return [resumen[nivel * ancho:(nivel + 1) * ancho] for nivel in range(niveles)]
+
+
+class AlmacenamientoFragmentado(AlmacenamientoTexto):
+    """
+    Variante del backend de texto que reparte las notas en subcarpetas.
+
+    Cada nota vive en `<carpeta>/<aa>/<bb>/<nombre>.txt`, donde `aa` y `bb`
+    son prefijos del CRC32 del nombre, así ningún directorio crece con el
+    corpus. La distribución se registra en `<carpeta>/.distribucion`, que
+    `crear_almacenamiento("texto", ...)` detecta automáticamente; una carpeta
+    plana existente se convierte con `services.migracion.fragmentar`.
+    """
+
+    def __init__(self, carpeta="notas", niveles=2, ancho=2, compresion=None):
+        super().__init__(carpeta, compresion=compresion)
+        distribucion = leer_distribucion(carpeta)
+        if distribucion is None:
+            if self._tiene_notas_planas():
+                raise ValueError(
+                    "La carpeta contiene notas en formato plano; "
+                    "conviértala con `python -m services.migracion --fragmentar`."
+                )
+            escribir_distribucion(carpeta, niveles, ancho)
+            distribucion = {"niveles": niveles, "ancho": ancho}
+        self.niveles = distribucion["niveles"]
+        self.ancho = distribucion["ancho"]
+
+    def _tiene_notas_planas(self):
+        with os.scandir(self.carpeta) as entradas:
+            return any(entrada.name.endswith(".txt") and entrada.is_file() for entrada in entradas)
+
+    def _es_fragmento(self, entrada):
+        return len(entrada.name) == self.ancho and set(entrada.name) <= DIGITOS_HEX and entrada.is_dir()
+
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta, *fragmentos_de(nombre, self.niveles, self.ancho), f"{nombre}.txt")
+
+    def _carpetas(self, carpeta=None, nivel=1):
+        """Recorre con `os.scandir` las subcarpetas de fragmentos como pares `(entrada, es_hoja)`."""
+        with os.scandir(carpeta or self.carpeta) as entradas:
+            fragmentos = [entrada for entrada in entradas if self._es_fragmento(entrada)]
+        for fragmento in fragmentos:
+            hoja = nivel == self.niveles
+            yield fragmento, hoja
+            if not hoja:
+                yield from self._carpetas(fragmento.path, nivel + 1)
+
+    def firma(self):
+        # Crear, borrar o renombrar una nota cambia el mtime de su carpeta hoja,
+        # no el de la raíz, así que la firma es el mayor mtime de todo el árbol.
+        marca = os.stat(self.carpeta).st_mtime_ns
+        for carpeta, _ in self._carpetas():
+            marca = max(marca, carpeta.stat().st_mtime_ns)
+        if time.time_ns() - marca < MARGEN_FIRMA_NS:
+            return None
+        return marca
+
+    def firma_tras_cambio(self, nombre, firma_anterior):
+        # Un cambio propio solo puede tocar la raíz y las carpetas de su nota.
+        if firma_anterior is None:
+            return None
+        marca = max(firma_anterior, os.stat(self.carpeta).st_mtime_ns)
+        carpeta = self.carpeta
+        for fragmento in fragmentos_de(nombre, self.niveles, self.ancho):
+            carpeta = os.path.join(carpeta, fragmento)
+            try:
+                marca = max(marca, os.stat(carpeta).st_mtime_ns)
+            except FileNotFoundError:
+                break
+        if time.time_ns() - marca < MARGEN_FIRMA_NS:
+            return None
+        return marca
+
+    def entradas(self):
+        for carpeta, hoja in self._carpetas():
+            if not hoja:
+                continue
+            with os.scandir(carpeta.path) as archivos:
+                for archivo in archivos:
+                    if not archivo.name.endswith(".txt"):
+                        continue
+                    try:
+                        estado = archivo.stat()
+                    except OSError:
+                        continue
+                    yield archivo.name[:-4], EstadoNota(estado.st_mtime_ns, estado.st_size)
+
+    def carpetas_vigiladas(self, desde=None):
+        if desde is None:
+            return [self.carpeta, *(carpeta.path for carpeta, _ in self._carpetas())]
+        partes = os.path.relpath(desde, self.carpeta).split(os.sep)
+        if len(partes) > self.niveles or not all(
+            len(parte) == self.ancho and set(parte) <= DIGITOS_HEX for parte in partes
+        ):
+            return []
+        carpetas = [desde]
+        if len(partes) < self.niveles:
+            carpetas.extend(carpeta.path for carpeta, _ in self._carpetas(desde, len(partes) + 1))
+        return carpetas
+
+    def nombre_en_ruta(self, ruta):
+        archivo = os.path.basename(ruta)
+        if not archivo.endswith(".txt"):
+            return None
+        nombre = archivo[:-4]
+        return nombre if os.path.normpath(ruta) == os.path.normpath(self.ruta(nombre)) else None
+
+    def _escribir_atomico(self, nombre, texto):
+        try:
+            return super()._escribir_atomico(nombre, texto)
+        except FileNotFoundError:
+            # La subcarpeta se crea la primera vez que se usa.
+            os.makedirs(os.path.dirname(self.ruta(nombre)), exist_ok=True)
+            return super()._escribir_atomico(nombre, texto)
@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from services.almacenamiento import Almacenamiento, EstadoNota
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS notas (
+    nombre TEXT PRIMARY KEY,
+    contenido TEXT NOT NULL,
+    mtime INTEGER NOT NULL,
+    tamano INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metadatos (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO metadatos (clave, valor) VALUES ('generacion', 0);
+CREATE VIRTUAL TABLE IF NOT EXISTS notas_fts USING fts5(
+    contenido, content='notas', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS notas_ai AFTER INSERT ON notas BEGIN
+    INSERT INTO notas_fts (rowid, contenido) VALUES (new.rowid, new.contenido);
+    UPDATE metadatos SET valor = valor + 1 WHERE clave = 'generacion';
+END;
+CREATE TRIGGER IF NOT EXISTS notas_ad AFTER DELETE ON notas BEGIN
+    INSERT INTO notas_fts (notas_fts, rowid, contenido) VALUES ('delete', old.rowid, old.contenido);
+    UPDATE metadatos SET valor = valor + 1 WHERE clave = 'generacion';
+END;
+CREATE TRIGGER IF NOT EXISTS notas_au AFTER UPDATE ON notas BEGIN
+    INSERT INTO notas_fts (notas_fts, rowid, contenido) VALUES ('delete', old.rowid, old.contenido);
+    INSERT INTO notas_fts (rowid, contenido) VALUES (new.rowid, new.contenido);
+    UPDATE metadatos SET valor = valor + 1 WHERE clave = 'generacion';
+END;
+"""
+
+# El tokenizador trigram de FTS5 necesita al menos tres caracteres por consulta.
+LONGITUD_MINIMA_FTS = 3
+
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """
+    Backend de un solo archivo SQLite (`notas.db`) con diario WAL.
+
+    Las notas y un índice FTS5 con tokenizador trigram (que
+    permite búsquedas por subcadena sin distinguir mayúsculas) conviven en la
+    misma base de datos. Los errores de SQLite se exponen como `OSError` para
+    respetar el contrato de `Almacenamiento`.
+    """
+
+    # Los disparadores incrementan `generacion` con cada alta, edición o baja.
+    firma_cubre_ediciones = True
+
+    def __init__(self, carpeta="notas", archivo="notas.db"):
+        self.carpeta = carpeta
+        if not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        self.ruta_bd = os.path.join(carpeta, archivo)
+        self._bloqueo = threading.RLock()
+        self.conexion = sqlite3.connect(
+            self.ruta_bd, isolation_level=None, check_same_thread=False
+        )
+        self.conexion.create_function("minusculas", 1, str.lower, deterministic=True)
+        with self._transaccion() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        with self._transaccion() as cursor:
+            cursor.executescript(ESQUEMA)
+
+    @contextmanager
+    def _transaccion(self, escritura=False):
+        """Serializa el acceso a la conexión y traduce los errores de SQLite a `OSError`."""
+        with self._bloqueo:
+            cursor = self.conexion.cursor()
+            try:
+                if escritura:
+                    cursor.execute("BEGIN IMMEDIATE")
+                yield cursor
+                if escritura:
+                    cursor.execute("COMMIT")
+            except sqlite3.Error as error:
+                if escritura and self.conexion.in_transaction:
+                    self.conexion.rollback()
+                raise OSError(f"Error de SQLite: {error}") from error
+            except BaseException:
+                if escritura and self.conexion.in_transaction:
+                    self.conexion.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def firma(self):
+        with self._transaccion() as cursor:
+            fila = cursor.execute(
+                "SELECT valor FROM metadatos WHERE clave = 'generacion'"
+            ).fetchone()
+        return fila[0] if fila else None
+
+    def entradas(self):
+        with self._transaccion() as cursor:
+            filas = cursor.execute("SELECT nombre, mtime, tamano FROM notas").fetchall()
+        for nombre, mtime, tamano in filas:
+            yield nombre, EstadoNota(mtime, tamano)
+
+    def estado(self, nombre):
+        with self._transaccion() as cursor:
+            fila = cursor.execute(
+                "SELECT mtime, tamano FROM notas WHERE nombre = ?", (nombre,)
+            ).fetchone()
+        return EstadoNota(*fila) if fila else None
+
+    def leer(self, nombre):
+        with self._transaccion() as cursor:
+            fila = cursor.execute(
+                "SELECT contenido FROM notas WHERE nombre = ?", (nombre,)
+            ).fetchone()
+        if fila is None:
+            raise FileNotFoundError(nombre)
+        return fila[0]
+
+    def leer_encabezado(self, nombre):
+        with self._transaccion() as cursor:
+            fila = cursor.execute(
+                "SELECT substr(contenido, 1, 64) FROM notas WHERE nombre = ?", (nombre,)
+            ).fetchone()
+        if fila is None:
+            raise FileNotFoundError(nombre)
+        return fila[0].split("\n", 1)[0]
+
+    @staticmethod
+    def _insertar(cursor, nombre, texto):
+        estado = EstadoNota(time.time_ns(), len(texto.encode("utf-8")))
+        cursor.execute(
+            "INSERT INTO notas (nombre, contenido, mtime, tamano) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(nombre) DO UPDATE SET contenido = excluded.contenido, "
+            "mtime = excluded.mtime, tamano = excluded.tamano",
+            (nombre, texto, estado.mtime, estado.tamano),
+        )
+        return estado
+
+    def escribir(self, nombre, texto):
+        with self._transaccion(escritura=True) as cursor:
+            return self._insertar(cursor, nombre, texto)
+
+    def escribir_lote(self, notas):
+        """Escribe todas las notas dentro de una única transacción."""
+        with self._transaccion(escritura=True) as cursor:
+            return [self._insertar(cursor, nombre, texto) for nombre, texto in notas]
+
+    def eliminar(self, nombre):
+        with self._transaccion(escritura=True) as cursor:
+            cursor.execute("DELETE FROM notas WHERE nombre = ?", (nombre,))
+            if cursor.rowcount == 0:
+                raise FileNotFoundError(nombre)
+
+    def buscar(self, palabra):
+        """Busca subcadenas sin distinguir mayúsculas usando FTS5 cuando es posible."""
+        with self._transaccion() as cursor:
+            if len(palabra) >= LONGITUD_MINIMA_FTS:
+                frase = '"' + palabra.replace('"', '""') + '"'
+                filas = cursor.execute(
+                    "SELECT notas.nombre FROM notas_fts JOIN notas ON notas.rowid = notas_fts.rowid "
+                    "WHERE notas_fts MATCH ?",
+                    (frase,),
+                ).fetchall()
+            else:
+                filas = cursor.execute(
+                    "SELECT nombre FROM notas WHERE instr(minusculas(contenido), ?) > 0",
+                    (palabra.lower(),),
+                ).fetchall()
+        return [fila[0] for fila in filas]
+
+    def cerrar(self):
+        with self._bloqueo:
+            self.conexion.close()
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+import zlib
+
+from services.almacenamiento import Almacenamiento, EstadoNota
+from services.compresion import MAGIA, CompresionNotas
+from services.diario_escrituras import DiarioEscrituras
+
+# Los sistemas de archivos actualizan el mtime con una granularidad gruesa; una
+# firma dentro de este margen puede ocultar un cambio simultáneo.
+MARGEN_FIRMA_NS = 1_000_000_000
+
+# Cerrojos repartidos por nombre: dos escrituras de la misma nota deben llegar
+# al diario y publicarse en el mismo orden.
+FRANJAS_CERROJOS = 64
+
+
+class AlmacenamientoTexto(Almacenamiento):
+    """
+    Backend original: un archivo `<nombre>.txt` por nota.
+
+    Cada escritura se anota primero en un diario de escritura anticipada
+    (`.diario/escrituras.wal`, ver `DiarioEscrituras`) y después se publica de
+    forma atómica con un archivo temporal y `os.replace`, de modo que un corte
+    nunca deja una nota truncada y `recuperar()` reaplica lo que quedó a medias.
+    Con `diario=False` se conserva solo la publicación atómica.
+
+    Con `compresion` (`"zlib"` o `"lzma"`) las notas nuevas se guardan
+    comprimidas; las lecturas reconocen el formato de cada archivo (ver
+    `CompresionNotas`), así que una carpeta puede mezclar notas planas y
+    comprimidas con cualquier configuración.
+    """
+
+    def __init__(self, carpeta="notas", diario=True, compresion=None):
+        self.carpeta = carpeta
+        if not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        self.compresion = CompresionNotas(os.path.join(carpeta, ".compresion"), compresion)
+        self.diario = (
+            DiarioEscrituras(os.path.join(carpeta, ".diario", "escrituras.wal")) if diario else None
+        )
+        self._cerrojos = [threading.Lock() for _ in range(FRANJAS_CERROJOS)]
+
+    def ruta(self, nombre):
+        """Ruta del archivo de texto que almacena la nota indicada."""
+        return os.path.join(self.carpeta, f"{nombre}.txt")
+
+    def ruta_archivo(self, nombre):
+        return self.ruta(nombre)
+
+    def firma(self):
+        mtime = os.stat(self.carpeta).st_mtime_ns
+        if time.time_ns() - mtime < MARGEN_FIRMA_NS:
+            return None
+        return mtime
+
+    def entradas(self):
+        with os.scandir(self.carpeta) as entradas:
+            for entrada in entradas:
+                archivo = entrada.name
+                # Los `_bak.txt` son respaldos de versiones anteriores al historial.
+                if not archivo.endswith(".txt") or archivo.endswith("_bak.txt"):
+                    continue
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue
+                yield archivo[:-4], EstadoNota(estado.st_mtime_ns, estado.st_size)
+
+    def carpetas_vigiladas(self, desde=None):
+        return [self.carpeta] if desde is None else []
+
+    def nombre_en_ruta(self, ruta):
+        directorio, archivo = os.path.split(ruta)
+        if not archivo.endswith(".txt") or archivo.endswith("_bak.txt"):
+            return None
+        if os.path.normpath(directorio) != os.path.normpath(self.carpeta):
+            return None
+        return archivo[:-4]
+
+    def estado(self, nombre):
+        try:
+            estado = os.stat(self.ruta(nombre))
+        except FileNotFoundError:
+            return None
+        return EstadoNota(estado.st_mtime_ns, estado.st_size)
+
+    def existe(self, nombre):
+        return os.path.exists(self.ruta(nombre))
+
+    def leer(self, nombre):
+        with open(self.ruta(nombre), "rb") as archivo:
+            return self.compresion.descomprimir(archivo.read())
+
+    def leer_encabezado(self, nombre):
+        with open(self.ruta(nombre), "rb") as archivo:
+            inicio = archivo.read(len(MAGIA))
+            if inicio == MAGIA:
+                return self.compresion.descomprimir(inicio + archivo.read()).split("\n", 1)[0]
+            linea = (inicio + archivo.readline()).split(b"\n", 1)[0]
+        return linea.decode("utf-8").rstrip("\r")
+
+    def decodificador(self):
+        return self.compresion.descomprimir
+
+    def entrenar_diccionario(self, muestras=1000):
+        """
+        Entrena el diccionario de compresión compartido con hasta `muestras`
+        notas existentes y lo activa para las notas nuevas. Devuelve su
+        identificador o `None` si no hay notas.
+        """
+        textos = []
+        for nombre, _ in self.entradas():
+            if len(textos) >= muestras:
+                break
+            try:
+                textos.append(self.leer(nombre))
+            except OSError:
+                continue
+        if not textos:
+            return None
+        return self.compresion.entrenar(textos)
+
+    def _cerrojos_de(self, nombres):
+        franjas = sorted({zlib.crc32(nombre.encode("utf-8")) % FRANJAS_CERROJOS for nombre in nombres})
+        return [self._cerrojos[franja] for franja in franjas]
+
+    def escribir(self, nombre, texto):
+        return self.escribir_lote([(nombre, texto)])[0]
+
+    def escribir_lote(self, notas):
+        """
+        Anota el lote en el diario con una sola sincronización y publica cada
+        nota con `os.replace`, así un fallo a mitad de lote nunca deja notas
+        truncadas. Las notas cuya publicación falló se anulan en el diario.
+        """
+        notas = list(notas)
+        cerrojos = self._cerrojos_de(nombre for nombre, _ in notas)
+        for cerrojo in cerrojos:
+            cerrojo.acquire()
+        try:
+            secuencias = []
+            if self.diario is not None:
+                secuencias = self.diario.registrar(
+                    [{"op": "escribir", "nombre": nombre, "texto": texto} for nombre, texto in notas]
+                )
+            estados = []
+            try:
+                for nombre, texto in notas:
+                    estados.append(self._escribir_atomico(nombre, texto))
+            except BaseException:
+                if self.diario is not None:
+                    self.diario.descartar(secuencias[len(estados):])
+                raise
+            finally:
+                if self.diario is not None:
+                    publicadas = notas[:len(estados)]
+                    self.diario.confirmar(
+                        secuencias[:len(estados)], [self.ruta(nombre) for nombre, _ in publicadas]
+                    )
+            return estados
+        finally:
+            for cerrojo in reversed(cerrojos):
+                cerrojo.release()
+
+    def _escribir_atomico(self, nombre, texto):
+        ruta = self.ruta(nombre)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporal, "wb") as archivo:
+                archivo.write(self.compresion.comprimir(texto))
+            os.replace(temporal, ruta)
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        estado = os.stat(ruta)
+        return EstadoNota(estado.st_mtime_ns, estado.st_size)
+
+    def eliminar(self, nombre):
+        (cerrojo,) = self._cerrojos_de([nombre])
+        with cerrojo:
+            secuencias = []
+            if self.diario is not None:
+                secuencias = self.diario.registrar([{"op": "eliminar", "nombre": nombre}])
+            try:
+                os.remove(self.ruta(nombre))
+            except BaseException:
+                if self.diario is not None:
+                    self.diario.descartar(secuencias)
+                raise
+            if self.diario is not None:
+                self.diario.confirmar(secuencias, [self.ruta(nombre)])
+
+    def recuperar(self):
+        """
+        Reaplica las escrituras y borrados del diario que no llegaron a
+        publicarse (por ejemplo, tras un corte) y lo vacía. Las escrituras en
+        vuelo de otro proceso abierto sobre la carpeta no se tocan. Solo se
+        reescriben las notas cuyo contenido difiere del registrado. Devuelve
+        cuántas notas se corrigieron.
+        """
+        if self.diario is None:
+            return 0
+        return len(self.diario.recuperar(self._reaplicar))
+
+    def _reaplicar(self, registros):
+        ultimos = {}
+        for registro in registros:
+            ultimos[registro["nombre"]] = registro
+        corregidas = []
+        for nombre, registro in ultimos.items():
+            ruta = self.ruta(nombre)
+            if registro["op"] == "eliminar":
+                if self.existe(nombre):
+                    os.remove(ruta)
+                    corregidas.append(ruta)
+                continue
+            try:
+                actual = self.leer(nombre)
+            except FileNotFoundError:
+                actual = None
+            if actual != registro["texto"]:
+                self._escribir_atomico(nombre, registro["texto"])
+                corregidas.append(ruta)
+        return corregidas
+
+    def cerrar(self):
+        if self.diario is not None:
+            self.diario.cerrar()
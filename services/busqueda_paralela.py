@@ -0,0 +1,164 @@
+import codecs
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+
+from services.compresion import MAGIA
+
+TAMANO_BLOQUE = 1024 * 1024
+
+
+class Comparador:
+    """
+    Busca una subcadena sin distinguir mayúsculas leyendo cada archivo en
+    bloques de `tamano_bloque` bytes sobre un único búfer reutilizado.
+
+    No se crean copias en minúsculas: la comparación usa una expresión
+    regular con `IGNORECASE`. Si la palabra es ASCII se busca directamente en
+    los bytes, sin decodificar; en otro caso se decodifica UTF-8 de forma
+    incremental. Las coincidencias que cruzan dos bloques se comprueban sobre
+    la unión del final de uno y el principio del siguiente.
+
+    Los archivos comprimidos (los que empiezan por `compresion.MAGIA`) se leen
+    enteros y se convierten en texto con `decodificar`, la función que ofrece
+    el backend con `decodificador()`.
+    """
+
+    def __init__(self, palabra, tamano_bloque=TAMANO_BLOQUE, decodificar=None):
+        self.binario = palabra.isascii()
+        self.patron_texto = re.compile(re.escape(palabra), re.IGNORECASE)
+        if self.binario:
+            self.patron = re.compile(re.escape(palabra.encode("ascii")), re.IGNORECASE)
+        else:
+            self.patron = self.patron_texto
+        self.solape = max(len(palabra) - 1, 0)
+        self.decodificar = decodificar
+        self._bufer = bytearray(tamano_bloque)
+
+    def contiene(self, ruta):
+        with open(ruta, "rb", buffering=0) as archivo:
+            bloques = self._bloques(archivo)
+            primero = next(bloques, None)
+            if primero is None:
+                return self.patron_texto.search("") is not None
+            if self.decodificar is not None and primero[:len(MAGIA)] == MAGIA:
+                texto = self.decodificar(bytes(primero) + archivo.read())
+                return self.patron_texto.search(texto) is not None
+            bloques = chain([primero], bloques)
+            if self.binario:
+                return self._buscar(bloques)
+            decodificador = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            return self._buscar(decodificador.decode(bloque) for bloque in bloques)
+
+    def _bloques(self, archivo):
+        vista = memoryview(self._bufer)
+        while True:
+            leidos = archivo.readinto(vista)
+            if not leidos:
+                return
+            yield vista[:leidos]
+
+    def _buscar(self, bloques):
+        cola = None
+        for bloque in bloques:
+            if self.patron.search(bloque):
+                return True
+            if not self.solape:
+                continue
+            cabeza, final = bloque[:self.solape], bloque[-self.solape:]
+            if self.binario:
+                # Las vistas del búfer se sobrescriben con el siguiente bloque.
+                cabeza, final = bytes(cabeza), bytes(final)
+            if cola is not None and self.patron.search(cola + cabeza):
+                return True
+            cola = final
+        return False
+
+
+def coincidencias(tareas, palabra, tamano_bloque=TAMANO_BLOQUE, decodificar=None):
+    """Produce el nombre de cada par `(nombre, ruta)` cuyo archivo contiene `palabra`."""
+    comparador = Comparador(palabra, tamano_bloque, decodificar)
+    for nombre, ruta in tareas:
+        try:
+            if comparador.contiene(ruta):
+                yield nombre
+        except OSError:
+            # Igual que en el recorrido secuencial, un archivo ilegible no detiene la búsqueda.
+            continue
+
+
+def _buscar_en_particion(tareas, palabra, tamano_bloque, limite, decodificar):
+    return list(islice(coincidencias(tareas, palabra, tamano_bloque, decodificar), limite))
+
+
+class BuscadorParalelo:
+    """
+    Recorrido de búsqueda repartido entre `procesos` procesos (por omisión,
+    uno por núcleo).
+
+    La lista de archivos se divide en particiones de como mucho
+    `tamano_particion` notas que se reparten entre los procesos, y las
+    coincidencias se entregan en cuanto termina cada partición. Con `limite`
+    el recorrido se detiene al alcanzarlo y las particiones aún no iniciadas
+    se cancelan. Las listas pequeñas se recorren en el propio proceso porque
+    arrancar el pool cuesta más que leerlas. El pool se conserva entre
+    búsquedas hasta `cerrar()`.
+    """
+
+    def __init__(self, procesos=None, tamano_particion=256, tamano_bloque=TAMANO_BLOQUE):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_particion = tamano_particion
+        self.tamano_bloque = tamano_bloque
+        self._pool = None
+
+    def buscar(self, tareas, palabra, limite=None, decodificar=None):
+        """
+        Produce los nombres de `tareas` (pares `(nombre, ruta)`) cuyo archivo
+        contiene `palabra`; `decodificar` interpreta los archivos comprimidos.
+        """
+        tareas = list(tareas)
+        if self.procesos == 1 or len(tareas) <= self.tamano_particion:
+            yield from islice(coincidencias(tareas, palabra, self.tamano_bloque, decodificar), limite)
+            return
+        try:
+            pool = self._obtener_pool()
+        except OSError:
+            yield from islice(coincidencias(tareas, palabra, self.tamano_bloque, decodificar), limite)
+            return
+
+        # Varias particiones por proceso para que ninguno se quede ocioso al final.
+        tamano = max(1, min(self.tamano_particion, -(-len(tareas) // (self.procesos * 4))))
+        futuros = [
+            pool.submit(
+                _buscar_en_particion, tareas[inicio:inicio + tamano], palabra, self.tamano_bloque, limite, decodificar
+            )
+            for inicio in range(0, len(tareas), tamano)
+        ]
+        entregados = 0
+        try:
+            for futuro in as_completed(futuros):
+                try:
+                    encontrados = futuro.result()
+                except BrokenProcessPool:
+                    self.cerrar()
+                    raise OSError("El proceso de búsqueda terminó de forma inesperada.")
+                for nombre in encontrados:
+                    yield nombre
+                    entregados += 1
+                    if limite is not None and entregados >= limite:
+                        return
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        return self._pool
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+
+class CacheLectura:
+    """
+    Caché LRU acotada por bytes para el texto de las notas.
+
+    Cada entrada se guarda junto con el `EstadoNota` (mtime y tamaño) con el
+    que se leyó; `obtener` solo la devuelve si el estado actual coincide, de
+    modo que las modificaciones hechas fuera del servicio invalidan la entrada
+    automáticamente. Los contadores de aciertos, fallos y expulsiones permiten
+    ajustar `capacidad_bytes`; con capacidad 0 la caché queda desactivada.
+    """
+
+    def __init__(self, capacidad_bytes=16 * 1024 * 1024):
+        self.capacidad_bytes = capacidad_bytes
+        self.bytes_ocupados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.invalidaciones = 0
+        self._entradas = OrderedDict()
+        self._bloqueo = threading.Lock()
+
+    def obtener(self, clave, estado):
+        """Devuelve el valor vigente para `clave` o `None` si falta o está desactualizado."""
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            estado_guardado, valor, tamano = entrada
+            if estado_guardado != estado:
+                del self._entradas[clave]
+                self.bytes_ocupados -= tamano
+                self.invalidaciones += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, estado, valor, tamano):
+        """Añade o reemplaza una entrada y expulsa las menos usadas si hace falta."""
+        if tamano > self.capacidad_bytes:
+            return
+        with self._bloqueo:
+            previa = self._entradas.pop(clave, None)
+            if previa is not None:
+                self.bytes_ocupados -= previa[2]
+            self._entradas[clave] = (estado, valor, tamano)
+            self.bytes_ocupados += tamano
+            while self.bytes_ocupados > self.capacidad_bytes:
+                _, (_, _, liberado) = self._entradas.popitem(last=False)
+                self.bytes_ocupados -= liberado
+                self.expulsiones += 1
+
+    def invalidar(self, clave):
+        """Descarta la entrada de una nota modificada o eliminada."""
+        with self._bloqueo:
+            entrada = self._entradas.pop(clave, None)
+            if entrada is not None:
+                self.bytes_ocupados -= entrada[2]
+                self.invalidaciones += 1
+
+    def limpiar(self):
+        """Vacía la caché sin reiniciar los contadores."""
+        with self._bloqueo:
+            self._entradas.clear()
+            self.bytes_ocupados = 0
+
+    def estadisticas(self):
+        """Resumen de uso para ajustar el tamaño de la caché."""
+        with self._bloqueo:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.bytes_ocupados,
+                "capacidad_bytes": self.capacidad_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
@@ -0,0 +1,181 @@
+import os
+import pickle
+import time
+
+from models.nota import marca_desde_fecha
+from services.indice_fechas import IndiceFechas
+
+
+class CatalogoNotas:
+    """
+    Catálogo en memoria con los metadatos de cada nota (fecha, tamaño y mtime).
+
+    Permite que `listar` y `contar` respondan sin recorrer la carpeta. La
+    vigencia se comprueba como mucho una vez cada `intervalo_verificacion`
+    segundos comparando la firma del almacenamiento, y solo si cambió se
+    recorren las entradas, reutilizando las que conservan mtime y tamaño
+    (obtenidos con `os.scandir`, sin abrir las notas).
+
+    Con SQLite la firma cambia con cualquier edición (`firma_cubre_ediciones`).
+    En los backends de archivos es el mtime de la carpeta, que cambia con las
+    altas y bajas pero no al reescribir una nota en su sitio: por eso `cargar`
+    compara todas las entradas al arrancar, pero mientras el servicio sigue
+    abierto una edición externa en su sitio no se ve hasta el siguiente
+    arranque, un evento del vigilante (`GestorNotas.vigilar`) o un
+    `sincronizar(forzar=True)` (`GestorNotas.resincronizar`). El catálogo se
+    guarda como instantánea para que el siguiente arranque solo tenga que leer
+    el encabezado de las notas nuevas o modificadas.
+
+    Cada entrada guarda también la fecha como `marca` (segundos desde la
+    época). `fechas()` ofrece sobre ellas un `IndiceFechas` que se construye
+    la primera vez que se pide y que `actualizar` y `eliminar` mantienen.
+    """
+
+    def __init__(
+        self,
+        ruta_instantanea,
+        obtener_firma,
+        recorrer_entradas,
+        leer_fecha,
+        firma_tras_cambio=None,
+        firma_cubre_ediciones=False,
+        intervalo_verificacion=1.0,
+        limite_cambios=1000,
+    ):
+        self.ruta_instantanea = ruta_instantanea
+        self.obtener_firma = obtener_firma
+        self.recorrer_entradas = recorrer_entradas
+        self.leer_fecha = leer_fecha
+        self.firma_tras_cambio = firma_tras_cambio
+        self.firma_cubre_ediciones = firma_cubre_ediciones
+        self.intervalo_verificacion = intervalo_verificacion
+        self.limite_cambios = limite_cambios
+        self.entradas = {}
+        self.firma = None
+        self._fechas = None
+        self._ultima_verificacion = 0.0
+        self._cambios_sin_guardar = 0
+
+    def cargar(self):
+        """Recupera la instantánea previa y la concilia con la carpeta."""
+        if os.path.exists(self.ruta_instantanea):
+            try:
+                with open(self.ruta_instantanea, "rb") as archivo:
+                    datos = pickle.load(archivo)
+                self.entradas = datos.get("entradas", {})
+                self.firma = datos.get("firma")
+            except (OSError, pickle.PickleError, EOFError, AttributeError):
+                self.entradas = {}
+                self.firma = None
+            self._fechas = None
+        # Con el servicio cerrado nadie vio las ediciones en su sitio.
+        return self.sincronizar(forzar=not self.firma_cubre_ediciones)
+
+    def sincronizar(self, forzar=False):
+        """
+        Recorre el almacenamiento (salvo que la firma no haya cambiado y no se
+        pida `forzar`) y reutiliza las entradas cuyo mtime y tamaño siguen
+        coincidiendo. Devuelve si alguna nota apareció, cambió o desapareció.
+        """
+        self._ultima_verificacion = time.monotonic()
+        firma = self.obtener_firma()
+        if not forzar and firma is not None and firma == self.firma:
+            return False
+
+        entradas = {}
+        cambios = False
+        for nombre, estado in self.recorrer_entradas():
+            previa = self.entradas.get(nombre)
+            if (
+                previa is not None
+                and previa["mtime"] == estado.mtime
+                and previa["tamano"] == estado.tamano
+            ):
+                entradas[nombre] = previa
+                continue
+            entradas[nombre] = _entrada(self.leer_fecha(nombre, estado), estado)
+            cambios = True
+        # Sin altas ni cambios, solo queda ver si faltan notas.
+        cambios = cambios or len(entradas) != len(self.entradas)
+        self.firma = firma
+        if not cambios:
+            return False
+        self.entradas = entradas
+        self._fechas = None
+        self.guardar_instantanea()
+        return True
+
+    def verificar(self):
+        """Sincroniza solo si pasó el intervalo mínimo desde la última comprobación."""
+        if time.monotonic() - self._ultima_verificacion >= self.intervalo_verificacion:
+            return self.sincronizar()
+        return False
+
+    def actualizar(self, nombre, fecha, estado):
+        """Registra el alta o modificación de una nota hecha por el servicio."""
+        entrada = self.entradas[nombre] = _entrada(fecha, estado)
+        if self._fechas is not None:
+            self._fechas.actualizar(nombre, entrada["marca"])
+        self._registrar_cambio(nombre)
+
+    def eliminar(self, nombre):
+        """Quita una nota del catálogo."""
+        if self.entradas.pop(nombre, None) is not None:
+            if self._fechas is not None:
+                self._fechas.eliminar(nombre)
+            self._registrar_cambio(nombre)
+
+    def fechas(self):
+        """Índice por fecha de las entradas actuales (ver `IndiceFechas`)."""
+        if self._fechas is None:
+            pares = []
+            for nombre, datos in self.entradas.items():
+                if "marca" not in datos:
+                    # Instantáneas anteriores al índice por fecha.
+                    datos["marca"] = marca_desde_fecha(datos["fecha"])
+                if datos["marca"] is not None:
+                    pares.append((datos["marca"], nombre))
+            self._fechas = IndiceFechas(pares)
+        return self._fechas
+
+    def _registrar_cambio(self, nombre):
+        # Tras un cambio propio la firma nueva ya está reflejada en memoria.
+        try:
+            if self.firma_tras_cambio is not None:
+                self.firma = self.firma_tras_cambio(nombre, self.firma)
+            else:
+                self.firma = self.obtener_firma()
+        except OSError:
+            self.firma = None
+        self._cambios_sin_guardar += 1
+        if self._cambios_sin_guardar >= self.limite_cambios:
+            self.guardar_instantanea()
+
+    def guardar_instantanea(self):
+        """Persiste el catálogo de forma atómica (archivo temporal + renombrado)."""
+        try:
+            os.makedirs(os.path.dirname(self.ruta_instantanea) or ".", exist_ok=True)
+            temporal = f"{self.ruta_instantanea}.tmp"
+            with open(temporal, "wb") as archivo:
+                pickle.dump(
+                    {
+                        "firma": self.firma,
+                        "entradas": self.entradas,
+                    },
+                    archivo,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(temporal, self.ruta_instantanea)
+        except (OSError, pickle.PickleError):
+            return False
+        self._cambios_sin_guardar = 0
+        return True
+
+
+def _entrada(fecha, estado):
+    return {
+        "fecha": fecha,
+        "marca": marca_desde_fecha(fecha),
+        "tamano": estado.tamano,
+        "mtime": estado.mtime,
+    }
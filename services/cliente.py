@@ -0,0 +1,151 @@
+import functools
+import http.client
+import itertools
+import json
+import socket
+from urllib.parse import urlsplit
+
+from services import jsonrpc
+
+
+class ClienteNotas:
+    """
+    Cliente síncrono y ligero de `services.servidor.ServidorNotas`.
+
+    Se conecta por el socket Unix (`ruta_socket`) o por HTTP local (`url`,
+    por ejemplo `"http://127.0.0.1:8765/"`) y mantiene la conexión abierta
+    entre llamadas. Cada orden del servidor está disponible como método:
+    `cliente.crear("nombre", "contenido")`, `cliente.listar(orden="desc",
+    limite=10)` o `cliente.stats()`, y devuelve el mismo `(exito, resultado)`
+    que la orden en el servidor. Los errores de protocolo (método
+    inexistente, parámetros no válidos, fallo interno) se lanzan como
+    `jsonrpc.ErrorRemoto`, y los de conexión como `OSError`.
+
+    Una instancia no debe compartirse entre hilos; cada hilo puede abrir la
+    suya contra el mismo servidor.
+    """
+
+    def __init__(self, ruta_socket=None, url=None, tiempo_limite=60.0):
+        if (ruta_socket is None) == (url is None):
+            raise ValueError("Indique ruta_socket o url, pero no ambos.")
+        self.ruta_socket = ruta_socket
+        self.url = url
+        self.tiempo_limite = tiempo_limite
+        self._ids = itertools.count(1)
+        self._socket = None
+        self._lector = None
+        self._http = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __getattr__(self, metodo):
+        if metodo.startswith("_"):
+            raise AttributeError(metodo)
+        return functools.partial(self.llamar, metodo)
+
+    def llamar(self, metodo, *posicionales, **argumentos):
+        """Ejecuta una orden en el servidor y devuelve su `(exito, resultado)`."""
+        return jsonrpc.interpretar(self._enviar([self._peticion(metodo, posicionales, argumentos)])[0])
+
+    def lote(self, llamadas):
+        """
+        Envía `llamadas` (pares `(metodo, argumentos)`) como un único lote
+        JSON-RPC, que el servidor ejecuta en paralelo. Devuelve un
+        `(exito, resultado)` por llamada, en el mismo orden.
+        """
+        peticiones = [self._peticion(metodo, (), argumentos or {}) for metodo, argumentos in llamadas]
+        if not peticiones:
+            return []
+        respuestas = self._recibir_lote(self._enviar([peticiones])[0])
+        por_id = {respuesta.get("id"): respuesta for respuesta in respuestas}
+        return [jsonrpc.interpretar(por_id[peticion["id"]]) for peticion in peticiones]
+
+    def canalizar(self, llamadas, ventana=64):
+        """
+        Como `lote`, pero envía cada llamada como una petición independiente
+        sin esperar las respuestas, de `ventana` en `ventana`, y el servidor
+        las ejecuta en orden. Sobre HTTP cada ventana viaja como un lote.
+        """
+        llamadas = list(llamadas)
+        resultados = []
+        for inicio in range(0, len(llamadas), ventana):
+            tramo = llamadas[inicio:inicio + ventana]
+            if self.url is not None:
+                resultados.extend(self.lote(tramo))
+                continue
+            peticiones = [self._peticion(metodo, (), argumentos or {}) for metodo, argumentos in tramo]
+            resultados.extend(jsonrpc.interpretar(respuesta) for respuesta in self._enviar(peticiones))
+        return resultados
+
+    def cerrar(self):
+        """Cierra la conexión con el servidor."""
+        if self._lector is not None:
+            self._lector.close()
+            self._lector = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _peticion(self, metodo, posicionales, argumentos):
+        if posicionales and argumentos:
+            raise ValueError("JSON-RPC no admite mezclar parámetros por posición y por nombre.")
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": metodo,
+            "params": list(posicionales) if posicionales else argumentos,
+        }
+
+    def _recibir_lote(self, respuestas):
+        if isinstance(respuestas, dict):
+            # El servidor rechazó el lote entero (por ejemplo, JSON no válido).
+            jsonrpc.interpretar(respuestas)
+        return respuestas
+
+    def _enviar(self, mensajes):
+        """Envía cada mensaje y devuelve sus respuestas en el mismo orden."""
+        if self.url is not None:
+            return [self._enviar_http(mensaje) for mensaje in mensajes]
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.tiempo_limite)
+            self._socket.connect(self.ruta_socket)
+            self._lector = self._socket.makefile("rb")
+        try:
+            self._socket.sendall(b"".join(jsonrpc.serializar(mensaje) + b"\n" for mensaje in mensajes))
+            respuestas = []
+            for _ in mensajes:
+                linea = self._lector.readline()
+                if not linea:
+                    raise ConnectionError("El servidor cerró la conexión.")
+                respuestas.append(json.loads(linea))
+            return respuestas
+        except OSError:
+            # Tras un corte a medias no se sabe qué respuestas quedan por leer.
+            self.cerrar()
+            raise
+
+    def _enviar_http(self, mensaje):
+        if self._http is None:
+            partes = urlsplit(self.url)
+            self._http = http.client.HTTPConnection(partes.hostname, partes.port, timeout=self.tiempo_limite)
+        cuerpo = jsonrpc.serializar(mensaje)
+        try:
+            self._http.request(
+                "POST", urlsplit(self.url).path or "/", cuerpo, {"Content-Type": "application/json"}
+            )
+            respuesta = self._http.getresponse()
+            datos = respuesta.read()
+        except (OSError, http.client.HTTPException):
+            self.cerrar()
+            raise
+        if respuesta.status != 200:
+            raise ConnectionError(f"El servidor respondió HTTP {respuesta.status}.")
+        return json.loads(datos)
@@ -0,0 +1,165 @@
+import lzma
+import os
+import re
+import struct
+import zlib
+from collections import Counter
+
+# Cabecera de las notas comprimidas. Una nota en texto plano empieza por
+# "Fecha: ", así que el byte nulo inicial basta para distinguir ambos formatos.
+MAGIA = b"\x00NZ"
+METODO_ZLIB = b"z"
+METODO_ZLIB_DICCIONARIO = b"d"
+METODO_LZMA = b"x"
+IDENTIFICADOR_DICCIONARIO = struct.Struct("<I")
+
+METODOS_COMPRESION = ("zlib", "lzma")
+
+# zlib solo aprovecha los últimos 32 KiB del diccionario prefijado.
+TAMANO_MAXIMO_DICCIONARIO = 32 * 1024
+# Por debajo de este tamaño el diccionario compartido comprime mejor que el método elegido.
+LIMITE_NOTA_PEQUENA = 4 * 1024
+# Las notas diminutas no compensan la cabecera.
+TAMANO_MINIMO = 64
+
+_FRAGMENTOS = re.compile(r"\w+\W{0,3}")
+
+
+def entrenar_diccionario(textos, tamano=TAMANO_MAXIMO_DICCIONARIO):
+    """
+    Construye un diccionario prefijado para zlib a partir de notas de muestra.
+
+    zlib no incluye un entrenador, así que se eligen las palabras (con la
+    puntuación y el espacio que las siguen) y las líneas cortas que aparecen
+    en más notas, ponderadas por su longitud. Las más útiles van al final,
+    donde las referencias de zlib son más cortas.
+    """
+    frecuencias = Counter()
+    for texto in textos:
+        fragmentos = set(_FRAGMENTOS.findall(texto))
+        fragmentos.update(linea for linea in texto.splitlines(keepends=True) if len(linea) <= 80)
+        frecuencias.update(fragmentos)
+
+    elegidos = []
+    ocupado = 0
+    candidatos = sorted(
+        ((cuenta - 1) * len(fragmento.encode("utf-8")), fragmento)
+        for fragmento, cuenta in frecuencias.items()
+        if cuenta > 1
+    )
+    for _, fragmento in reversed(candidatos):
+        tamano_fragmento = len(fragmento.encode("utf-8"))
+        if ocupado + tamano_fragmento > tamano:
+            continue
+        elegidos.append(fragmento)
+        ocupado += tamano_fragmento
+    return "".join(reversed(elegidos)).encode("utf-8")
+
+
+def _escribir_atomico(ruta, contenido):
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+
+class CompresionNotas:
+    """
+    Codifica y decodifica el contenido de las notas en disco.
+
+    El formato se describe a sí mismo: una nota comprimida empieza por
+    `MAGIA` seguida del método (`z` zlib, `d` zlib con diccionario compartido
+    y su identificador, `x` lzma); cualquier otro contenido es UTF-8 plano.
+    Por eso `descomprimir` acepta carpetas mezcladas aunque `metodo` sea
+    `None`, y cambiar de método no obliga a reescribir las notas existentes.
+
+    Los diccionarios entrenados con `entrenar` se guardan en `carpeta` como
+    `<id>.dic` (el id es su CRC32) y `activo` apunta al que usan las notas
+    nuevas. Las notas pequeñas se comprimen con ese diccionario, que es donde
+    zlib o lzma solos apenas ganan nada.
+    """
+
+    def __init__(self, carpeta, metodo=None, nivel=6):
+        if metodo not in (None, *METODOS_COMPRESION):
+            raise ValueError(f"Método de compresión desconocido: {metodo}")
+        self.carpeta = carpeta
+        self.metodo = metodo
+        self.nivel = nivel
+        self._diccionarios = {}
+        self.diccionario_activo = self._leer_activo() if metodo else None
+
+    def _ruta_diccionario(self, identificador):
+        return os.path.join(self.carpeta, f"{identificador:08x}.dic")
+
+    def _leer_activo(self):
+        try:
+            with open(os.path.join(self.carpeta, "activo"), "r", encoding="utf-8") as archivo:
+                return int(archivo.read().strip(), 16)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _diccionario(self, identificador):
+        diccionario = self._diccionarios.get(identificador)
+        if diccionario is None:
+            try:
+                with open(self._ruta_diccionario(identificador), "rb") as archivo:
+                    diccionario = archivo.read()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Falta el diccionario de compresión {identificador:08x}.") from None
+            self._diccionarios[identificador] = diccionario
+        return diccionario
+
+    def entrenar(self, textos, tamano=TAMANO_MAXIMO_DICCIONARIO):
+        """Entrena un diccionario con `textos`, lo guarda y lo activa. Devuelve su identificador."""
+        diccionario = entrenar_diccionario(textos, tamano)
+        identificador = zlib.crc32(diccionario)
+        os.makedirs(self.carpeta, exist_ok=True)
+        _escribir_atomico(self._ruta_diccionario(identificador), diccionario)
+        _escribir_atomico(os.path.join(self.carpeta, "activo"), f"{identificador:08x}".encode("ascii"))
+        self._diccionarios[identificador] = diccionario
+        self.diccionario_activo = identificador
+        return identificador
+
+    def comprimir(self, texto):
+        """Devuelve los bytes que se guardan en disco; texto plano si comprimir no ahorra espacio."""
+        datos = texto.encode("utf-8")
+        if self.metodo is None or len(datos) < TAMANO_MINIMO:
+            return datos
+        if self.diccionario_activo is not None and len(datos) < LIMITE_NOTA_PEQUENA:
+            compresor = zlib.compressobj(self.nivel, wbits=-15, zdict=self._diccionario(self.diccionario_activo))
+            cabecera = METODO_ZLIB_DICCIONARIO + IDENTIFICADOR_DICCIONARIO.pack(self.diccionario_activo)
+            comprimidos = cabecera + compresor.compress(datos) + compresor.flush()
+        elif self.metodo == "lzma":
+            comprimidos = METODO_LZMA + lzma.compress(datos, format=lzma.FORMAT_XZ, preset=self.nivel)
+        else:
+            compresor = zlib.compressobj(self.nivel, wbits=-15)
+            comprimidos = METODO_ZLIB + compresor.compress(datos) + compresor.flush()
+        if len(MAGIA) + len(comprimidos) >= len(datos):
+            return datos
+        return MAGIA + comprimidos
+
+    def descomprimir(self, datos):
+        """Devuelve el texto de una nota guardada con cualquier método (o sin comprimir)."""
+        if not datos.startswith(MAGIA):
+            texto = datos.decode("utf-8")
+            if "\r" in texto:
+                # Mismo resultado que leer en modo texto con saltos de línea universales.
+                texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+            return texto
+        metodo = datos[len(MAGIA):len(MAGIA) + 1]
+        cuerpo = memoryview(datos)[len(MAGIA) + 1:]
+        try:
+            if metodo == METODO_ZLIB:
+                return zlib.decompress(cuerpo, wbits=-15).decode("utf-8")
+            if metodo == METODO_ZLIB_DICCIONARIO:
+                (identificador,) = IDENTIFICADOR_DICCIONARIO.unpack_from(cuerpo)
+                descompresor = zlib.decompressobj(wbits=-15, zdict=self._diccionario(identificador))
+                return (
+                    descompresor.decompress(cuerpo[IDENTIFICADOR_DICCIONARIO.size:]) + descompresor.flush()
+                ).decode("utf-8")
+            if metodo == METODO_LZMA:
+                return lzma.decompress(cuerpo).decode("utf-8")
+        except (zlib.error, lzma.LZMAError, struct.error) as error:
+            # Se expone como error de E/S, igual que el resto de fallos del almacenamiento.
+            raise OSError(f"Nota comprimida dañada: {error}") from error
+        raise OSError(f"Método de compresión desconocido en la nota: {metodo!r}")
@@ -0,0 +1,346 @@
+import functools
+import glob
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin cerrojo entre procesos.
+    fcntl = None
+
+# Cabecera de cada registro: longitud de la carga, CRC32 de la carga y secuencia.
+CABECERA = struct.Struct("<IIQ")
+
+# Por encima de estas notas publicadas a la vez, un único `syncfs` del sistema
+# de archivos de la carpeta sale más barato que sincronizar cada archivo y su carpeta.
+LIMITE_SINCRONIZACION_INDIVIDUAL = 256
+
+
+def _sincronizar_descriptor(descriptor):
+    sincronizar = getattr(os, "fdatasync", os.fsync)
+    sincronizar(descriptor)
+
+
+@functools.lru_cache(maxsize=None)
+def _cargar_syncfs():
+    # `ctypes` solo se importa si llega a hacer falta.
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+
+
+def _sincronizar_sistema_archivos(ruta):
+    """
+    Fuerza a disco el sistema de archivos que contiene `ruta` con `syncfs`
+    (Linux), sin tocar los demás del equipo. Devuelve si pudo hacerse.
+    """
+    syncfs = _cargar_syncfs()
+    if syncfs is None:
+        return False
+    descriptor = os.open(ruta, os.O_RDONLY)
+    try:
+        return syncfs(descriptor) == 0
+    finally:
+        os.close(descriptor)
+
+
+def _sincronizar_rutas(rutas):
+    carpetas = {os.path.dirname(ruta) or "." for ruta in rutas}
+    for ruta in (*rutas, *carpetas):
+        try:
+            descriptor = os.open(ruta, os.O_RDONLY)
+        except OSError:
+            # Nota ya borrada, o carpeta que el sistema no deja abrir (Windows).
+            continue
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+
+def _hacer_durables(rutas, carpeta):
+    """Fuerza a disco las notas de `rutas` y sus carpetas (o todo el sistema de archivos de `carpeta`)."""
+    if len(rutas) <= LIMITE_SINCRONIZACION_INDIVIDUAL or not _sincronizar_sistema_archivos(carpeta):
+        _sincronizar_rutas(rutas)
+
+
+class DiarioEscrituras:
+    """
+    Registro de escritura anticipada (WAL) para el backend de texto.
+
+    Antes de publicar una nota se añade al diario un registro con su texto
+    completo (o con su borrado) y se espera a que sea durable. Las esperas se
+    agrupan: el primer hilo que necesita sincronizar hace un solo `fdatasync`
+    que cubre todos los registros añadidos hasta ese momento, y el resto de
+    hilos de la ráfaga solo espera a que termine (group commit). `espera_grupo`
+    añade una pausa opcional para reunir más registros por sincronización.
+    Tras publicar, la nota y su carpeta se fuerzan a disco antes de marcar el
+    registro como publicado, así que una marca nunca sobrevive a un corte que
+    se llevó la nota.
+
+    Cada registro lleva longitud, CRC32 y número de secuencia, así que una cola
+    truncada por un corte se detecta y se ignora. Varios procesos pueden
+    compartir el diario (la línea de órdenes junto a `servir`): cada registro
+    lleva el `origen` de la instancia que lo escribió, porque cada una numera
+    sus secuencias por su cuenta, y las escrituras al diario, la recuperación y
+    el vaciado se hacen bajo un cerrojo `fcntl.flock` sobre el archivo. Cada
+    instancia mantiene además bloqueado `<origen>.vivo` junto al diario, y la
+    recuperación solo toca los registros de orígenes que ya no lo bloquean.
+    Cuando ningún proceso tiene escrituras en vuelo y el diario supera
+    `limite_bytes`, el diario se vacía (punto de control).
+    """
+
+    def __init__(self, ruta, espera_grupo=0.0, limite_bytes=4 * 1024 * 1024):
+        self.ruta = ruta
+        self.espera_grupo = espera_grupo
+        self.limite_bytes = limite_bytes
+        self.carpeta = os.path.dirname(ruta) or "."
+        os.makedirs(self.carpeta, exist_ok=True)
+        self._origen = os.urandom(8).hex()
+        self._secuencia = 0
+        self._durable = 0
+        self._archivo = open(ruta, "ab")
+        self._bloqueo = threading.Lock()
+        self._condicion = threading.Condition()
+        self._sincronizando = False
+        self._pendientes = 0
+        self.sincronizaciones = 0
+        self._vivo = None
+        if fcntl is not None:
+            # Se crea bajo el cerrojo del diario para que ninguna recuperación
+            # lo tome por abandonado antes de bloquearlo.
+            with self._exclusivo():
+                self._vivo = os.open(self._ruta_vivo(self._origen), os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._vivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _ruta_vivo(self, origen):
+        return os.path.join(self.carpeta, f"{origen}.vivo")
+
+    @contextmanager
+    def _exclusivo(self):
+        # Cerrojo entre procesos. `flock` no excluye a los hilos que comparten
+        # el descriptor, así que siempre se toma ya dentro de `_bloqueo`.
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+
+    def _origenes_vivos(self):
+        """
+        Orígenes cuya instancia sigue abierta en algún proceso; retira los
+        `.vivo` abandonados. Requiere el cerrojo entre procesos.
+        """
+        vivos = {self._origen}
+        if fcntl is None:
+            return vivos
+        for ruta in glob.glob(os.path.join(glob.escape(self.carpeta), "*.vivo")):
+            origen = os.path.basename(ruta)[:-len(".vivo")]
+            if origen == self._origen:
+                continue
+            try:
+                descriptor = os.open(ruta, os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                vivos.add(origen)
+            else:
+                # Su proceso terminó sin cerrar el diario.
+                os.remove(ruta)
+            finally:
+                os.close(descriptor)
+        return vivos
+
+    def _recorrer(self):
+        """Produce pares `(secuencia, registro)` hasta el primer registro incompleto o dañado."""
+        try:
+            with open(self.ruta, "rb") as archivo:
+                datos = archivo.read()
+        except FileNotFoundError:
+            return
+        posicion = 0
+        while posicion + CABECERA.size <= len(datos):
+            longitud, crc, secuencia = CABECERA.unpack_from(datos, posicion)
+            carga = datos[posicion + CABECERA.size:posicion + CABECERA.size + longitud]
+            if len(carga) < longitud or zlib.crc32(carga) != crc:
+                # Cola escrita a medias por un corte: lo anterior sigue siendo válido.
+                return
+            yield secuencia, json.loads(carga.decode("utf-8"))
+            posicion += CABECERA.size + longitud
+
+    def leer(self):
+        """Devuelve los registros pendientes: ni publicados ni descartados."""
+        registros = []
+        cerrados = set()
+        for secuencia, registro in self._recorrer():
+            # Los diarios anteriores al origen los escribía un único proceso.
+            origen = registro.get("origen")
+            if registro["op"] in ("publicada", "descartar"):
+                cerrados.update((origen, clave) for clave in registro["secuencias"])
+            else:
+                registro["secuencia"] = secuencia
+                registros.append(registro)
+        return [
+            registro for registro in registros
+            if (registro.get("origen"), registro["secuencia"]) not in cerrados
+        ]
+
+    def registrar(self, registros):
+        """
+        Añade los registros y espera a que sean durables. Devuelve sus números
+        de secuencia; cada uno debe cerrarse luego con `confirmar` o `descartar`.
+        """
+        with self._bloqueo, self._exclusivo():
+            secuencias = self._anotar(registros)
+            self._pendientes += len(secuencias)
+        try:
+            self._esperar_durable(secuencias[-1] if secuencias else 0)
+        except OSError:
+            try:
+                # Los registros ya están en el archivo: se anulan por si acaban llegando a disco.
+                self.descartar(secuencias)
+            except OSError:
+                pass
+            raise
+        return secuencias
+
+    def _anotar(self, registros):
+        # Requiere `_bloqueo` y el cerrojo entre procesos: los registros se
+        # vuelcan enteros para que no se intercalen con los de otro proceso.
+        secuencias = []
+        bloques = []
+        for registro in registros:
+            self._secuencia += 1
+            carga = json.dumps({"origen": self._origen, **registro}, ensure_ascii=False).encode("utf-8")
+            bloques.append(CABECERA.pack(len(carga), zlib.crc32(carga), self._secuencia) + carga)
+            secuencias.append(self._secuencia)
+        self._archivo.write(b"".join(bloques))
+        self._archivo.flush()
+        return secuencias
+
+    def descartar(self, secuencias):
+        """Anula registros cuya publicación falló para que no se reapliquen y los da por cerrados."""
+        if not secuencias:
+            return
+        try:
+            with self._bloqueo, self._exclusivo():
+                (ultima,) = self._anotar([{"op": "descartar", "secuencias": list(secuencias)}])
+            self._esperar_durable(ultima)
+        finally:
+            with self._bloqueo:
+                self._pendientes -= len(secuencias)
+
+    def confirmar(self, secuencias, rutas):
+        """
+        Marca como publicadas las escrituras de `secuencias` sobre `rutas`.
+
+        Las notas y sus carpetas se fuerzan antes a disco: la recuperación se
+        fía de la marca y no reaplica lo publicado, así que tampoco pisa
+        borrados o ediciones externas posteriores. La marca en sí no espera a
+        disco: si se pierde, la recuperación solo reescribe un contenido que ya
+        estaba publicado.
+        """
+        try:
+            if secuencias:
+                _hacer_durables(rutas, self.carpeta)
+        except BaseException:
+            with self._bloqueo:
+                self._pendientes -= len(secuencias)
+            raise
+        with self._bloqueo, self._exclusivo():
+            if secuencias:
+                self._anotar([{"op": "publicada", "secuencias": list(secuencias)}])
+            self._pendientes -= len(secuencias)
+            if self._pendientes == 0 and os.fstat(self._archivo.fileno()).st_size >= self.limite_bytes:
+                self._punto_de_control()
+
+    def _esperar_durable(self, objetivo):
+        with self._condicion:
+            while self._durable < objetivo:
+                if self._sincronizando:
+                    self._condicion.wait()
+                    continue
+                self._sincronizando = True
+                self._condicion.release()
+                hasta = None
+                try:
+                    if self.espera_grupo:
+                        time.sleep(self.espera_grupo)
+                    with self._bloqueo:
+                        grupo = self._secuencia
+                    _sincronizar_descriptor(self._archivo.fileno())
+                    hasta = grupo
+                    self.sincronizaciones += 1
+                finally:
+                    self._condicion.acquire()
+                    self._sincronizando = False
+                    if hasta is not None:
+                        self._durable = max(self._durable, hasta)
+                    self._condicion.notify_all()
+
+    def _punto_de_control(self):
+        # Requiere `_bloqueo` y el cerrojo entre procesos. Lo publicado ya está
+        # en disco; las escrituras en vuelo de otro proceso solo están en el
+        # diario, así que lo vaciará él.
+        if self.leer():
+            return False
+        self._archivo.truncate(0)
+        _sincronizar_descriptor(self._archivo.fileno())
+        return True
+
+    def recuperar(self, reaplicar):
+        """
+        Pasa a `reaplicar` los registros pendientes de orígenes que ya no están
+        abiertos (los de un proceso vivo siguen en vuelo y los cerrará él), y
+        este devuelve las rutas que corrigió. Las fuerza a disco, da esos
+        registros por publicados e intenta vaciar el diario, todo bajo el
+        cerrojo entre procesos. Devuelve las rutas corregidas.
+        """
+        with self._bloqueo, self._exclusivo():
+            vivos = self._origenes_vivos()
+            registros = [registro for registro in self.leer() if registro.get("origen") not in vivos]
+            rutas = list(reaplicar(registros))
+            _hacer_durables(rutas, self.carpeta)
+            abandonadas = {}
+            for registro in registros:
+                abandonadas.setdefault(registro.get("origen"), []).append(registro["secuencia"])
+            self._anotar([
+                {"op": "publicada", "origen": origen, "secuencias": secuencias}
+                for origen, secuencias in abandonadas.items()
+            ])
+            self._punto_de_control()
+        return rutas
+
+    def vaciar(self):
+        """Fuerza un punto de control si ningún proceso tiene escrituras en vuelo."""
+        with self._bloqueo, self._exclusivo():
+            return self._pendientes == 0 and self._punto_de_control()
+
+    def cerrar(self):
+        if self._archivo.closed:
+            return
+        self.vaciar()
+        self._archivo.close()
+        if self._vivo is not None:
+            os.remove(self._ruta_vivo(self._origen))
+            os.close(self._vivo)
+            self._vivo = None
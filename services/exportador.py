@@ -0,0 +1,146 @@
+import contextvars
+import gzip
+import io
+import json
+import lzma
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+FORMATOS_EXPORTACION = ("json", "jsonl")
+# Sufijos de `ruta_salida` que activan la compresión de la exportación.
+SUFIJOS_COMPRIMIDOS = (".gz", ".xz")
+
+
+def procesar_en_paralelo(elementos, funcion, hilos=4, ventana=None):
+    """
+    Aplica `funcion` con un pool de hilos y entrega los resultados en el mismo
+    orden de `elementos`.
+
+    Como mucho `ventana` tareas quedan en vuelo a la vez (por omisión, cuatro
+    por hilo), así que la memoria no depende del tamaño del corpus y
+    `elementos` puede ser un generador. Produce pares `(elemento, resultado)`;
+    los elementos cuya tarea lanza `OSError` se omiten. Cada tarea se ejecuta
+    en una copia del contexto de quien la envía, así la instrumentación atribuye
+    su E/S a la llamada que la originó.
+    """
+    ventana = ventana or hilos * 4
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        pendientes = deque()
+        for elemento in elementos:
+            contexto = contextvars.copy_context()
+            pendientes.append((elemento, ejecutor.submit(contexto.run, funcion, elemento)))
+            if len(pendientes) >= ventana:
+                resultado = _resolver(*pendientes.popleft())
+                if resultado is not None:
+                    yield resultado
+        while pendientes:
+            resultado = _resolver(*pendientes.popleft())
+            if resultado is not None:
+                yield resultado
+
+
+@contextmanager
+def abrir_salida(temporal, ruta_salida):
+    """
+    Abre `temporal` para escribir texto, comprimido con gzip o xz si
+    `ruta_salida` termina en `.gz` o `.xz`.
+    """
+    if ruta_salida.endswith(".gz"):
+        with open(temporal, "wb") as crudo, gzip.GzipFile(
+            # El nombre guardado en la cabecera gzip es el definitivo, no el temporal.
+            filename=os.path.basename(ruta_salida)[:-3], mode="wb", fileobj=crudo
+        ) as comprimido, io.TextIOWrapper(comprimido, encoding="utf-8") as salida:
+            yield salida
+    elif ruta_salida.endswith(".xz"):
+        with lzma.open(temporal, "wt", encoding="utf-8") as salida:
+            yield salida
+    else:
+        with open(temporal, "w", encoding="utf-8") as salida:
+            yield salida
+
+
+def _resolver(elemento, futuro):
+    try:
+        return elemento, futuro.result()
+    except OSError:
+        # Igual que en la búsqueda, un error de E/S aislado no detiene el resto.
+        return None
+
+
+class ExportadorStreaming:
+    """
+    Escribe exportaciones JSON o JSON Lines a medida que se leen las notas.
+
+    `convertir(nombre, texto)` transforma cada nota en el diccionario que se
+    serializa. `progreso`, si se indica, recibe un diccionario con
+    `procesadas`, `total`, `bytes`, `segundos` y `notas_por_segundo` cada
+    `intervalo_progreso` notas y al terminar.
+    """
+
+    def __init__(self, leer, convertir, hilos=4, progreso=None, intervalo_progreso=1000):
+        self.leer = leer
+        self.convertir = convertir
+        self.hilos = hilos
+        self.progreso = progreso
+        self.intervalo_progreso = intervalo_progreso
+
+    def exportar(self, nombres, ruta_salida, formato="json", total=None):
+        """
+        Exporta las notas indicadas a `ruta_salida` y devuelve las estadísticas.
+
+        Se escribe en un archivo temporal que reemplaza al destino solo al
+        final, así una exportación interrumpida no deja un JSON truncado.
+        Si `ruta_salida` termina en `.gz` o `.xz` se comprime al vuelo y el
+        JSON se escribe sin sangría (una nota por línea); `bytes` cuenta
+        entonces el texto antes de comprimir.
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            raise ValueError(f"Formato de exportación desconocido: {formato}")
+
+        inicio = time.perf_counter()
+        estadisticas = {"procesadas": 0, "total": total, "bytes": 0}
+        temporal = f"{ruta_salida}.tmp"
+        compacto = ruta_salida.endswith(SUFIJOS_COMPRIMIDOS)
+        try:
+            with abrir_salida(temporal, ruta_salida) as salida:
+                if formato == "json":
+                    estadisticas["bytes"] += salida.write("[")
+                for nombre, texto in procesar_en_paralelo(nombres, self.leer, self.hilos):
+                    nota = self.convertir(nombre, texto)
+                    if formato == "jsonl":
+                        fragmento = json.dumps(nota, ensure_ascii=False) + "\n"
+                    else:
+                        separador = ",\n" if estadisticas["procesadas"] else "\n"
+                        if compacto:
+                            fragmento = separador + json.dumps(nota, ensure_ascii=False, separators=(",", ":"))
+                        else:
+                            elemento = json.dumps(nota, indent=4, ensure_ascii=False)
+                            fragmento = separador + "    " + elemento.replace("\n", "\n    ")
+                    estadisticas["bytes"] += salida.write(fragmento)
+                    estadisticas["procesadas"] += 1
+                    if self.progreso and estadisticas["procesadas"] % self.intervalo_progreso == 0:
+                        self.progreso(self._medir(estadisticas, inicio))
+                if formato == "json":
+                    cierre = "\n]" if estadisticas["procesadas"] else "]"
+                    estadisticas["bytes"] += salida.write(cierre)
+            os.replace(temporal, ruta_salida)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+        resultado = self._medir(estadisticas, inicio)
+        if self.progreso:
+            self.progreso(resultado)
+        return resultado
+
+    @staticmethod
+    def _medir(estadisticas, inicio):
+        segundos = time.perf_counter() - inicio
+        medida = dict(estadisticas)
+        medida["segundos"] = round(segundos, 6)
+        medida["notas_por_segundo"] = round(estadisticas["procesadas"] / segundos, 2) if segundos else 0.0
+        return medida
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from services.gestor_notas import GestorNotas
+
+
+class AsyncGestorNotas:
+    """
+    Fachada asíncrona de `GestorNotas` para atender muchos clientes a la vez.
+
+    Cada operación se ejecuta en un pool de hilos acotado (`max_hilos`) y como
+    mucho `max_pendientes` operaciones esperan turno, así una búsqueda o una
+    exportación lenta no bloquea el bucle de eventos. Las operaciones que
+    modifican una nota (`guardar`, `editar`, `revertir`, `eliminar`) se
+    serializan por nombre para que dos ediciones simultáneas no se pisen ni
+    desordenen el historial de versiones.
+
+    Todas admiten `tiempo_limite` (segundos) y pueden cancelarse: si la tarea
+    aún no empezó no llega a ejecutarse, y si ya estaba en curso el cerrojo de
+    la nota se libera solo cuando el hilo termina.
+    """
+
+    def __init__(self, gestor=None, max_hilos=4, max_pendientes=64, tiempo_limite=None, **opciones):
+        self.gestor = gestor if gestor is not None else GestorNotas(**opciones)
+        self.tiempo_limite = tiempo_limite
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="gestor-notas")
+        self._cupos = asyncio.Semaphore(max_pendientes)
+        self._bloqueos = weakref.WeakValueDictionary()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    def _bloqueo_de(self, nombre):
+        bloqueo = self._bloqueos.get(nombre)
+        if bloqueo is None:
+            bloqueo = asyncio.Lock()
+            self._bloqueos[nombre] = bloqueo
+        return bloqueo
+
+    async def _ejecutar(self, funcion, *args, nombre=None, tiempo_limite=None, **kwargs):
+        """Ejecuta `funcion` en el pool respetando cupos, cerrojos por nota y tiempo límite."""
+        limite = self.tiempo_limite if tiempo_limite is None else tiempo_limite
+        return await asyncio.wait_for(
+            self._en_hilo(functools.partial(funcion, *args, **kwargs), nombre), limite
+        )
+
+    async def ejecutar(self, funcion, *args, nombre=None, tiempo_limite=None, **kwargs):
+        """
+        Ejecuta cualquier llamada bloqueante sobre el gestor con las mismas
+        garantías que el resto de métodos; con `nombre` se serializa con las
+        demás operaciones que modifican esa nota.
+        """
+        return await self._ejecutar(funcion, *args, nombre=nombre, tiempo_limite=tiempo_limite, **kwargs)
+
+    async def _en_hilo(self, llamada, nombre):
+        bucle = asyncio.get_running_loop()
+        bloqueo = self._bloqueo_de(nombre) if nombre is not None else None
+        if bloqueo is not None:
+            await bloqueo.acquire()
+        try:
+            await self._cupos.acquire()
+        except BaseException:
+            if bloqueo is not None:
+                bloqueo.release()
+            raise
+
+        def liberar():
+            self._cupos.release()
+            if bloqueo is not None:
+                bloqueo.release()
+
+        def al_terminar(_):
+            # El hilo puede terminar después de una cancelación; se libera desde el bucle.
+            try:
+                bucle.call_soon_threadsafe(liberar)
+            except RuntimeError:
+                pass
+
+        try:
+            futuro = self._ejecutor.submit(llamada)
+        except BaseException:
+            liberar()
+            raise
+        futuro.add_done_callback(al_terminar)
+        return await asyncio.wrap_future(futuro)
+
+    async def guardar(self, nota, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.guardar`."""
+        return await self._ejecutar(
+            self.gestor.guardar, nota, nombre=nota.nombre, tiempo_limite=tiempo_limite
+        )
+
+    async def leer(self, nombre, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.leer`."""
+        return await self._ejecutar(self.gestor.leer, nombre, tiempo_limite=tiempo_limite)
+
+    async def listar(self, tiempo_limite=None, **filtros):
+        """Versión asíncrona de `GestorNotas.listar` (admite sus filtros por fecha)."""
+        return await self._ejecutar(self.gestor.listar, tiempo_limite=tiempo_limite, **filtros)
+
+    async def contar(self, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.contar`."""
+        return await self._ejecutar(self.gestor.contar, tiempo_limite=tiempo_limite)
+
+    async def buscar(self, palabra, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.buscar`."""
+        return await self._ejecutar(self.gestor.buscar, palabra, tiempo_limite=tiempo_limite)
+
+    async def consultar(self, consulta, limite=10, desplazamiento=0, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.consultar`."""
+        return await self._ejecutar(
+            self.gestor.consultar, consulta, limite, desplazamiento, tiempo_limite=tiempo_limite
+        )
+
+    async def editar(self, nombre, nuevo_contenido, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.editar`, serializada por nota."""
+        return await self._ejecutar(
+            self.gestor.editar, nombre, nuevo_contenido, nombre=nombre, tiempo_limite=tiempo_limite
+        )
+
+    async def revertir(self, nombre, version, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.revertir`, serializada por nota."""
+        return await self._ejecutar(
+            self.gestor.revertir, nombre, version, nombre=nombre, tiempo_limite=tiempo_limite
+        )
+
+    async def eliminar(self, nombre, tiempo_limite=None):
+        """Versión asíncrona de `GestorNotas.eliminar`, serializada por nota."""
+        return await self._ejecutar(
+            self.gestor.eliminar, nombre, nombre=nombre, tiempo_limite=tiempo_limite
+        )
+
+    async def exportar_json(self, tiempo_limite=None, **opciones):
+        """Versión asíncrona de `GestorNotas.exportar_json`."""
+        return await self._ejecutar(
+            self.gestor.exportar_json, tiempo_limite=tiempo_limite, **opciones
+        )
+
+    async def exportar_pickle(self, tiempo_limite=None, **opciones):
+        """Versión asíncrona de `GestorNotas.exportar_pickle`."""
+        return await self._ejecutar(
+            self.gestor.exportar_pickle, tiempo_limite=tiempo_limite, **opciones
+        )
+
+    async def cerrar(self):
+        """Espera a que terminen las tareas en curso y cierra el gestor."""
+        bucle = asyncio.get_running_loop()
+        await bucle.run_in_executor(None, functools.partial(self._ejecutor.shutdown, wait=True))
+        self.gestor.cerrar()
@@ -1,83 +1,497 @@
 import os
-import shutil
-import json
+import threading
+import time
 from datetime import datetime
+from itertools import islice
 from models.nota import Nota
+from services.almacenamiento import crear_almacenamiento
+from services.cache_lectura import CacheLectura
+from services.catalogo import CatalogoNotas
+from services.historial import HistorialNotas
+from services.indice_fechas import limite_de_fecha
+from services.indice_invertido import IndiceInvertido
+from services.motor_busqueda import ConsultaInvalida, MotorBusqueda, generar_fragmento
 from services.pickle_repository import PickleRepository
 
+# `busqueda_paralela` (multiprocessing), `exportador` (concurrent.futures),
+# `instrumentacion` (cProfile) y `vigilante` (ctypes) se importan al usarse:
+# cuestan más que abrir la carpeta y la mayoría de las invocaciones de línea
+# de órdenes no los necesitan.
+
+def separar_contenido(contenido):
+    """Divide el texto persistido de una nota en fecha y cuerpo."""
+    lineas = contenido.splitlines()
+    fecha = lineas[0].replace("Fecha: ", "").strip() if lineas else ""
+    cuerpo = "\n".join(lineas[2:]) if len(lineas) > 2 else ""
+    return fecha, cuerpo
+
+
+def _nota_exportable(nombre, contenido):
+    """Convierte el texto persistido en el diccionario usado por las exportaciones."""
+    fecha, cuerpo = separar_contenido(contenido)
+    return {"nombre": nombre, "fecha": fecha, "contenido": cuerpo}
+
+
 class GestorNotas:
     """Gestiona la creación, consulta y administración de notas en disco."""
 
-    def __init__(self, carpeta="notas"):
-        """Inicializa el directorio de trabajo para almacenar las notas."""
+    def __init__(
+        self,
+        carpeta="notas",
+        almacenamiento=None,
+        cache_bytes=16 * 1024 * 1024,
+        instrumentacion=None,
+        procesos_busqueda=None,
+        compresion=None,
+    ):
+        """
+        Inicializa el directorio de trabajo para almacenar las notas.
+
+        `almacenamiento` admite una instancia de `Almacenamiento` o el nombre
+        de un backend (`"texto"` o `"sqlite"`); por omisión se usa un archivo
+        `.txt` por nota dentro de `carpeta`. Con `compresion` (`"zlib"` o
+        `"lzma"`) los backends de archivos guardan las notas comprimidas.
+
+        Las lecturas pasan por una caché LRU de hasta `cache_bytes` bytes que
+        se revalida contra el mtime de cada nota (`0` la desactiva); sus
+        contadores están en `self.cache.estadisticas()`.
+
+        Cada edición guarda el contenido anterior en `self.historial`
+        (`<carpeta>/.historial/`) como un delta respecto a la versión previa.
+
+        Los recorridos de búsqueda sobre archivos se reparten entre
+        `procesos_busqueda` procesos (por omisión, uno por núcleo; `1` los
+        hace en el propio proceso).
+
+        Con `instrumentacion` (una `Instrumentacion`) se miden los métodos
+        públicos y la E/S del almacenamiento; sin ella no se añade ningún coste.
+
+        El catálogo y el índice se protegen con un cerrojo reentrante, de modo
+        que una misma instancia puede usarse desde varios hilos; la E/S sobre
+        las notas se realiza fuera del cerrojo siempre que es posible.
+        """
         self.carpeta = carpeta
         if not os.path.exists(carpeta):
             os.makedirs(carpeta)
+        if almacenamiento is None or isinstance(almacenamiento, str):
+            almacenamiento = crear_almacenamiento(almacenamiento or "texto", carpeta, compresion)
+        self.instrumentacion = instrumentacion
+        if instrumentacion is not None:
+            from services.instrumentacion import METODOS_INSTRUMENTADOS, AlmacenamientoInstrumentado
+
+            almacenamiento = AlmacenamientoInstrumentado(almacenamiento, instrumentacion)
+            for metodo in METODOS_INSTRUMENTADOS:
+                setattr(self, metodo, instrumentacion.envolver(metodo, getattr(self, metodo)))
+        self.almacenamiento = almacenamiento
+        self.almacenamiento.recuperar()
+        self._bloqueo = threading.RLock()
+        self.cache = CacheLectura(cache_bytes)
         self.pickle_repository = PickleRepository(
             os.path.join(self.carpeta, "exports", "notas.pkl")
         )
+        self.ultima_exportacion = None
+        self.historial = HistorialNotas(os.path.join(self.carpeta, ".historial"))
+        self.vigilante = None
+        self.procesos_busqueda = procesos_busqueda
+        self._buscador = None
+        self._indice = IndiceInvertido(os.path.join(self.carpeta, ".indice"), cargar=False)
+        self._motor = None
+        self.catalogo = CatalogoNotas(
+            os.path.join(self.carpeta, ".indice", "catalogo.pkl"),
+            obtener_firma=self.almacenamiento.firma,
+            recorrer_entradas=self.almacenamiento.entradas,
+            leer_fecha=self._leer_fecha,
+            firma_tras_cambio=self.almacenamiento.firma_tras_cambio,
+            firma_cubre_ediciones=self.almacenamiento.firma_cubre_ediciones,
+        )
+        with self._bloqueo:
+            self.catalogo.cargar()
+
+    @property
+    def indice(self):
+        """
+        Índice invertido de `<carpeta>/.indice/`. Se carga y se concilia con el
+        catálogo la primera vez que se usa, así que las operaciones que no
+        buscan (contar, leer, crear...) no pagan su lectura; mientras tanto
+        las escrituras solo se anotan en su diario.
+        """
+        if not self._indice.cargado:
+            with self._bloqueo:
+                if not self._indice.cargado:
+                    self._indice.cargar()
+                    self._sincronizar_indice()
+        return self._indice
+
+    @property
+    def motor(self):
+        """Motor de consultas con ranking sobre `indice`."""
+        if self._motor is None:
+            self._motor = MotorBusqueda(self.indice)
+        return self._motor
+
+    @property
+    def buscador(self):
+        """`BuscadorParalelo` de los recorridos; su pool se arranca en la primera búsqueda grande."""
+        if self._buscador is None:
+            from services.busqueda_paralela import BuscadorParalelo
+
+            self._buscador = BuscadorParalelo(self.procesos_busqueda)
+        return self._buscador
+
+    def _leer_texto(self, nombre):
+        """
+        Lee una nota a través de la caché de lectura.
+
+        Cada acceso consulta el estado actual de la nota, así que una entrada
+        cacheada solo se usa si el mtime y el tamaño no cambiaron; lanza
+        `FileNotFoundError` si la nota ya no existe.
+        """
+        estado = self.almacenamiento.estado(nombre)
+        if estado is None:
+            self.cache.invalidar(nombre)
+            raise FileNotFoundError(nombre)
+        texto = self.cache.obtener(nombre, estado)
+        if texto is None:
+            texto = self.almacenamiento.leer(nombre)
+            # La capacidad se mide en bytes UTF-8, no en caracteres; el tamaño
+            # en disco no sirve de medida si la nota está comprimida.
+            self.cache.guardar(nombre, estado, texto, len(texto.encode("utf-8")))
+        return texto
+
+    def _leer_fecha(self, nombre, estado=None):
+        """Lee únicamente la línea de encabezado de una nota para obtener su fecha."""
+        texto = self.cache.obtener(nombre, estado) if estado is not None else None
+        try:
+            if texto is not None:
+                encabezado = texto.split("\n", 1)[0]
+            else:
+                encabezado = self.almacenamiento.leer_encabezado(nombre)
+        except OSError:
+            return ""
+        return encabezado.replace("Fecha: ", "").strip() if encabezado.startswith("Fecha: ") else ""
+
+    def _indexar(self, nombre):
+        """Actualiza el índice invertido con el contenido actual de una nota."""
+        try:
+            estado = self.almacenamiento.estado(nombre)
+            texto = self.almacenamiento.leer(nombre) if estado else None
+        except OSError:
+            estado = None
+        if estado is None:
+            self.cache.invalidar(nombre)
+        with self._bloqueo:
+            if estado is None:
+                self._indice.eliminar(nombre)
+                return False
+            self._indice.agregar(nombre, texto, estado.mtime, estado.tamano)
+        return True
+
+    def _sincronizar_indice(self):
+        """Reindexa solo las notas cuyo mtime o tamaño del catálogo no coincide con el índice."""
+        for nombre, datos in self.catalogo.entradas.items():
+            if not self.indice.esta_vigente(nombre, datos["mtime"], datos["tamano"]):
+                self._indexar(nombre)
+        for nombre in set(self.indice.documentos) - self.catalogo.entradas.keys():
+            self.indice.eliminar(nombre)
+
+    def _refrescar(self):
+        """Concilia catálogo e índice si el almacenamiento cambió fuera del servicio."""
+        try:
+            with self._bloqueo:
+                if self.catalogo.verificar() and self._indice.cargado:
+                    self._sincronizar_indice()
+        except OSError:
+            return False
+        return True
+
+    def _registrar_escritura(self, nombre, texto, estado):
+        """Refleja en el catálogo y en el índice el contenido recién escrito."""
+        fecha, _ = separar_contenido(texto)
+        self.cache.invalidar(nombre)
+        with self._bloqueo:
+            self.catalogo.actualizar(nombre, fecha, estado)
+            self._indice.agregar(nombre, texto, estado.mtime, estado.tamano)
+
+    def reindexar(self):
+        """Reconstruye el índice invertido desde cero a partir del almacenamiento."""
+        with self._bloqueo:
+            self.indice.limpiar()
+            try:
+                for nombre, estado in self.almacenamiento.entradas():
+                    try:
+                        texto = self.almacenamiento.leer(nombre)
+                    except OSError:
+                        continue
+                    self.indice.agregar(nombre, texto, estado.mtime, estado.tamano, registrar=False)
+            except OSError:
+                return False
+            return self.indice.compactar()
+
+    def _nombres(self):
+        """Copia de los nombres del catálogo, segura frente a otros hilos."""
+        with self._bloqueo:
+            return list(self.catalogo.entradas)
+
+    def _nombres_filtrados(self, desde=None, hasta=None):
+        """Todas las notas, o solo las creadas entre `desde` y `hasta` si se indica alguno."""
+        if desde is None and hasta is None:
+            return self._nombres()
+        return self._nombres_por_fecha(desde, hasta)
+
+    def _nombres_por_fecha(self, desde=None, hasta=None, limite=None, orden="asc"):
+        """Nombres del índice por fecha en el rango dado; lanza `ValueError` si los límites no son válidos."""
+        desde = limite_de_fecha(desde)
+        hasta = limite_de_fecha(hasta, final=True)
+        if limite is not None and limite < 0:
+            raise ValueError("el límite no puede ser negativo")
+        with self._bloqueo:
+            return self.catalogo.fechas().rango(desde, hasta, limite, orden)
 
     def guardar(self, nota: Nota):
         """Escribe una nota nueva o reemplaza la existente con el mismo nombre."""
-        ruta = os.path.join(self.carpeta, f"{nota.nombre}.txt")
+        texto = str(nota)
         try:
-            with open(ruta, "w", encoding="utf-8") as archivo:
-                archivo.write(str(nota))
+            estado = self.almacenamiento.escribir(nota.nombre, texto)
         except OSError:
             # Contener errores de escritura mantiene estable a la capa de interfaz.
             return False, "No fue posible guardar la nota. Verifique permisos y reintente."
+        self._registrar_escritura(nota.nombre, texto, estado)
         return True, "Nota guardada correctamente."
 
+    def guardar_lote(self, notas, hilos=4, tamano_lote=64):
+        """
+        Guarda muchas notas con un pool de `hilos` que escribe lotes de
+        `tamano_lote` notas; como mucho unos pocos lotes por hilo están en
+        vuelo, así que `notas` puede ser un generador de cualquier tamaño.
+
+        Cada nota se publica de forma atómica (archivo temporal + renombrado,
+        o una transacción por lote en SQLite). Si un lote falla se reintenta
+        nota a nota para informar exactamente cuáles no se guardaron.
+        Devuelve un resumen con `resultados` (tuplas `(nombre, exito, mensaje)`),
+        `guardadas`, `fallidas` y `segundos`.
+        """
+        from services.exportador import procesar_en_paralelo
+
+        inicio = time.perf_counter()
+        resumen = {"resultados": [], "guardadas": 0, "fallidas": 0, "segundos": 0.0}
+        pares = ((nota.nombre, str(nota)) for nota in notas)
+        lotes = iter(lambda: list(islice(pares, tamano_lote)), [])
+
+        for lote, escritos in procesar_en_paralelo(lotes, self._escribir_lote, hilos, ventana=hilos * 2):
+            for (nombre, texto), estado in zip(lote, escritos):
+                if estado is None:
+                    resumen["fallidas"] += 1
+                    resumen["resultados"].append(
+                        (nombre, False, "No fue posible guardar la nota. Verifique permisos y reintente.")
+                    )
+                    continue
+                self._registrar_escritura(nombre, texto, estado)
+                resumen["guardadas"] += 1
+                resumen["resultados"].append((nombre, True, "Nota guardada correctamente."))
+
+        resumen["segundos"] = round(time.perf_counter() - inicio, 6)
+        return resumen
+
+    def _escribir_lote(self, lote):
+        """Escribe un lote completo; ante un fallo reintenta nota a nota (`None` = fallida)."""
+        try:
+            return self.almacenamiento.escribir_lote(lote)
+        except OSError:
+            estados = []
+            for nombre, texto in lote:
+                try:
+                    estados.extend(self.almacenamiento.escribir_lote([(nombre, texto)]))
+                except OSError:
+                    estados.append(None)
+            return estados
+
+    def restaurar_desde_pickle(
+        self, carpeta_export="exports", archivo_salida="notas.pkl", hilos=4
+    ):
+        """
+        Restaura en bloque las notas del archivo pickle conservando su fecha
+        original. Devuelve el mismo resumen que `guardar_lote`.
+        """
+        def notas():
+            for nombre, campos in self.iterar_desde_pickle(carpeta_export, archivo_salida):
+                nota = Nota(nombre, campos.get("contenido", ""))
+                if campos.get("fecha"):
+                    nota.fecha = campos["fecha"]
+                yield nota
+
+        return self.guardar_lote(notas(), hilos=hilos)
+
+    def _cargar_cuerpo(self, nombre):
+        """Cargador diferido de cuerpos usado por las notas devueltas sin contenido."""
+        try:
+            _, cuerpo = separar_contenido(self._leer_texto(nombre))
+        except OSError:
+            return ""
+        return cuerpo
+
+    def iterar_encabezados(self):
+        """
+        Recorre las notas como objetos `Nota` sin leer sus cuerpos.
+
+        La fecha sale del catálogo (que solo lee encabezados) y el contenido se
+        carga desde el almacenamiento la primera vez que se consulta.
+        """
+        self._refrescar()
+        with self._bloqueo:
+            entradas = list(self.catalogo.entradas.items())
+        for nombre, datos in entradas:
+            yield Nota.desde_encabezado(nombre, datos["fecha"], cargador=self._cargar_cuerpo)
+
     def leer(self, nombre):
         """Obtiene el contenido de una nota por nombre y maneja fallos de lectura."""
-        ruta = os.path.join(self.carpeta, f"{nombre}.txt")
+        return self.obtener(nombre)[1]
+
+    def obtener(self, nombre):
+        """Como `leer`, pero devuelve `(True, texto)` o `(False, mensaje)` para distinguir los fallos."""
         try:
-            with open(ruta, "r", encoding="utf-8") as archivo:
-                return archivo.read()
+            return True, self._leer_texto(nombre)
         except FileNotFoundError:
-            return "Nota no encontrada."
+            return False, "Nota no encontrada."
         except OSError:
             # El servicio captura errores de E/S para evitar que la interfaz principal se caiga.
-            return "No fue posible leer la nota. Intente nuevamente."
+            return False, "No fue posible leer la nota. Intente nuevamente."
 
-    def listar(self):
-        """Devuelve los nombres de todas las notas disponibles en el directorio."""
-        try:
-            notas = [
-                a[:-4]
-                for a in os.listdir(self.carpeta)
-                if a.endswith(".txt") and not a.endswith("_bak.txt")
-            ]
-            return True, notas
-        except OSError:
+    def listar(self, desde=None, hasta=None, limite=None, orden=None):
+        """
+        Devuelve los nombres de todas las notas disponibles según el catálogo.
+
+        Con `desde`, `hasta`, `limite` u `orden` la respuesta sale del índice
+        por fecha de creación, sin abrir ninguna nota: solo las creadas entre
+        `desde` y `hasta` (incluidos; segundos desde la época, `datetime` o
+        texto `AAAA-MM-DD[ HH:MM:SS]`), de la más antigua a la más reciente
+        (`orden="asc"`, por omisión) o al revés (`"desc"`), y como mucho
+        `limite`. Las notas sin una fecha reconocible quedan fuera de estos
+        listados.
+        """
+        if not self._refrescar():
             return False, "No fue posible listar las notas. Intente nuevamente."
+        if desde is None and hasta is None and limite is None and orden is None:
+            return True, self._nombres()
+        try:
+            return True, self._nombres_por_fecha(desde, hasta, limite, orden or "asc")
+        except ValueError as error:
+            return False, f"Filtro de fechas no válido: {error}"
+
+    def buscar(self, palabra, recorrer=False, limite=None):
+        """
+        Busca una palabra en todas las notas y lista las coincidencias por nombre.
+
+        Con `recorrer=True` no se usa el índice: se leen todas las notas con
+        `buscar_recorriendo`, y `limite` corta el recorrido tras ese número de
+        coincidencias (las primeras encontradas, no las primeras por nombre).
+        """
+        if recorrer:
+            self._refrescar()
+            return sorted(self.buscar_recorriendo(palabra, limite))
+        self._refrescar()
+        nativos = self.almacenamiento.buscar(palabra)
+        if nativos is not None:
+            return sorted(nativos)
+
+        with self._bloqueo:
+            candidatos, exacto = self.indice.candidatos(palabra)
+        if candidatos is None:
+            return sorted(self.buscar_recorriendo(palabra))
 
-    def buscar(self, palabra):
-        """Busca una palabra en todas las notas y lista las coincidencias por nombre."""
         resultados = []
-        for archivo in os.listdir(self.carpeta):
-            ruta = os.path.join(self.carpeta, archivo)
-            if not archivo.endswith(".txt") or archivo.endswith("_bak.txt"):
+        for nombre in candidatos:
+            try:
+                estado = self.almacenamiento.estado(nombre)
+            except OSError:
+                continue
+            if estado is None:
+                # La nota desapareció fuera del servicio: se retira del índice.
+                with self._bloqueo:
+                    self.indice.eliminar(nombre)
+                continue
+            if exacto and self.indice.esta_vigente(nombre, estado.mtime, estado.tamano):
+                resultados.append(nombre)
                 continue
             try:
-                with open(ruta, "r", encoding="utf-8") as f:
-                    if palabra.lower() in f.read().lower():
-                        resultados.append(archivo[:-4])
+                texto = self._leer_texto(nombre)
+            except OSError:
+                continue
+            if not self.indice.esta_vigente(nombre, estado.mtime, estado.tamano):
+                with self._bloqueo:
+                    self.indice.agregar(nombre, texto, estado.mtime, estado.tamano)
+            if palabra.lower() in texto.lower():
+                resultados.append(nombre)
+        return sorted(resultados)
+
+    def consultar(self, consulta, limite=10, desplazamiento=0):
+        """
+        Ejecuta una consulta con ranking BM25 (AND/OR/NOT, frases y prefijos).
+
+        Devuelve `(True, {"total": n, "resultados": [...]})` con una página de
+        resultados ordenados por relevancia, cada uno con `nombre`,
+        `puntuacion` y `fragmento`, o `(False, mensaje)` si la consulta o la
+        paginación no son válidas.
+        """
+        if limite < 0 or desplazamiento < 0:
+            return False, "El límite y el desplazamiento no pueden ser negativos."
+        try:
+            with self._bloqueo:
+                total, pagina = self.motor.consultar(consulta, limite, desplazamiento)
+                destacados = self.motor.terminos_destacados(consulta)
+        except ConsultaInvalida as error:
+            return False, f"Consulta no válida: {error}"
+
+        resultados = []
+        for nombre, puntuacion in pagina:
+            try:
+                _, cuerpo = separar_contenido(self._leer_texto(nombre))
+            except OSError:
+                cuerpo = ""
+            resultados.append({
+                "nombre": nombre,
+                "puntuacion": round(puntuacion, 4),
+                "fragmento": generar_fragmento(cuerpo, destacados),
+            })
+        return True, {"total": total, "resultados": resultados}
+
+    def buscar_recorriendo(self, palabra, limite=None):
+        """
+        Produce, según se encuentran, las notas que contienen `palabra` sin
+        distinguir mayúsculas, leyendo todas las notas sin consultar el índice.
+
+        En los backends de archivos la lectura se reparte entre los procesos
+        de `self.buscador`, que leen en bloques grandes sin pasar por la caché;
+        en el resto se recorren las notas en este proceso. Con `limite` el
+        recorrido se detiene al alcanzar ese número de coincidencias.
+        """
+        nombres = self._nombres()
+        rutas = [self.almacenamiento.ruta_archivo(nombre) for nombre in nombres]
+        if nombres and rutas[0] is not None:
+            yield from self.buscador.buscar(
+                zip(nombres, rutas), palabra, limite, self.almacenamiento.decodificador()
+            )
+            return
+
+        encontrados = 0
+        palabra = palabra.lower()
+        for nombre in nombres:
+            if limite is not None and encontrados >= limite:
+                return
+            try:
+                if palabra in self._leer_texto(nombre).lower():
+                    encontrados += 1
+                    yield nombre
             except OSError:
                 # Se ignoran errores de E/S individuales para continuar con la búsqueda global.
                 continue
-        return resultados
 
     def editar(self, nombre, nuevo_contenido):
-        """Reemplaza el contenido de una nota y conserva una copia de respaldo."""
-        ruta = os.path.join(self.carpeta, f"{nombre}.txt")
-        if not os.path.exists(ruta):
+        """Reemplaza el contenido de una nota y guarda el anterior en el historial."""
+        if not self.almacenamiento.existe(nombre):
             return False, "No se encontró la nota."
 
-        respaldo = os.path.join(self.carpeta, f"{nombre}_bak.txt")
         try:
-            with open(ruta, "r", encoding="utf-8") as archivo_original:
-                contenido_original = archivo_original.read()
+            contenido_original = self._leer_texto(nombre)
         except OSError:
             return False, "No fue posible editar la nota. Intente nuevamente más tarde."
 
@@ -86,108 +500,284 @@ class GestorNotas:
         if not encabezado.startswith("Fecha: "):
             encabezado = f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         cuerpo = nuevo_contenido.strip()
+        texto = f"{encabezado}\n\n{cuerpo}" if cuerpo else f"{encabezado}\n\n"
+        return self._reemplazar(
+            nombre, contenido_original, texto, "Nota editada y versión anterior guardada en el historial."
+        )
 
+    def _reemplazar(self, nombre, contenido_original, texto, mensaje):
+        """Guarda `contenido_original` en el historial y publica `texto` en su lugar."""
         try:
-            shutil.copy(ruta, respaldo)
-            with open(ruta, "w", encoding="utf-8") as archivo:
-                archivo.write(f"{encabezado}\n\n{cuerpo}" if cuerpo else f"{encabezado}\n\n")
-            return True, "Nota editada y respaldo creado."
+            self.historial.registrar(nombre, contenido_original)
         except OSError:
-            # El servicio decide la recuperación porque conoce el contexto de persistencia.
-            restaurado = False
-            if os.path.exists(respaldo):
-                try:
-                    shutil.copy(respaldo, ruta)
-                    restaurado = True
-                except OSError:
-                    pass
-            if not restaurado:
-                return (
-                    False,
-                    "No fue posible editar la nota y el contenido anterior quedó resguardado en el respaldo.",
-                )
-            return False, "No fue posible editar la nota. El contenido original fue restaurado."
+            return False, "No fue posible guardar la versión anterior. La nota no se modificó."
+
+        try:
+            estado = self.almacenamiento.escribir(nombre, texto)
+        except OSError:
+            # La escritura es atómica: si falla, la nota conserva su contenido anterior.
+            self.cache.invalidar(nombre)
+            return False, "No fue posible editar la nota. El contenido original se conserva."
+        self._registrar_escritura(nombre, texto, estado)
+        return True, mensaje
+
+    def versiones(self, nombre):
+        """Lista las versiones anteriores de una nota, de la más antigua a la más reciente."""
+        try:
+            versiones = self.historial.versiones(nombre)
+        except OSError:
+            return False, "No fue posible leer el historial de la nota."
+        if not versiones:
+            return False, "La nota no tiene versiones anteriores."
+        return True, versiones
+
+    def leer_version(self, nombre, version):
+        """Devuelve el texto completo de una versión anterior de la nota."""
+        try:
+            texto = self.historial.leer(nombre, version)
+        except OSError:
+            return False, "No fue posible leer el historial de la nota."
+        if texto is None:
+            return False, "No se encontró la versión solicitada."
+        return True, texto
+
+    def revertir(self, nombre, version):
+        """
+        Devuelve la nota al contenido de una versión anterior. El contenido
+        actual pasa a ser una versión más, así que revertir también se puede
+        deshacer. Si la nota fue eliminada, se vuelve a crear.
+        """
+        exito, texto = self.leer_version(nombre, version)
+        if not exito:
+            return False, texto
+        try:
+            contenido_actual = self._leer_texto(nombre)
+        except FileNotFoundError:
+            contenido_actual = None
+        except OSError:
+            return False, "No fue posible revertir la nota. Intente nuevamente más tarde."
+
+        mensaje = f"Nota revertida a la versión {version}."
+        if contenido_actual is not None:
+            return self._reemplazar(nombre, contenido_actual, texto, mensaje)
+        try:
+            estado = self.almacenamiento.escribir(nombre, texto)
+        except OSError:
+            return False, "No fue posible revertir la nota. Intente nuevamente más tarde."
+        self._registrar_escritura(nombre, texto, estado)
+        return True, mensaje
+
+    def compactar_historial(self):
+        """Aplica la política de retención a todo el historial; devuelve cuántas notas se compactaron."""
+        return self.historial.compactar_todo()
 
     def eliminar(self, nombre):
         """Elimina una nota por nombre y responde con mensajes seguros."""
-        ruta = os.path.join(self.carpeta, f"{nombre}.txt")
-        if not os.path.exists(ruta):
+        if not self.almacenamiento.existe(nombre):
             return False, "No se encontró la nota."
 
         try:
-            os.remove(ruta)
+            self.almacenamiento.eliminar(nombre)
+            self.cache.invalidar(nombre)
+            with self._bloqueo:
+                self.catalogo.eliminar(nombre)
+                self._indice.eliminar(nombre)
             return True, "Nota eliminada correctamente."
         except OSError:
             # Propagamos un mensaje genérico para no exponer detalles sensibles al usuario final.
             return False, "No fue posible eliminar la nota. Verifique los permisos e inténtelo más tarde."
     
     def contar(self):
-        """Cuenta notas válidas, excluyendo los respaldos de edición."""
-        return len([
-            a for a in os.listdir(self.carpeta)
-            if a.endswith(".txt") and not a.endswith("_bak.txt")
-        ])
+        """Cuenta notas válidas; el historial de versiones no se cuenta."""
+        self._refrescar()
+        return len(self.catalogo.entradas)
     
-    def exportar_json(self, carpeta_export="exports", archivo_salida="notas.json"):
-        """Genera un archivo JSON con todas las notas y sus metadatos básicos."""
+    def exportar_json(
+        self,
+        carpeta_export="exports",
+        archivo_salida=None,
+        formato="json",
+        hilos=4,
+        progreso=None,
+        comprimir=None,
+        desde=None,
+        hasta=None,
+    ):
+        """
+        Genera un archivo JSON (o JSON Lines con `formato="jsonl"`) con todas
+        las notas y sus metadatos básicos.
+
+        Las notas se leen con un pool de `hilos` y se escriben a medida que
+        llegan, en orden determinista, sin acumular el corpus en memoria. Las
+        estadísticas de la última exportación quedan en `ultima_exportacion`.
+
+        Con `comprimir="gz"` (o `"xz"`), o si `archivo_salida` termina en ese
+        sufijo, el archivo se comprime al vuelo (`notas.json.gz`).
+
+        Con `desde` o `hasta` (como en `listar`) solo se leen y exportan las
+        notas creadas en ese rango, en orden de fecha.
+
+        Devuelve False si `formato` o `comprimir` no son valores admitidos.
+        """
+        from services.exportador import FORMATOS_EXPORTACION, SUFIJOS_COMPRIMIDOS, ExportadorStreaming
+
+        if formato not in FORMATOS_EXPORTACION:
+            return False
+        if comprimir and f".{comprimir}" not in SUFIJOS_COMPRIMIDOS:
+            # Si no, se escribiría sin comprimir con un sufijo engañoso.
+            return False
         carpeta_destino = os.path.join(self.carpeta, carpeta_export)
         if not os.path.exists(carpeta_destino):
             os.makedirs(carpeta_destino)
+        if archivo_salida is None:
+            archivo_salida = "notas.jsonl" if formato == "jsonl" else "notas.json"
+            if comprimir:
+                archivo_salida = f"{archivo_salida}.{comprimir}"
 
-        notas = []
-        for archivo in os.listdir(self.carpeta):
-            if archivo.endswith(".txt") and not archivo.endswith("_bak.txt"):
-                ruta = os.path.join(self.carpeta, archivo)
-                with open(ruta, "r", encoding="utf-8") as f:
-                    contenido = f.read()
-                nombre = archivo[:-4]
-                lineas = contenido.splitlines()
-                fecha = lineas[0].replace("Fecha: ", "").strip() if lineas else ""
-                cuerpo = "\n".join(lineas[2:]) if len(lineas) > 2 else ""
-                notas.append({
-                    "nombre": nombre,
-                    "fecha": fecha,
-                    "contenido": cuerpo
-                })
-
-        ruta_json = os.path.join(carpeta_destino, archivo_salida)
-        with open(ruta_json, "w", encoding="utf-8") as json_file:
-            json.dump(notas, json_file, indent=4, ensure_ascii=False)
-
+        self._refrescar()
+        try:
+            nombres = self._nombres_filtrados(desde, hasta)
+        except ValueError:
+            return False
+        exportador = ExportadorStreaming(
+            self._leer_texto, _nota_exportable, hilos=hilos, progreso=progreso
+        )
+        try:
+            self.ultima_exportacion = exportador.exportar(
+                nombres,
+                os.path.join(carpeta_destino, archivo_salida),
+                formato=formato,
+                total=len(nombres),
+            )
+        except OSError:
+            return False
         return True
 
-    def exportar_pickle(self, carpeta_export="exports", archivo_salida="notas.pkl"):
-        """Serializa todas las notas en un diccionario y lo persiste con pickle."""
+    def _repositorio_pickle(self, carpeta_export, archivo_salida):
+        """Reutiliza el repositorio por omisión o crea uno para otra ruta."""
         ruta_pickle = os.path.join(self.carpeta, carpeta_export, archivo_salida)
-        repositorio = (
-            self.pickle_repository
-            if ruta_pickle == self.pickle_repository.ruta_archivo
-            else PickleRepository(ruta_pickle)
-        )
+        if ruta_pickle == self.pickle_repository.ruta_archivo:
+            return self.pickle_repository
+        return PickleRepository(ruta_pickle)
 
-        notas = {}
-        for archivo in os.listdir(self.carpeta):
-            if archivo.endswith(".txt") and not archivo.endswith("_bak.txt"):
-                ruta = os.path.join(self.carpeta, archivo)
-                try:
-                    with open(ruta, "r", encoding="utf-8") as f:
-                        contenido = f.read()
-                except OSError:
-                    continue
-                nombre = archivo[:-4]
-                lineas = contenido.splitlines()
-                fecha = lineas[0].replace("Fecha: ", "").strip() if lineas else ""
-                cuerpo = "\n".join(lineas[2:]) if len(lineas) > 2 else ""
-                notas[nombre] = {"fecha": fecha, "contenido": cuerpo}
+    def exportar_pickle(self, carpeta_export="exports", archivo_salida="notas.pkl", desde=None, hasta=None):
+        """
+        Serializa todas las notas en el archivo pickle segmentado
+        (`archivo_salida="notas.pkl.xz"` comprime cada segmento con xz).
+
+        La exportación es incremental: solo se leen y reescriben los segmentos
+        cuyas notas cambiaron de mtime (o aparecieron o desaparecieron) desde
+        el último snapshot. Con `desde` o `hasta` (como en `listar`) solo se
+        exportan las notas creadas en ese rango.
+        """
+        repositorio = self._repositorio_pickle(carpeta_export, archivo_salida)
+        self._refrescar()
+        try:
+            nombres = self._nombres_filtrados(desde, hasta)
+        except ValueError:
+            return False
+        with self._bloqueo:
+            entradas = self.catalogo.entradas
+            mtimes = {nombre: entradas[nombre]["mtime"] for nombre in nombres if nombre in entradas}
+
+        def cargar_nota(nombre):
+            try:
+                contenido = self._leer_texto(nombre)
+            except OSError:
+                return None
+            fecha, cuerpo = separar_contenido(contenido)
+            return {"fecha": fecha, "contenido": cuerpo}
+
+        return repositorio.actualizar(mtimes, cargar_nota)
+
+    def vigilar(self, modo=None, intervalo=1.0):
+        """
+        Arranca un hilo que detecta los cambios hechos por otras herramientas
+        (inotify en Linux o sondeo cada `intervalo` segundos, ver
+        `services.vigilante`) y actualiza catálogo, índice y caché nota a nota,
+        sin volver a recorrer la carpeta. Devuelve el vigilante en marcha.
+        """
+        if self.vigilante is None:
+            from services.vigilante import crear_vigilante
 
-        return repositorio.guardar(notas)
+            self.vigilante = crear_vigilante(
+                self.almacenamiento, self._aplicar_cambios, modo=modo, intervalo=intervalo
+            ).iniciar()
+        return self.vigilante
+
+    def dejar_de_vigilar(self):
+        """Detiene el vigilante de cambios externos si estaba activo."""
+        if self.vigilante is not None:
+            self.vigilante.detener()
+            self.vigilante = None
+
+    def resincronizar(self):
+        """
+        Compara el mtime y el tamaño de todas las notas y concilia catálogo e
+        índice. Sin `vigilar()`, es la forma de ver las ediciones externas en
+        su sitio de los backends de archivos sin reiniciar (ver `CatalogoNotas`).
+        """
+        try:
+            with self._bloqueo:
+                if self.catalogo.sincronizar(forzar=True) and self._indice.cargado:
+                    self._sincronizar_indice()
+        except OSError:
+            return False
+        return True
+
+    def _aplicar_cambios(self, eventos):
+        """Refleja en el estado derivado los cambios externos notificados por el vigilante."""
+        for evento in eventos:
+            if evento.tipo == "resincronizar":
+                # El vigilante perdió eventos: solo queda recorrer todo de nuevo.
+                self.resincronizar()
+                continue
+            nombre = evento.nombre
+            try:
+                estado = self.almacenamiento.estado(nombre)
+            except OSError:
+                continue
+            with self._bloqueo:
+                previa = self.catalogo.entradas.get(nombre)
+            if estado is None:
+                self.cache.invalidar(nombre)
+                if previa is not None:
+                    with self._bloqueo:
+                        self.catalogo.eliminar(nombre)
+                        self._indice.eliminar(nombre)
+                continue
+            if previa is not None and (previa["mtime"], previa["tamano"]) == estado:
+                # Eco de una escritura propia: el catálogo ya la refleja.
+                continue
+            self.cache.invalidar(nombre)
+            fecha = self._leer_fecha(nombre)
+            with self._bloqueo:
+                self.catalogo.actualizar(nombre, fecha, estado)
+            self._indexar(nombre)
+
+    def cerrar(self):
+        """
+        Detiene los hilos y procesos auxiliares, persiste el catálogo,
+        compacta el índice si se cargó y tiene cambios en su diario y libera
+        el almacenamiento.
+        """
+        self.dejar_de_vigilar()
+        if self._buscador is not None:
+            self._buscador.cerrar()
+        with self._bloqueo:
+            self.catalogo.guardar_instantanea()
+            if self._indice.cambios_pendientes():
+                self._indice.compactar()
+        self.almacenamiento.cerrar()
 
     def cargar_desde_pickle(self, carpeta_export="exports", archivo_salida="notas.pkl"):
         """Recupera el diccionario de notas serializadas desde el archivo binario."""
-        ruta_pickle = os.path.join(self.carpeta, carpeta_export, archivo_salida)
-        repositorio = (
-            self.pickle_repository
-            if ruta_pickle == self.pickle_repository.ruta_archivo
-            else PickleRepository(ruta_pickle)
-        )
-        return repositorio.cargar()
+        return self._repositorio_pickle(carpeta_export, archivo_salida).cargar()
+
+    def iterar_desde_pickle(self, carpeta_export="exports", archivo_salida="notas.pkl"):
+        """Recorre las notas del archivo pickle sin cargarlo entero en memoria."""
+        return self._repositorio_pickle(carpeta_export, archivo_salida).iterar()
+
+    def obtener_desde_pickle(self, nombre, carpeta_export="exports", archivo_salida="notas.pkl"):
+        """Recupera una sola nota del archivo pickle, o `None` si no está."""
+        return self._repositorio_pickle(carpeta_export, archivo_salida).obtener(nombre)
@@ -0,0 +1,219 @@
+import difflib
+import json
+import os
+import re
+import threading
+import time
+
+from services.almacenamiento_fragmentado import fragmentos_de
+
+# Unidades de los deltas, en el orden en que se prueban: las notas escritas
+# desde el menú o la línea de órdenes suelen ser una sola línea larga, en las
+# que un delta por líneas equivale a copiar el texto entero.
+UNIDADES_DELTA = ("lineas", "palabras")
+_PALABRAS = re.compile(r"\s+|\S+\s*")
+# Por encima de este producto de trozos la comparación exacta deja de ser
+# barata y `SequenceMatcher` pasa a ignorar los trozos más frecuentes.
+LIMITE_COMPARACION = 250_000
+
+
+def _dividir(texto, unidad):
+    """Trocea el texto en líneas o en palabras (con su espacio final); unir los trozos devuelve el texto."""
+    if unidad == "palabras":
+        return _PALABRAS.findall(texto)
+    return texto.splitlines(keepends=True)
+
+
+def calcular_delta(base, nuevo, unidad="lineas"):
+    """
+    Delta por líneas (o por palabras) que transforma `base` en `nuevo`: una
+    lista cuyos elementos son `[inicio, fin]` (copiar esos trozos de la base)
+    o el texto que hay que insertar.
+    """
+    trozos_base = _dividir(base, unidad)
+    trozos_nuevos = _dividir(nuevo, unidad)
+    # Una edición suele tocar un solo tramo: el principio y el final comunes
+    # se copian sin pasar por `SequenceMatcher`.
+    comun = min(len(trozos_base), len(trozos_nuevos))
+    inicio = 0
+    while inicio < comun and trozos_base[inicio] == trozos_nuevos[inicio]:
+        inicio += 1
+    final = 0
+    while final < comun - inicio and trozos_base[-1 - final] == trozos_nuevos[-1 - final]:
+        final += 1
+    fin_base = len(trozos_base) - final
+    fin_nuevo = len(trozos_nuevos) - final
+
+    delta = [[0, inicio]] if inicio else []
+    comparador = difflib.SequenceMatcher(
+        None,
+        trozos_base[inicio:fin_base],
+        trozos_nuevos[inicio:fin_nuevo],
+        autojunk=(fin_base - inicio) * (fin_nuevo - inicio) > LIMITE_COMPARACION,
+    )
+    for etiqueta, i1, i2, j1, j2 in comparador.get_opcodes():
+        if etiqueta == "equal":
+            delta.append([inicio + i1, inicio + i2])
+        elif j2 > j1:
+            delta.append("".join(trozos_nuevos[inicio + j1:inicio + j2]))
+    if final:
+        delta.append([fin_base, len(trozos_base)])
+    return delta
+
+
+def aplicar_delta(base, delta, unidad="lineas"):
+    """Reconstruye el texto a partir de su base y del delta de `calcular_delta`."""
+    trozos_base = _dividir(base, unidad)
+    partes = []
+    for operacion in delta:
+        if isinstance(operacion, str):
+            partes.append(operacion)
+        else:
+            partes.extend(trozos_base[operacion[0]:operacion[1]])
+    return "".join(partes)
+
+
+class HistorialNotas:
+    """
+    Historial de versiones anteriores de cada nota, guardado como deltas.
+
+    Cada nota tiene un archivo JSON Lines en `<ruta_directorio>/<aa>/` con una
+    línea por versión. La mayoría de líneas son deltas respecto a la versión
+    anterior: por líneas o, si así no ahorran al menos la mitad del texto
+    (notas de una sola línea), por palabras, indicado en `unidad`. Cada
+    `intervalo_completa` versiones (o cuando ningún delta compensa) se guarda
+    el texto completo como punto de partida, así leer cualquier versión
+    aplica pocos deltas.
+
+    Se conservan como mucho `max_versiones` versiones: cuando se supera ese
+    límite en `intervalo_completa` versiones, el archivo se reescribe sin las
+    más antiguas y la primera conservada pasa a ser completa.
+    """
+
+    def __init__(self, ruta_directorio, intervalo_completa=10, max_versiones=50):
+        self.ruta_directorio = ruta_directorio
+        self.intervalo_completa = intervalo_completa
+        self.max_versiones = max_versiones
+        self._bloqueo = threading.Lock()
+
+    def _ruta(self, nombre):
+        return os.path.join(self.ruta_directorio, *fragmentos_de(nombre, niveles=1), f"{nombre}.jsonl")
+
+    def _cargar(self, nombre):
+        """Devuelve los registros de la nota y si el archivo terminaba en una línea íntegra."""
+        registros = []
+        try:
+            with open(self._ruta(nombre), "r", encoding="utf-8") as archivo:
+                for linea in archivo:
+                    try:
+                        registros.append(json.loads(linea))
+                    except json.JSONDecodeError:
+                        # Una última línea truncada por un corte no invalida el resto.
+                        return registros, False
+        except FileNotFoundError:
+            pass
+        return registros, True
+
+    @staticmethod
+    def _reconstruir(registros, posicion):
+        inicio = posicion
+        while "completa" not in registros[inicio]:
+            inicio -= 1
+        texto = registros[inicio]["completa"]
+        for registro in registros[inicio + 1:posicion + 1]:
+            texto = aplicar_delta(texto, registro["delta"], registro.get("unidad", "lineas"))
+        return texto
+
+    def registrar(self, nombre, texto, marca=None):
+        """Añade `texto` como nueva versión de la nota y devuelve su número."""
+        with self._bloqueo:
+            registros, integro = self._cargar(nombre)
+            version = registros[-1]["v"] + 1 if registros else 1
+            registro = {"v": version, "marca": int(time.time()) if marca is None else marca,
+                        "tamano": len(texto.encode("utf-8"))}
+            desde_completa = 0
+            for previo in reversed(registros):
+                if "completa" in previo:
+                    break
+                desde_completa += 1
+            if registros and desde_completa + 1 < self.intervalo_completa:
+                anterior = self._reconstruir(registros, len(registros) - 1)
+                for unidad in UNIDADES_DELTA:
+                    delta = calcular_delta(anterior, texto, unidad)
+                    if len(json.dumps(delta, ensure_ascii=False)) * 2 < len(texto):
+                        registro["delta"] = delta
+                        if unidad != "lineas":
+                            registro["unidad"] = unidad
+                        break
+            if "delta" not in registro:
+                registro["completa"] = texto
+
+            registros.append(registro)
+            if not integro or len(registros) >= self.max_versiones + self.intervalo_completa:
+                # Reescribir también descarta la línea truncada en lugar de añadir tras ella.
+                self._reescribir(nombre, registros[-self.max_versiones:], registros)
+                return version
+            ruta = self._ruta(nombre)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "a", encoding="utf-8") as archivo:
+                archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            return version
+
+    def versiones(self, nombre):
+        """Lista las versiones guardadas como diccionarios `version`, `marca` y `tamano`."""
+        with self._bloqueo:
+            registros, _ = self._cargar(nombre)
+        return [
+            {"version": registro["v"], "marca": registro["marca"], "tamano": registro["tamano"]}
+            for registro in registros
+        ]
+
+    def leer(self, nombre, version):
+        """Devuelve el texto de una versión o `None` si no se conserva."""
+        with self._bloqueo:
+            registros, _ = self._cargar(nombre)
+        for posicion, registro in enumerate(registros):
+            if registro["v"] == version:
+                return self._reconstruir(registros, posicion)
+        return None
+
+    def compactar(self, nombre):
+        """Aplica la retención a una nota aunque no haya alcanzado el margen de reescritura."""
+        with self._bloqueo:
+            registros, _ = self._cargar(nombre)
+            if len(registros) <= self.max_versiones:
+                return False
+            self._reescribir(nombre, registros[-self.max_versiones:], registros)
+            return True
+
+    def compactar_todo(self):
+        """Aplica la retención a todo el historial y devuelve cuántas notas se reescribieron."""
+        compactadas = 0
+        for _, _, archivos in os.walk(self.ruta_directorio):
+            for archivo in archivos:
+                if archivo.endswith(".jsonl") and self.compactar(archivo[:-6]):
+                    compactadas += 1
+        return compactadas
+
+    def _reescribir(self, nombre, conservados, registros):
+        # La primera versión conservada debe ser completa para poder reconstruir el resto.
+        primera = dict(conservados[0])
+        if "delta" in primera:
+            primera["completa"] = self._reconstruir(registros, registros.index(conservados[0]))
+            del primera["delta"]
+            primera.pop("unidad", None)
+        ruta = self._ruta(nombre)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            for registro in [primera, *conservados[1:]]:
+                archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.replace(temporal, ruta)
+
+    def olvidar(self, nombre):
+        """Borra todo el historial de una nota."""
+        with self._bloqueo:
+            try:
+                os.remove(self._ruta(nombre))
+            except FileNotFoundError:
+                pass
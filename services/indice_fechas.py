@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from models.nota import FORMATO_FECHA
+
+ORDENES_FECHA = ("asc", "desc")
+
+
+def limite_de_fecha(valor, final=False):
+    """
+    Convierte un extremo de un rango de fechas en segundos desde la época.
+
+    Admite números (ya en segundos), `datetime` y texto `AAAA-MM-DD HH:MM:SS`
+    o `AAAA-MM-DD`; con `final=True` una fecha sin hora abarca el día entero.
+    Lanza `ValueError` si el valor no se reconoce.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, datetime):
+        return int(valor.timestamp())
+    if not isinstance(valor, str):
+        raise ValueError(f"fecha no reconocida: {valor!r}")
+    try:
+        return int(datetime.strptime(valor, FORMATO_FECHA).timestamp())
+    except ValueError:
+        pass
+    try:
+        dia = datetime.strptime(valor, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"fecha no reconocida: {valor!r}") from None
+    if final:
+        return int((dia + timedelta(days=1)).timestamp()) - 1
+    return int(dia.timestamp())
+
+
+class IndiceFechas:
+    """
+    Índice secundario de las notas ordenado por fecha de creación.
+
+    `marcas` es un `array` de segundos desde la época en orden creciente y
+    `nombres` la lista paralela con la nota de cada posición (a igual marca,
+    por nombre). Un rango se resuelve con dos búsquedas binarias y las notas
+    más recientes son el final de la lista, sin abrir ningún archivo. Las
+    altas y bajas insertan o retiran en su posición. Las notas cuya fecha no
+    sigue `FORMATO_FECHA` no se indexan.
+    """
+
+    def __init__(self, pares=()):
+        """Construye el índice a partir de pares `(marca, nombre)`."""
+        ordenados = sorted(pares)
+        self.marcas = array("q", (marca for marca, _ in ordenados))
+        self.nombres = [nombre for _, nombre in ordenados]
+        self._marca_de = {nombre: marca for marca, nombre in ordenados}
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _posicion(self, marca, nombre):
+        inicio = bisect_left(self.marcas, marca)
+        fin = bisect_right(self.marcas, marca, inicio)
+        return bisect_left(self.nombres, nombre, inicio, fin)
+
+    def actualizar(self, nombre, marca):
+        """Registra (o mueve) una nota en su fecha; con `marca=None` la retira."""
+        previa = self._marca_de.get(nombre)
+        if previa == marca:
+            return
+        if previa is not None:
+            self.eliminar(nombre)
+        if marca is None:
+            return
+        posicion = self._posicion(marca, nombre)
+        self.marcas.insert(posicion, marca)
+        self.nombres.insert(posicion, nombre)
+        self._marca_de[nombre] = marca
+
+    def eliminar(self, nombre):
+        """Retira una nota del índice; devuelve si estaba."""
+        marca = self._marca_de.pop(nombre, None)
+        if marca is None:
+            return False
+        posicion = self._posicion(marca, nombre)
+        del self.marcas[posicion]
+        del self.nombres[posicion]
+        return True
+
+    def rango(self, desde=None, hasta=None, limite=None, orden="asc"):
+        """
+        Nombres de las notas con marca entre `desde` y `hasta` (ambos
+        incluidos; `None` deja el extremo abierto), de la más antigua a la más
+        reciente con `orden="asc"` o al revés con `"desc"`, y como mucho
+        `limite` de ellas empezando por ese orden.
+        """
+        if orden not in ORDENES_FECHA:
+            raise ValueError(f"orden no válido: {orden!r}")
+        inicio = 0 if desde is None else bisect_left(self.marcas, desde)
+        fin = len(self.marcas) if hasta is None else bisect_right(self.marcas, hasta)
+        if orden == "desc":
+            if limite is not None:
+                inicio = max(inicio, fin - limite)
+            return self.nombres[inicio:fin][::-1]
+        if limite is not None:
+            fin = min(fin, inicio + limite)
+        return self.nombres[inicio:fin]
@@ -0,0 +1,227 @@
+import json
+import os
+import pickle
+import re
+
+PATRON_TERMINO = re.compile(r"\w+")
+
+
+def tokenizar(texto):
+    """Divide un texto en términos en minúsculas conservando su orden."""
+    return PATRON_TERMINO.findall(texto.lower())
+
+
+class IndiceInvertido:
+    """
+    Índice invertido persistente que relaciona cada término con las notas y
+    posiciones donde aparece.
+
+    El estado se guarda en dos archivos dentro de `ruta_directorio`: una
+    instantánea binaria (`instantanea.pkl`) y un diario de cambios en JSON
+    Lines (`diario.jsonl`). Cada alta o baja añade una línea al diario, de modo
+    que las actualizaciones son incrementales; cuando el diario crece se
+    compacta en una nueva instantánea.
+
+    Con `cargar=False` no se lee nada al crearlo: las altas y bajas solo se
+    anotan en el diario, sin tocar la memoria, hasta que se llama a `cargar`,
+    que las reaplica junto con el resto. Así quien solo escribe no paga la
+    lectura de la instantánea.
+    """
+
+    def __init__(self, ruta_directorio, limite_diario=500, cargar=True):
+        self.ruta_directorio = ruta_directorio
+        self.ruta_instantanea = os.path.join(ruta_directorio, "instantanea.pkl")
+        self.ruta_diario = os.path.join(ruta_directorio, "diario.jsonl")
+        self.limite_diario = limite_diario
+        self.terminos = {}
+        self.documentos = {}
+        self.version = 0
+        self.cargado = False
+        self._operaciones_diario = 0
+        if cargar:
+            self.cargar()
+
+    def cargar(self):
+        """Reconstruye el índice desde la instantánea y reaplica el diario."""
+        self.terminos = {}
+        self.documentos = {}
+        self.version += 1
+        self.cargado = True
+        self._operaciones_diario = 0
+        if os.path.exists(self.ruta_instantanea):
+            try:
+                with open(self.ruta_instantanea, "rb") as archivo:
+                    datos = pickle.load(archivo)
+                self.terminos = datos.get("terminos", {})
+                self.documentos = datos.get("documentos", {})
+            except (OSError, pickle.PickleError, EOFError, AttributeError):
+                # Una instantánea dañada se descarta; la sincronización la rehace.
+                self.terminos = {}
+                self.documentos = {}
+
+        if not os.path.exists(self.ruta_diario):
+            return
+        try:
+            with open(self.ruta_diario, "r", encoding="utf-8") as diario:
+                for linea in diario:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        # Una última línea truncada por un corte no invalida el resto.
+                        break
+                    self._aplicar(registro)
+                    self._operaciones_diario += 1
+        except OSError:
+            pass
+
+    def compactar(self):
+        """Vuelca el índice completo en una instantánea y vacía el diario."""
+        if not self.cargado:
+            # Sin cargar, la memoria no tiene el índice completo: vaciar el diario lo perdería.
+            return False
+        try:
+            os.makedirs(self.ruta_directorio, exist_ok=True)
+            temporal = f"{self.ruta_instantanea}.tmp"
+            with open(temporal, "wb") as archivo:
+                pickle.dump(
+                    {"terminos": self.terminos, "documentos": self.documentos},
+                    archivo,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(temporal, self.ruta_instantanea)
+            with open(self.ruta_diario, "w", encoding="utf-8"):
+                pass
+            self._operaciones_diario = 0
+        except (OSError, pickle.PickleError):
+            return False
+        return True
+
+    def _registrar(self, registro):
+        """Añade una operación al diario y compacta cuando supera el límite."""
+        try:
+            os.makedirs(self.ruta_directorio, exist_ok=True)
+            with open(self.ruta_diario, "a", encoding="utf-8") as diario:
+                diario.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except OSError:
+            # Si el diario no se puede escribir, la verificación por mtime/tamaño
+            # detectará la entrada desactualizada en el próximo arranque.
+            return
+        self._operaciones_diario += 1
+        if self.cargado and self._operaciones_diario >= max(self.limite_diario, len(self.documentos) // 2):
+            self.compactar()
+
+    def _aplicar(self, registro):
+        if registro.get("op") == "agregar":
+            self._agregar(
+                registro["nombre"],
+                registro["mtime"],
+                registro["tamano"],
+                registro["posiciones"],
+            )
+        elif registro.get("op") == "eliminar":
+            self._quitar(registro["nombre"])
+
+    def _agregar(self, nombre, mtime, tamano, posiciones):
+        self._quitar(nombre)
+        self.version += 1
+        for termino, lista in posiciones.items():
+            self.terminos.setdefault(termino, {})[nombre] = lista
+        self.documentos[nombre] = {
+            "mtime": mtime,
+            "tamano": tamano,
+            "terminos": list(posiciones),
+            "longitud": sum(len(lista) for lista in posiciones.values()),
+        }
+
+    def _quitar(self, nombre):
+        documento = self.documentos.pop(nombre, None)
+        if documento is None:
+            return False
+        self.version += 1
+        for termino in documento["terminos"]:
+            notas = self.terminos.get(termino)
+            if notas is None:
+                continue
+            notas.pop(nombre, None)
+            if not notas:
+                del self.terminos[termino]
+        return True
+
+    def agregar(self, nombre, texto, mtime, tamano, registrar=True):
+        """
+        Indexa (o reindexa) el texto de una nota con su mtime y tamaño.
+
+        Con `registrar=False` solo se actualiza la memoria; lo usan las
+        reconstrucciones completas, que terminan compactando el índice.
+        """
+        posiciones = {}
+        for posicion, termino in enumerate(tokenizar(texto)):
+            posiciones.setdefault(termino, []).append(posicion)
+        if self.cargado:
+            self._agregar(nombre, mtime, tamano, posiciones)
+        if not registrar:
+            return
+        self._registrar({
+            "op": "agregar",
+            "nombre": nombre,
+            "mtime": mtime,
+            "tamano": tamano,
+            "posiciones": posiciones,
+        })
+
+    def eliminar(self, nombre):
+        """Retira una nota del índice si estaba indexada."""
+        # Sin cargar no se sabe si estaba indexada; una baja de más es inocua al reaplicarla.
+        if self._quitar(nombre) or not self.cargado:
+            self._registrar({"op": "eliminar", "nombre": nombre})
+
+    def limpiar(self):
+        """Descarta todo el contenido del índice."""
+        self.terminos = {}
+        self.documentos = {}
+        self.version += 1
+
+    def cambios_pendientes(self):
+        """Indica si hay operaciones del diario cargadas que aún no están en la instantánea."""
+        return self.cargado and self._operaciones_diario > 0
+
+    def esta_vigente(self, nombre, mtime, tamano):
+        """Indica si la entrada de la nota coincide con el mtime y tamaño dados."""
+        documento = self.documentos.get(nombre)
+        return (
+            documento is not None
+            and documento["mtime"] == mtime
+            and documento["tamano"] == tamano
+        )
+
+    def candidatos(self, palabra):
+        """
+        Devuelve las notas que pueden contener `palabra` como subcadena.
+
+        El segundo valor indica si el resultado es exacto. Una consulta formada
+        por un único término se resuelve recorriendo el vocabulario, que crece
+        mucho más despacio que el número de notas. Con varios términos o
+        signos de puntuación se devuelve un superconjunto que debe verificarse
+        contra el texto. Si la consulta no contiene términos se devuelve
+        `None` para que el llamador recurra a un recorrido completo.
+        """
+        consulta = palabra.lower()
+        if not consulta:
+            return set(self.documentos), True
+
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return None, False
+
+        resultado = None
+        for termino in terminos:
+            notas = set()
+            for clave, apariciones in self.terminos.items():
+                if termino in clave:
+                    notas.update(apariciones)
+            resultado = notas if resultado is None else resultado & notas
+            if not resultado:
+                break
+
+        exacto = len(terminos) == 1 and terminos[0] == consulta
+        return resultado or set(), exacto
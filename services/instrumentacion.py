@@ -0,0 +1,266 @@
+import cProfile
+import contextvars
+import functools
+import io
+import pstats
+import threading
+import time
+from collections import namedtuple
+
+# Métodos públicos de `GestorNotas` que se miden cuando la instrumentación está activa.
+# Los generadores (`iterar_*`) quedan fuera: medir su llamada solo mediría su creación.
+METODOS_INSTRUMENTADOS = (
+    "guardar",
+    "guardar_lote",
+    "restaurar_desde_pickle",
+    "leer",
+    "obtener",
+    "listar",
+    "contar",
+    "buscar",
+    "consultar",
+    "editar",
+    "versiones",
+    "leer_version",
+    "revertir",
+    "eliminar",
+    "exportar_json",
+    "exportar_pickle",
+    "cargar_desde_pickle",
+    "obtener_desde_pickle",
+    "reindexar",
+    "compactar_historial",
+    "vigilar",
+    "dejar_de_vigilar",
+    "cerrar",
+)
+
+# Contadores `[bytes_leidos, bytes_escritos, aperturas]` de las llamadas medidas en
+# curso. Es una variable de contexto para que las tareas que `procesar_en_paralelo`
+# lanza en otros hilos sigan sumando en la llamada que las originó.
+_llamadas_en_curso = contextvars.ContextVar("llamadas_en_curso", default=())
+
+EventoLlamada = namedtuple(
+    "EventoLlamada",
+    ["metodo", "segundos", "exito", "bytes_leidos", "bytes_escritos", "aperturas"],
+)
+
+
+def _fallo(resultado):
+    """Interpreta las respuestas `False` o `(False, mensaje)` del servicio como fallos."""
+    if resultado is False:
+        return True
+    return isinstance(resultado, tuple) and len(resultado) == 2 and resultado[0] is False
+
+
+class Instrumentacion:
+    """
+    Registro opcional de tiempos y contadores de E/S por método público.
+
+    `GestorNotas(instrumentacion=Instrumentacion())` envuelve sus métodos
+    públicos y su almacenamiento; sin ella no hay ningún coste añadido. Por
+    cada método se acumulan llamadas, fallos (respuestas `False` o
+    `(False, mensaje)`), tiempo total y máximo, bytes leídos y escritos y
+    aperturas en el almacenamiento de notas (operaciones sobre una nota
+    individual, que en el backend de texto equivalen a archivos abiertos).
+    Los contadores son inclusivos: una llamada anidada, como `guardar_lote`
+    dentro de `restaurar_desde_pickle`, suma en ambos métodos.
+
+    Los ganchos registrados con `agregar_gancho` reciben un `EventoLlamada`
+    al terminar cada llamada; una excepción en un gancho se propaga.
+    """
+
+    def __init__(self, perfilar=False):
+        self._bloqueo = threading.Lock()
+        self._metricas = {}
+        self._ganchos = []
+        self._perfil = None
+        self._bloqueo_perfil = threading.Lock()
+        if perfilar:
+            self.perfilar(True)
+
+    def agregar_gancho(self, gancho):
+        """Registra `gancho(evento)` para cada llamada medida."""
+        with self._bloqueo:
+            self._ganchos.append(gancho)
+
+    def quitar_gancho(self, gancho):
+        with self._bloqueo:
+            self._ganchos.remove(gancho)
+
+    def envolver(self, metodo, funcion):
+        """Devuelve `funcion` medida bajo el nombre `metodo`."""
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            en_curso = _llamadas_en_curso.get()
+            contadores = [0, 0, 0]
+            ficha = _llamadas_en_curso.set(en_curso + (contadores,))
+            perfil = self._iniciar_perfil() if not en_curso else None
+            inicio = time.perf_counter()
+            resultado = None
+            try:
+                resultado = funcion(*args, **kwargs)
+                return resultado
+            finally:
+                segundos = time.perf_counter() - inicio
+                if perfil is not None:
+                    perfil.disable()
+                    self._bloqueo_perfil.release()
+                _llamadas_en_curso.reset(ficha)
+                self._registrar(metodo, segundos, not _fallo(resultado), contadores)
+
+        return medida
+
+    def _registrar(self, metodo, segundos, exito, contadores):
+        evento = EventoLlamada(metodo, segundos, exito, *contadores)
+        with self._bloqueo:
+            metricas = self._metricas.get(metodo)
+            if metricas is None:
+                metricas = self._metricas[metodo] = {
+                    "llamadas": 0,
+                    "fallidas": 0,
+                    "segundos_total": 0.0,
+                    "segundos_max": 0.0,
+                    "bytes_leidos": 0,
+                    "bytes_escritos": 0,
+                    "aperturas": 0,
+                }
+            metricas["llamadas"] += 1
+            metricas["fallidas"] += 0 if exito else 1
+            metricas["segundos_total"] += segundos
+            metricas["segundos_max"] = max(metricas["segundos_max"], segundos)
+            metricas["bytes_leidos"] += evento.bytes_leidos
+            metricas["bytes_escritos"] += evento.bytes_escritos
+            metricas["aperturas"] += evento.aperturas
+            ganchos = list(self._ganchos)
+        for gancho in ganchos:
+            gancho(evento)
+
+    def contar_lectura(self, bytes_leidos, aperturas=1):
+        """Suma una lectura a todas las llamadas medidas en curso."""
+        en_curso = _llamadas_en_curso.get()
+        if en_curso:
+            with self._bloqueo:
+                for contadores in en_curso:
+                    contadores[0] += bytes_leidos
+                    contadores[2] += aperturas
+
+    def contar_escritura(self, bytes_escritos, aperturas=1):
+        """Suma una escritura a todas las llamadas medidas en curso."""
+        en_curso = _llamadas_en_curso.get()
+        if en_curso:
+            with self._bloqueo:
+                for contadores in en_curso:
+                    contadores[1] += bytes_escritos
+                    contadores[2] += aperturas
+
+    def perfilar(self, activo=True):
+        """
+        Activa o desactiva la captura con `cProfile`.
+
+        Se perfila cada llamada de primer nivel; si otro hilo ya está siendo
+        perfilado, la llamada se mide igualmente pero no entra en el perfil.
+        Al activarlo se descarta el perfil anterior.
+        """
+        with self._bloqueo:
+            self._perfil = cProfile.Profile() if activo else None
+
+    @property
+    def perfilando(self):
+        return self._perfil is not None
+
+    def _iniciar_perfil(self):
+        perfil = self._perfil
+        if perfil is None or not self._bloqueo_perfil.acquire(blocking=False):
+            return None
+        perfil.enable()
+        return perfil
+
+    def informe_perfil(self, limite=25, orden="cumulative"):
+        """Texto de `pstats` con las funciones más costosas del perfil capturado."""
+        perfil = self._perfil
+        if perfil is None:
+            return "La captura de perfil está desactivada."
+        with self._bloqueo_perfil:
+            salida = io.StringIO()
+            try:
+                pstats.Stats(perfil, stream=salida).sort_stats(orden).print_stats(limite)
+            except TypeError:
+                # `pstats` rechaza un perfil sin datos.
+                return "El perfil aún no tiene datos."
+        return salida.getvalue()
+
+    def estadisticas(self):
+        """Copia de las métricas por método, con la media en milisegundos."""
+        with self._bloqueo:
+            resultado = {}
+            for metodo, metricas in self._metricas.items():
+                copia = dict(metricas)
+                copia["media_ms"] = round(metricas["segundos_total"] / metricas["llamadas"] * 1000, 4)
+                copia["segundos_total"] = round(metricas["segundos_total"], 6)
+                copia["segundos_max"] = round(metricas["segundos_max"], 6)
+                resultado[metodo] = copia
+            return resultado
+
+    def informe(self):
+        """Tabla de texto con las métricas, ordenada por tiempo total."""
+        estadisticas = self.estadisticas()
+        if not estadisticas:
+            return "Aún no hay llamadas registradas."
+        lineas = [
+            f"{'método':<24}{'llamadas':>9}{'fallidas':>9}{'total s':>11}{'media ms':>11}"
+            f"{'máx ms':>11}{'leídos':>12}{'escritos':>12}{'aperturas':>10}"
+        ]
+        for metodo, datos in sorted(estadisticas.items(), key=lambda par: -par[1]["segundos_total"]):
+            lineas.append(
+                f"{metodo:<24}{datos['llamadas']:>9}{datos['fallidas']:>9}"
+                f"{datos['segundos_total']:>11.4f}{datos['media_ms']:>11.3f}"
+                f"{datos['segundos_max'] * 1000:>11.3f}{datos['bytes_leidos']:>12}"
+                f"{datos['bytes_escritos']:>12}{datos['aperturas']:>10}"
+            )
+        return "\n".join(lineas)
+
+    def reiniciar(self):
+        """Pone a cero las métricas (los ganchos y el modo de perfil se conservan)."""
+        with self._bloqueo:
+            self._metricas.clear()
+            if self._perfil is not None:
+                self._perfil = cProfile.Profile()
+
+
+class AlmacenamientoInstrumentado:
+    """
+    Envoltorio de un `Almacenamiento` que informa a la instrumentación de los
+    bytes leídos y escritos y de las notas abiertas. Delega cualquier otro
+    atributo en el almacenamiento original.
+    """
+
+    def __init__(self, almacenamiento, instrumentacion):
+        self._almacenamiento = almacenamiento
+        self._instrumentacion = instrumentacion
+
+    def __getattr__(self, nombre):
+        return getattr(self._almacenamiento, nombre)
+
+    def leer(self, nombre):
+        texto = self._almacenamiento.leer(nombre)
+        self._instrumentacion.contar_lectura(len(texto.encode("utf-8")))
+        return texto
+
+    def leer_encabezado(self, nombre):
+        encabezado = self._almacenamiento.leer_encabezado(nombre)
+        self._instrumentacion.contar_lectura(len(encabezado.encode("utf-8")) + 1)
+        return encabezado
+
+    def escribir(self, nombre, texto):
+        estado = self._almacenamiento.escribir(nombre, texto)
+        self._instrumentacion.contar_escritura(estado.tamano)
+        return estado
+
+    def escribir_lote(self, notas):
+        estados = self._almacenamiento.escribir_lote(notas)
+        self._instrumentacion.contar_escritura(
+            sum(estado.tamano for estado in estados), aperturas=len(estados)
+        )
+        return estados
@@ -0,0 +1,51 @@
+import json
+
+# Códigos de error de JSON-RPC 2.0 y los propios del servidor de notas.
+ERROR_ANALISIS = -32700
+PETICION_INVALIDA = -32600
+METODO_INEXISTENTE = -32601
+PARAMETROS_INVALIDOS = -32602
+ERROR_INTERNO = -32603
+# La orden se ejecutó y respondió `(False, mensaje)`.
+ERROR_OPERACION = -32000
+TIEMPO_AGOTADO = -32001
+
+
+class ErrorRemoto(Exception):
+    """Error de protocolo devuelto por el servidor (método inexistente, parámetros, fallo interno...)."""
+
+    def __init__(self, codigo, mensaje, datos=None):
+        super().__init__(f"{mensaje} (código {codigo})")
+        self.codigo = codigo
+        self.mensaje = mensaje
+        self.datos = datos
+
+
+def respuesta(identificador, resultado):
+    return {"jsonrpc": "2.0", "id": identificador, "result": resultado}
+
+
+def error(identificador, codigo, mensaje, datos=None):
+    detalle = {"code": codigo, "message": mensaje}
+    if datos is not None:
+        detalle["data"] = datos
+    return {"jsonrpc": "2.0", "id": identificador, "error": detalle}
+
+
+def serializar(mensaje):
+    return json.dumps(mensaje, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def interpretar(mensaje):
+    """
+    Convierte una respuesta en el `(exito, resultado)` de las órdenes: un
+    `result` es un éxito y un `ERROR_OPERACION` un fallo de la orden, con su
+    mensaje o sus datos. El resto de errores se lanzan como `ErrorRemoto`.
+    """
+    if "error" not in mensaje:
+        return True, mensaje.get("result")
+    detalle = mensaje["error"]
+    if detalle.get("code") == ERROR_OPERACION:
+        datos = detalle.get("data")
+        return False, datos if datos is not None else detalle.get("message")
+    raise ErrorRemoto(detalle.get("code"), detalle.get("message"), detalle.get("data"))
@@ -0,0 +1,162 @@
+import argparse
+import os
+
+from services.almacenamiento import TIPOS_ALMACENAMIENTO, crear_almacenamiento
+from services.almacenamiento_fragmentado import (
+    CARPETA_RESPALDOS,
+    escribir_distribucion,
+    fragmentos_de,
+    leer_distribucion,
+)
+from services.compresion import METODOS_COMPRESION
+
+
+def migrar(origen, destino, tamano_lote=500):
+    """
+    Copia todas las notas de un almacenamiento a otro respetando su texto
+    completo (incluida la fecha original). Las escrituras se agrupan en lotes
+    para que los backends transaccionales confirmen una vez por lote.
+    Devuelve el número de notas migradas.
+    """
+    migradas = 0
+    lote = []
+    for nombre, _ in origen.entradas():
+        try:
+            lote.append((nombre, origen.leer(nombre)))
+        except FileNotFoundError:
+            continue
+        if len(lote) >= tamano_lote:
+            destino.escribir_lote(lote)
+            migradas += len(lote)
+            lote = []
+    if lote:
+        destino.escribir_lote(lote)
+        migradas += len(lote)
+    return migradas
+
+
+def fragmentar(carpeta, niveles=2, ancho=2):
+    """
+    Convierte una carpeta plana (`<nombre>.txt` y `<nombre>_bak.txt`) a la
+    distribución fragmentada moviendo cada archivo con `os.replace`.
+
+    Mover conserva mtime y tamaño, así que el catálogo y el índice siguen
+    siendo válidos y no hay que releer las notas. La carpeta se marca como
+    fragmentada al final; si la conversión se interrumpe basta con volver a
+    ejecutarla. Devuelve el número de notas movidas.
+    """
+    distribucion = leer_distribucion(carpeta)
+    if distribucion is not None:
+        niveles, ancho = distribucion["niveles"], distribucion["ancho"]
+
+    with os.scandir(carpeta) as entradas:
+        archivos = [entrada.name for entrada in entradas if entrada.name.endswith(".txt") and entrada.is_file()]
+
+    movidas = 0
+    for archivo in archivos:
+        nombre = archivo[:-4]
+        # Igual que en el backend plano, todo `_bak.txt` es un respaldo heredado.
+        if nombre.endswith("_bak"):
+            destino_base = os.path.join(carpeta, CARPETA_RESPALDOS)
+            nombre = nombre[:-4]
+        else:
+            destino_base = carpeta
+            movidas += 1
+        destino = os.path.join(destino_base, *fragmentos_de(nombre, niveles, ancho), f"{nombre}.txt")
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(os.path.join(carpeta, archivo), destino)
+
+    escribir_distribucion(carpeta, niveles, ancho)
+    return movidas
+
+
+def comprimir(carpeta, metodo, muestras=1000, tamano_lote=500):
+    """
+    Reescribe las notas de una carpeta de archivos con el método de
+    compresión indicado (`None` las deja en texto plano). Antes entrena el
+    diccionario compartido con hasta `muestras` notas. Devuelve el número de
+    notas reescritas; el catálogo y el índice se actualizan al abrir la
+    carpeta porque cambia el mtime de cada nota.
+    """
+    almacenamiento = crear_almacenamiento("texto", carpeta, compresion=metodo)
+    try:
+        if metodo is not None:
+            almacenamiento.entrenar_diccionario(muestras)
+        # La lista se toma antes de reescribir para no recorrer una carpeta que cambia.
+        nombres = [nombre for nombre, _ in almacenamiento.entradas()]
+        reescritas = 0
+        for inicio in range(0, len(nombres), tamano_lote):
+            lote = []
+            for nombre in nombres[inicio:inicio + tamano_lote]:
+                try:
+                    lote.append((nombre, almacenamiento.leer(nombre)))
+                except FileNotFoundError:
+                    continue
+            almacenamiento.escribir_lote(lote)
+            reescritas += len(lote)
+        return reescritas
+    finally:
+        almacenamiento.cerrar()
+
+
+def main(argumentos=None):
+    """Punto de entrada de `python -m services.migracion`."""
+    parser = argparse.ArgumentParser(
+        description="Migra las notas entre backends de almacenamiento."
+    )
+    parser.add_argument("--carpeta", default="notas", help="Carpeta de trabajo de las notas.")
+    parser.add_argument("--desde", choices=TIPOS_ALMACENAMIENTO)
+    parser.add_argument("--hacia", choices=TIPOS_ALMACENAMIENTO)
+    parser.add_argument("--lote", type=int, default=500, help="Notas por transacción.")
+    parser.add_argument(
+        "--fragmentar",
+        action="store_true",
+        help="Convierte la carpeta plana de archivos .txt a subcarpetas por hash.",
+    )
+    parser.add_argument(
+        "--comprimir",
+        choices=(*METODOS_COMPRESION, "ninguna"),
+        help="Reescribe las notas con ese método de compresión (o sin comprimir).",
+    )
+    opciones = parser.parse_args(argumentos)
+
+    if opciones.comprimir:
+        metodo = None if opciones.comprimir == "ninguna" else opciones.comprimir
+        try:
+            reescritas = comprimir(opciones.carpeta, metodo)
+        except OSError:
+            print("No fue posible comprimir las notas. Verifique permisos y reintente.")
+            return 1
+        print(f"Se reescribieron {reescritas} notas ({opciones.comprimir}).")
+        return 0
+
+    if opciones.fragmentar or (opciones.desde, opciones.hacia) == ("texto", "fragmentado"):
+        try:
+            movidas = fragmentar(opciones.carpeta)
+        except OSError:
+            print("No fue posible fragmentar la carpeta. Verifique permisos y reintente.")
+            return 1
+        print(f"Se movieron {movidas} notas a la distribución fragmentada.")
+        return 0
+
+    if not opciones.desde or not opciones.hacia:
+        parser.error("Indique --desde y --hacia, o use --fragmentar o --comprimir.")
+    if opciones.desde == opciones.hacia or {opciones.desde, opciones.hacia} == {"texto", "fragmentado"}:
+        parser.error("El origen y el destino deben ser distintos.")
+
+    origen = crear_almacenamiento(opciones.desde, opciones.carpeta)
+    destino = crear_almacenamiento(opciones.hacia, opciones.carpeta)
+    try:
+        migradas = migrar(origen, destino, opciones.lote)
+    except OSError:
+        print("No fue posible completar la migración. Verifique permisos y reintente.")
+        return 1
+    finally:
+        origen.cerrar()
+        destino.cerrar()
+    print(f"Se migraron {migradas} notas de {opciones.desde} a {opciones.hacia}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,273 @@
+import bisect
+import heapq
+import math
+import re
+
+from services.indice_invertido import tokenizar
+
+PATRON_CONSULTA = re.compile(r'\(|\)|"[^"]*"?|[^\s()"]+')
+OPERADORES = {"AND", "OR", "NOT"}
+
+
+class ConsultaInvalida(ValueError):
+    """Se lanza cuando la consulta no respeta la sintaxis admitida."""
+
+
+class MotorBusqueda:
+    """
+    Motor de consultas con ranking BM25 sobre el índice invertido.
+
+    Sintaxis admitida: términos sueltos (unidos con AND implícito), los
+    operadores `AND`, `OR` y `NOT` en mayúsculas, paréntesis, frases entre
+    comillas (`"texto exacto"`) y prefijos terminados en `*` (`conten*`).
+    Solo se puntúan las notas que satisfacen la consulta y el top-k se obtiene
+    con un montículo acotado, sin ordenar el conjunto completo.
+    """
+
+    def __init__(self, indice, k1=1.2, b=0.75):
+        self.indice = indice
+        self.k1 = k1
+        self.b = b
+        self._version_vocabulario = None
+        self._vocabulario = []
+        self._version_longitud = None
+        self._longitud_media = 0.0
+
+    def analizar(self, consulta):
+        """Convierte el texto de la consulta en un árbol de nodos."""
+        fichas = PATRON_CONSULTA.findall(consulta)
+        if not fichas:
+            raise ConsultaInvalida("La consulta está vacía.")
+        arbol, posicion = self._analizar_o(fichas, 0)
+        if posicion != len(fichas):
+            raise ConsultaInvalida(f"Símbolo inesperado: {fichas[posicion]}")
+        return arbol
+
+    def _analizar_o(self, fichas, posicion):
+        nodos = []
+        nodo, posicion = self._analizar_y(fichas, posicion)
+        nodos.append(nodo)
+        while posicion < len(fichas) and fichas[posicion] == "OR":
+            nodo, posicion = self._analizar_y(fichas, posicion + 1)
+            nodos.append(nodo)
+        return (nodos[0] if len(nodos) == 1 else ("o", nodos)), posicion
+
+    def _analizar_y(self, fichas, posicion):
+        nodos = []
+        nodo, posicion = self._analizar_no(fichas, posicion)
+        nodos.append(nodo)
+        while posicion < len(fichas) and fichas[posicion] not in ("OR", ")"):
+            if fichas[posicion] == "AND":
+                posicion += 1
+            nodo, posicion = self._analizar_no(fichas, posicion)
+            nodos.append(nodo)
+        return (nodos[0] if len(nodos) == 1 else ("y", nodos)), posicion
+
+    def _analizar_no(self, fichas, posicion):
+        if posicion < len(fichas) and fichas[posicion] == "NOT":
+            nodo, posicion = self._analizar_no(fichas, posicion + 1)
+            return ("no", nodo), posicion
+        return self._analizar_primario(fichas, posicion)
+
+    def _analizar_primario(self, fichas, posicion):
+        if posicion >= len(fichas):
+            raise ConsultaInvalida("La consulta termina de forma inesperada.")
+        ficha = fichas[posicion]
+        if ficha == "(":
+            nodo, posicion = self._analizar_o(fichas, posicion + 1)
+            if posicion >= len(fichas) or fichas[posicion] != ")":
+                raise ConsultaInvalida("Falta cerrar un paréntesis.")
+            return nodo, posicion + 1
+        if ficha == ")" or ficha in OPERADORES:
+            raise ConsultaInvalida(f"Símbolo inesperado: {ficha}")
+        if ficha.startswith('"'):
+            terminos = tokenizar(ficha.strip('"'))
+            if not terminos:
+                raise ConsultaInvalida("La frase entre comillas está vacía.")
+            return self._nodo_terminos(terminos), posicion + 1
+        if ficha.endswith("*"):
+            terminos = tokenizar(ficha[:-1])
+            if len(terminos) != 1:
+                raise ConsultaInvalida(f"Prefijo no válido: {ficha}")
+            return ("prefijo", terminos[0]), posicion + 1
+        terminos = tokenizar(ficha)
+        if not terminos:
+            raise ConsultaInvalida(f"Término no válido: {ficha}")
+        return self._nodo_terminos(terminos), posicion + 1
+
+    @staticmethod
+    def _nodo_terminos(terminos):
+        # Un término con puntuación interna ("e-mail") se trata como frase.
+        return ("termino", terminos[0]) if len(terminos) == 1 else ("frase", terminos)
+
+    def _terminos_con_prefijo(self, prefijo):
+        """Devuelve los términos del vocabulario que empiezan por `prefijo`."""
+        if self._version_vocabulario != self.indice.version:
+            self._vocabulario = sorted(self.indice.terminos)
+            self._version_vocabulario = self.indice.version
+        inicio = bisect.bisect_left(self._vocabulario, prefijo)
+        terminos = []
+        for termino in self._vocabulario[inicio:]:
+            if not termino.startswith(prefijo):
+                break
+            terminos.append(termino)
+        return terminos
+
+    def _frecuencias_frase(self, terminos):
+        """Cuenta cuántas veces aparece la frase completa en cada nota."""
+        listas = [self.indice.terminos.get(termino, {}) for termino in terminos]
+        if not all(listas):
+            return {}
+        comunes = set(min(listas, key=len))
+        for apariciones in listas:
+            comunes &= apariciones.keys()
+        frecuencias = {}
+        for nombre in comunes:
+            siguientes = set(listas[0][nombre])
+            for desplazamiento, apariciones in enumerate(listas[1:], start=1):
+                posiciones = set(apariciones[nombre])
+                siguientes = {
+                    inicio for inicio in siguientes if inicio + desplazamiento in posiciones
+                }
+                if not siguientes:
+                    break
+            if siguientes:
+                frecuencias[nombre] = len(siguientes)
+        return frecuencias
+
+    def _evaluar(self, nodo, criterios, negado=False):
+        """Resuelve un nodo a un conjunto de notas y recoge los criterios a puntuar."""
+        tipo = nodo[0]
+        if tipo == "termino":
+            frecuencias = {
+                nombre: len(posiciones)
+                for nombre, posiciones in self.indice.terminos.get(nodo[1], {}).items()
+            }
+            if not negado:
+                criterios.append(frecuencias)
+            return set(frecuencias)
+        if tipo == "prefijo":
+            notas = set()
+            for termino in self._terminos_con_prefijo(nodo[1]):
+                apariciones = self.indice.terminos[termino]
+                if not negado:
+                    criterios.append({n: len(p) for n, p in apariciones.items()})
+                notas.update(apariciones)
+            return notas
+        if tipo == "frase":
+            frecuencias = self._frecuencias_frase(nodo[1])
+            if not negado:
+                criterios.append(frecuencias)
+            return set(frecuencias)
+        if tipo == "no":
+            return set(self.indice.documentos) - self._evaluar(nodo[1], criterios, not negado)
+        if tipo == "o":
+            notas = set()
+            for hijo in nodo[1]:
+                notas |= self._evaluar(hijo, criterios, negado)
+            return notas
+
+        # Conjunción: las negaciones se restan al final para no partir del universo.
+        positivos = [hijo for hijo in nodo[1] if hijo[0] != "no"]
+        negativos = [hijo[1] for hijo in nodo[1] if hijo[0] == "no"]
+        notas = None
+        for hijo in positivos:
+            parcial = self._evaluar(hijo, criterios, negado)
+            notas = parcial if notas is None else notas & parcial
+        if notas is None:
+            notas = set(self.indice.documentos)
+        for hijo in negativos:
+            if not notas:
+                break
+            notas -= self._evaluar(hijo, criterios, not negado)
+        return notas
+
+    def _media_longitud(self):
+        if self._version_longitud != self.indice.version:
+            documentos = self.indice.documentos
+            total = sum(documento["longitud"] for documento in documentos.values())
+            self._longitud_media = total / len(documentos) if documentos else 0.0
+            self._version_longitud = self.indice.version
+        return self._longitud_media
+
+    def _puntuar(self, nombre, criterios, total_notas, longitud_media):
+        longitud = self.indice.documentos[nombre]["longitud"]
+        normalizacion = self.k1 * (
+            1 - self.b + self.b * longitud / (longitud_media or 1)
+        )
+        puntuacion = 0.0
+        for frecuencias in criterios:
+            tf = frecuencias.get(nombre)
+            if not tf:
+                continue
+            df = len(frecuencias)
+            idf = math.log(1 + (total_notas - df + 0.5) / (df + 0.5))
+            puntuacion += idf * tf * (self.k1 + 1) / (tf + normalizacion)
+        return puntuacion
+
+    def consultar(self, consulta, limite=10, desplazamiento=0):
+        """
+        Ejecuta la consulta y devuelve `(total, pagina)`.
+
+        `pagina` es una lista de tuplas `(nombre, puntuacion)` ordenada de
+        mayor a menor relevancia con como mucho `limite` elementos a partir de
+        `desplazamiento`. El montículo solo retiene `desplazamiento + limite`
+        candidatos.
+        """
+        arbol = self.analizar(consulta)
+        criterios = []
+        notas = self._evaluar(arbol, criterios)
+        total_notas = len(self.indice.documentos)
+        longitud_media = self._media_longitud()
+        puntuadas = (
+            (self._puntuar(nombre, criterios, total_notas, longitud_media), nombre)
+            for nombre in notas
+        )
+        # A igual puntuación se desempata por nombre para que la paginación sea estable.
+        mejores = heapq.nsmallest(
+            desplazamiento + limite, puntuadas, key=lambda par: (-par[0], par[1])
+        )
+        pagina = [(nombre, puntuacion) for puntuacion, nombre in mejores[desplazamiento:]]
+        return len(notas), pagina
+
+    def terminos_destacados(self, consulta):
+        """Lista los términos positivos de la consulta, útil para generar fragmentos."""
+        terminos = []
+
+        def recorrer(nodo, negado=False):
+            tipo = nodo[0]
+            if tipo == "termino" and not negado:
+                terminos.append(nodo[1])
+            elif tipo == "prefijo" and not negado:
+                terminos.append(nodo[1])
+            elif tipo == "frase" and not negado:
+                terminos.append(" ".join(nodo[1]))
+            elif tipo == "no":
+                recorrer(nodo[1], not negado)
+            elif tipo in ("y", "o"):
+                for hijo in nodo[1]:
+                    recorrer(hijo, negado)
+
+        recorrer(self.analizar(consulta))
+        return terminos
+
+
+def generar_fragmento(texto, terminos, ancho=80):
+    """Extrae un fragmento del texto alrededor de la primera coincidencia."""
+    texto_plano = " ".join(texto.split())
+    minusculas = texto_plano.lower()
+    inicio = -1
+    for termino in terminos:
+        posicion = minusculas.find(termino)
+        if posicion != -1 and (inicio == -1 or posicion < inicio):
+            inicio = posicion
+    if inicio == -1:
+        inicio = 0
+    desde = max(0, inicio - ancho // 4)
+    hasta = min(len(texto_plano), desde + ancho)
+    fragmento = texto_plano[desde:hasta]
+    if desde > 0:
+        fragmento = "…" + fragmento
+    if hasta < len(texto_plano):
+        fragmento += "…"
+    return fragmento
@@ -0,0 +1,175 @@
+from models.nota import Nota
+
+# Órdenes de alto nivel sobre `GestorNotas` compartidas por la línea de
+# órdenes (`main.py`, incluidos sus lotes) y el servidor (`services.servidor`).
+# Cada orden recibe el gestor y sus argumentos por nombre y responde con
+# `(exito, resultado)`, donde `resultado` es un mensaje o datos serializables
+# en JSON.
+
+
+def orden_crear(gestor, nombre, contenido):
+    if len(nombre.strip()) == 0 or len(contenido.strip()) <= 5:
+        return False, "El nombre o el contenido no son válidos."
+    return gestor.guardar(Nota(nombre.strip(), contenido.strip()))
+
+
+def orden_leer(gestor, nombre):
+    return gestor.obtener(nombre)
+
+
+def orden_listar(gestor, desde=None, hasta=None, limite=None, orden=None):
+    return gestor.listar(desde=desde, hasta=hasta, limite=limite, orden=orden)
+
+
+def orden_contar(gestor):
+    return True, gestor.contar()
+
+
+def orden_buscar(gestor, palabra, recorrer=False, limite=None):
+    return True, gestor.buscar(palabra, recorrer=recorrer, limite=limite)
+
+
+def orden_consultar(gestor, consulta, limite=10, desplazamiento=0):
+    return gestor.consultar(consulta, limite, desplazamiento)
+
+
+def orden_editar(gestor, nombre, contenido):
+    return gestor.editar(nombre, contenido.strip())
+
+
+def orden_eliminar(gestor, nombre):
+    return gestor.eliminar(nombre)
+
+
+def orden_versiones(gestor, nombre):
+    return gestor.versiones(nombre)
+
+
+def orden_revertir(gestor, nombre, version):
+    return gestor.revertir(nombre, version)
+
+
+def orden_exportar(gestor, formato="json", archivo=None, comprimir=None, desde=None, hasta=None):
+    if formato == "pickle":
+        if comprimir not in (None, "xz"):
+            return False, "La exportación pickle solo admite compresión xz."
+        archivo = archivo or ("notas.pkl.xz" if comprimir else "notas.pkl")
+        if not gestor.exportar_pickle(archivo_salida=archivo, desde=desde, hasta=hasta):
+            return False, "No fue posible exportar las notas a pickle."
+        return True, {"archivo": archivo}
+
+    exportado = gestor.exportar_json(
+        archivo_salida=archivo, formato=formato, comprimir=comprimir, desde=desde, hasta=hasta
+    )
+    if not exportado:
+        return False, "No fue posible exportar las notas a JSON."
+    if archivo is None:
+        archivo = "notas.jsonl" if formato == "jsonl" else "notas.json"
+        if comprimir:
+            archivo = f"{archivo}.{comprimir}"
+    return True, {"archivo": archivo, **gestor.ultima_exportacion}
+
+
+def orden_restaurar(gestor, archivo="notas.pkl"):
+    resumen = gestor.restaurar_desde_pickle(archivo_salida=archivo)
+    if not resumen["resultados"]:
+        return False, f"No se encontraron datos en {archivo}."
+    fallidas = [
+        {"nombre": nombre, "mensaje": mensaje}
+        for nombre, exito, mensaje in resumen["resultados"]
+        if not exito
+    ]
+    return not fallidas, {
+        "guardadas": resumen["guardadas"],
+        "fallidas": fallidas,
+        "segundos": resumen["segundos"],
+    }
+
+
+ORDENES = {
+    "crear": orden_crear,
+    "leer": orden_leer,
+    "listar": orden_listar,
+    "contar": orden_contar,
+    "buscar": orden_buscar,
+    "consultar": orden_consultar,
+    "editar": orden_editar,
+    "eliminar": orden_eliminar,
+    "versiones": orden_versiones,
+    "revertir": orden_revertir,
+    "exportar": orden_exportar,
+    "restaurar": orden_restaurar,
+}
+# Órdenes que modifican la nota de su argumento `nombre`; quien las ejecute
+# en paralelo debe serializarlas por nota.
+ORDENES_DE_ESCRITURA = frozenset({"crear", "editar", "eliminar", "revertir"})
+
+
+# Tipos admitidos para cada argumento, que significa lo mismo en todas las
+# órdenes. Los lotes y el servidor reciben JSON sin pasar por argparse, así
+# que se comprueban antes de llamar a la orden.
+_TEXTO = ((str,), "un texto")
+_ENTERO = ((int,), "un número entero")
+_LOGICO = ((bool,), "true o false")
+_FECHA = ((str, int, float), "una fecha AAAA-MM-DD o segundos desde la época")
+TIPOS_ARGUMENTOS = {
+    "nombre": _TEXTO,
+    "contenido": _TEXTO,
+    "palabra": _TEXTO,
+    "consulta": _TEXTO,
+    "orden": _TEXTO,
+    "formato": _TEXTO,
+    "archivo": _TEXTO,
+    "comprimir": _TEXTO,
+    "limite": _ENTERO,
+    "desplazamiento": _ENTERO,
+    "version": _ENTERO,
+    "recorrer": _LOGICO,
+    "desde": _FECHA,
+    "hasta": _FECHA,
+}
+
+
+class OrdenInvalida(ValueError):
+    """Los argumentos no encajan con la firma de la orden."""
+
+
+class OrdenDesconocida(OrdenInvalida):
+    """La orden no existe."""
+
+
+def _comprobar_tipos(orden, funcion, argumentos, posicionales):
+    """Lanza `OrdenInvalida` si algún argumento no tiene el tipo de `TIPOS_ARGUMENTOS`."""
+    codigo = funcion.__code__
+    parametros = codigo.co_varnames[1:codigo.co_argcount]
+    omisiones = funcion.__defaults__ or ()
+    opcionales = dict(zip(parametros[len(parametros) - len(omisiones):], omisiones))
+    for nombre, valor in (*zip(parametros, posicionales), *argumentos.items()):
+        if nombre not in TIPOS_ARGUMENTOS:
+            # Los nombres desconocidos los rechaza la propia llamada.
+            continue
+        if valor is None and nombre in opcionales and opcionales[nombre] is None:
+            continue
+        tipos, descripcion = TIPOS_ARGUMENTOS[nombre]
+        # `bool` es subclase de `int`, pero `limite=true` no es un número.
+        if not isinstance(valor, tipos) or (isinstance(valor, bool) and bool not in tipos):
+            raise OrdenInvalida(f"Argumentos no válidos para {orden}: {nombre} debe ser {descripcion}.")
+
+
+def ejecutar_orden(gestor, orden, argumentos=None, posicionales=()):
+    """
+    Ejecuta una orden de `ORDENES` y devuelve su `(exito, resultado)`.
+    Lanza `OrdenDesconocida` u `OrdenInvalida` si la orden no existe o sus
+    argumentos no encajan.
+    """
+    funcion = ORDENES.get(orden)
+    if funcion is None:
+        raise OrdenDesconocida(f"Orden desconocida: {orden!r}.")
+    _comprobar_tipos(orden, funcion, argumentos or {}, posicionales)
+    try:
+        return funcion(gestor, *posicionales, **(argumentos or {}))
+    except TypeError as error:
+        if error.__traceback__.tb_next is not None:
+            # Se originó dentro de la orden, no al pasarle los argumentos.
+            raise
+        raise OrdenInvalida(f"Argumentos no válidos para {orden}: {error}") from None
@@ -1,5 +1,13 @@
+import lzma
+import mmap
 import os
 import pickle
+import struct
+import zlib
+
+MAGIA = b"NPKLSEG1"
+PIE = struct.Struct("<QQ")
+TAMANO_PIE = PIE.size + len(MAGIA)
 
 
 class PickleRepository:
@@ -10,34 +18,263 @@ class PickleRepository:
     y reutiliza la serialización nativa de Python. Limitaciones: el formato no
     es legible por humanos, no es seguro cargar datos de fuentes no confiables y
     depende de la versión de Python/pickle.
+
+    El archivo se organiza en segmentos: varios diccionarios pickle
+    independientes seguidos de un índice (nombre → segmento y mtime) y de un
+    pie con la posición del índice. Así se puede recuperar una nota sin
+    deserializar el resto (mediante `mmap`), recorrer el contenido segmento a
+    segmento y actualizar la exportación reescribiendo solo los segmentos con
+    notas modificadas. Las actualizaciones solo añaden al final y nunca tocan
+    los bytes del índice anterior: si se interrumpen antes de completar el
+    pie, la lectura retrocede hasta el último pie válido y recupera la
+    exportación previa. Los archivos antiguos, con un único diccionario, se
+    siguen leyendo.
+
+    Si la ruta termina en `.xz` cada segmento se comprime con xz por
+    separado, así se conservan el acceso a una sola nota y la actualización
+    incremental. El índice indica si los segmentos están comprimidos, de
+    modo que la lectura no depende del nombre del archivo.
     """
 
-    def __init__(self, ruta_archivo="notas.pkl"):
+    def __init__(self, ruta_archivo="notas.pkl", notas_por_segmento=256):
         self.ruta_archivo = ruta_archivo
+        self.notas_por_segmento = notas_por_segmento
+        self.compresion = "xz" if ruta_archivo.endswith(".xz") else None
+        self._indice_cache = None
 
-    def guardar(self, datos):
+    def guardar(self, datos, mtimes=None):
         """Escribe el diccionario de notas serializado en disco."""
         carpeta_destino = os.path.dirname(self.ruta_archivo)
         if carpeta_destino and not os.path.exists(carpeta_destino):
             os.makedirs(carpeta_destino)
 
+        mtimes = mtimes or {}
+        total_segmentos = max(1, -(-len(datos) // self.notas_por_segmento))
+        segmentos = [{} for _ in range(total_segmentos)]
+        for nombre, campos in datos.items():
+            segmentos[_segmento_de(nombre, total_segmentos)][nombre] = campos
+
+        temporal = f"{self.ruta_archivo}.tmp"
         try:
-            with open(self.ruta_archivo, "wb") as archivo:
-                pickle.dump(datos, archivo)
+            with open(temporal, "wb") as archivo:
+                archivo.write(MAGIA)
+                indice = {
+                    "total_segmentos": total_segmentos,
+                    "segmentos": {},
+                    "notas": {},
+                    "compresion": self.compresion,
+                }
+                for numero, contenido in enumerate(segmentos):
+                    self._escribir_segmento(archivo, indice, numero, contenido, mtimes)
+                self._escribir_indice(archivo, indice)
+            os.replace(temporal, self.ruta_archivo)
         except (OSError, pickle.PickleError):
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return False
+        self._indice_cache = None
+        return True
+
+    def actualizar(self, mtimes, cargar_nota):
+        """
+        Actualiza la exportación de forma incremental.
+
+        `mtimes` relaciona cada nota vigente con su mtime y `cargar_nota(nombre)`
+        devuelve sus campos (o `None` si ya no puede leerse). Solo se reescriben,
+        al final del archivo, los segmentos con altas, bajas o notas cuyo mtime
+        cambió. Si el archivo no existe, es del formato antiguo o acumula
+        demasiado espacio muerto, se genera de nuevo por completo.
+        """
+        indice = self._leer_indice()
+        if (
+            indice is None
+            or indice.get("compresion") != self.compresion
+            or len(mtimes) > 2 * indice["total_segmentos"] * self.notas_por_segmento
+        ):
+            return self._guardar_completo(mtimes, cargar_nota)
+
+        total_segmentos = indice["total_segmentos"]
+        sucios = {}
+        for nombre, (numero, mtime) in indice["notas"].items():
+            if nombre not in mtimes or mtimes[nombre] != mtime:
+                sucios.setdefault(numero, set()).add(nombre)
+        for nombre in mtimes.keys() - indice["notas"].keys():
+            sucios.setdefault(_segmento_de(nombre, total_segmentos), set()).add(nombre)
+        if not sucios:
+            return True
+
+        try:
+            with open(self.ruta_archivo, "r+b") as archivo:
+                archivo.seek(0, os.SEEK_END)
+                for numero, nombres in sucios.items():
+                    contenido = self._leer_segmento(indice, numero)
+                    for nombre in nombres:
+                        contenido.pop(nombre, None)
+                        indice["notas"].pop(nombre, None)
+                        if nombre in mtimes:
+                            campos = cargar_nota(nombre)
+                            if campos is not None:
+                                contenido[nombre] = campos
+                    self._escribir_segmento(archivo, indice, numero, contenido, mtimes)
+                longitud_indice = self._escribir_indice(archivo, indice, sincronizar=True)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+                tamano_archivo = archivo.tell()
+        except (OSError, pickle.PickleError, lzma.LZMAError):
+            # El bucle modifica el índice cacheado en su sitio, y si el fallo
+            # llegó antes de escribir nada la firma del archivo no cambió.
+            self._indice_cache = None
             return False
+        self._indice_cache = None
+
+        vivos = sum(longitud for _, longitud, _ in indice["segmentos"].values())
+        muertos = tamano_archivo - vivos - longitud_indice - TAMANO_PIE - len(MAGIA)
+        if muertos > vivos:
+            return self.compactar()
         return True
 
+    def compactar(self):
+        """Reescribe el archivo solo con los segmentos vigentes, sin releer las notas."""
+        indice = self._leer_indice()
+        if indice is None:
+            return False
+        mtimes = {nombre: mtime for nombre, (_, mtime) in indice["notas"].items()}
+        return self.guardar(dict(self.iterar()), mtimes)
+
+    def _guardar_completo(self, mtimes, cargar_nota):
+        datos = {}
+        for nombre in mtimes:
+            campos = cargar_nota(nombre)
+            if campos is not None:
+                datos[nombre] = campos
+        return self.guardar(datos, mtimes)
+
     def cargar(self):
         """Recupera el diccionario de notas desde el archivo binario."""
+        return dict(self.iterar())
+
+    def iterar(self):
+        """Recorre las notas como pares `(nombre, campos)` segmento a segmento."""
         if not os.path.exists(self.ruta_archivo):
-            return {}
+            return
+        indice = self._leer_indice()
+        if indice is None:
+            yield from self._cargar_formato_antiguo().items()
+            return
+        for numero in sorted(indice["segmentos"]):
+            try:
+                contenido = self._leer_segmento(indice, numero)
+            except (OSError, pickle.PickleError, EOFError, lzma.LZMAError):
+                continue
+            yield from contenido.items()
+
+    def obtener(self, nombre):
+        """Devuelve los campos de una sola nota sin deserializar el resto, o `None`."""
+        indice = self._leer_indice()
+        if indice is None:
+            return self._cargar_formato_antiguo().get(nombre)
+        ubicacion = indice["notas"].get(nombre)
+        if ubicacion is None:
+            return None
+        try:
+            return self._leer_segmento(indice, ubicacion[0]).get(nombre)
+        except (OSError, pickle.PickleError, EOFError, lzma.LZMAError):
+            return None
+
+    def _cargar_formato_antiguo(self):
         try:
             with open(self.ruta_archivo, "rb") as archivo:
                 datos = pickle.load(archivo)
-        except (OSError, pickle.PickleError):
+        except (OSError, pickle.PickleError, EOFError):
             return {}
 
         if not isinstance(datos, dict):
             return {}
         return datos
+
+    def _escribir_segmento(self, archivo, indice, numero, contenido, mtimes):
+        bloque = pickle.dumps(contenido, protocol=pickle.HIGHEST_PROTOCOL)
+        if indice.get("compresion") == "xz":
+            bloque = lzma.compress(bloque)
+        indice["segmentos"][numero] = (archivo.tell(), len(bloque), list(contenido))
+        for nombre in contenido:
+            indice["notas"][nombre] = (numero, mtimes.get(nombre))
+        archivo.write(bloque)
+
+    @staticmethod
+    def _escribir_indice(archivo, indice, sincronizar=False):
+        bloque = pickle.dumps(indice, protocol=pickle.HIGHEST_PROTOCOL)
+        posicion = archivo.tell()
+        archivo.write(bloque)
+        if sincronizar:
+            # El pie no debe llegar al disco antes que los datos a los que apunta.
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        archivo.write(PIE.pack(posicion, len(bloque)) + MAGIA)
+        return len(bloque)
+
+    def _leer_indice(self):
+        """Lee el índice de segmentos; `None` si el archivo falta o no es segmentado."""
+        try:
+            estado = os.stat(self.ruta_archivo)
+        except OSError:
+            return None
+        firma = (estado.st_mtime_ns, estado.st_size)
+        if self._indice_cache is not None and self._indice_cache[0] == firma:
+            return self._indice_cache[1]
+        if estado.st_size < len(MAGIA) + TAMANO_PIE:
+            return None
+        try:
+            with open(self.ruta_archivo, "rb") as archivo, mmap.mmap(
+                archivo.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapa:
+                if mapa[: len(MAGIA)] != MAGIA:
+                    return None
+                indice = _indice_hasta(mapa, len(mapa))
+                fin = len(mapa)
+                while indice is None:
+                    # Una actualización interrumpida dejó un final incompleto: el
+                    # pie anterior sigue describiendo la exportación previa.
+                    fin = mapa.rfind(MAGIA, len(MAGIA), fin - 1)
+                    if fin < 0:
+                        return None
+                    fin += len(MAGIA)
+                    indice = _indice_hasta(mapa, fin)
+        except (OSError, ValueError):
+            return None
+        self._indice_cache = (firma, indice)
+        return indice
+
+    def _leer_segmento(self, indice, numero):
+        ubicacion = indice["segmentos"].get(numero)
+        if ubicacion is None:
+            return {}
+        posicion, longitud, _ = ubicacion
+        with open(self.ruta_archivo, "rb") as archivo, mmap.mmap(
+            archivo.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapa:
+            bloque = mapa[posicion:posicion + longitud]
+        if indice.get("compresion") == "xz":
+            bloque = lzma.decompress(bloque)
+        return pickle.loads(bloque)
+
+
+def _indice_hasta(mapa, fin):
+    """Índice cuyo pie termina en la posición `fin` del archivo, o `None` si ahí no hay un pie válido."""
+    if fin < len(MAGIA) + TAMANO_PIE or mapa[fin - len(MAGIA):fin] != MAGIA:
+        return None
+    posicion, longitud = PIE.unpack(mapa[fin - TAMANO_PIE:fin - len(MAGIA)])
+    # El índice precede inmediatamente a su pie; si no, la marca es casual.
+    if posicion < len(MAGIA) or posicion + longitud != fin - TAMANO_PIE:
+        return None
+    try:
+        indice = pickle.loads(mapa[posicion:posicion + longitud])
+    except Exception:
+        # Bytes a medio escribir: pickle puede fallar con casi cualquier excepción.
+        return None
+    return indice if isinstance(indice, dict) and "segmentos" in indice else None
+
+
+def _segmento_de(nombre, total_segmentos):
+    """Asigna cada nota a un segmento de forma estable entre ejecuciones."""
+    return zlib.crc32(nombre.encode("utf-8")) % total_segmentos
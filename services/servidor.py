@@ -0,0 +1,346 @@
+import asyncio
+import json
+import os
+import time
+
+from services import jsonrpc, ordenes
+from services.gestor_async import AsyncGestorNotas
+
+# Tamaño máximo de una línea (socket) o de un cuerpo (HTTP) con peticiones.
+TAMANO_MAXIMO_PETICION = 16 * 1024 * 1024
+HOSTS_LOCALES = ("127.0.0.1", "localhost", "[::1]")
+ESTADOS_HTTP = {
+    200: "OK",
+    204: "No Content",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+}
+
+
+def _host_local(cabecera):
+    """Indica si la cabecera `Host` nombra este equipo (con o sin puerto)."""
+    if cabecera.startswith("["):
+        host = cabecera.split("]", 1)[0] + "]"
+    else:
+        host = cabecera.split(":", 1)[0]
+    return host.lower() in HOSTS_LOCALES
+
+
+class ServidorNotas:
+    """
+    Servidor JSON-RPC 2.0 de larga duración sobre un único `GestorNotas`.
+
+    Catálogo, índice, caché de lectura y pool de búsqueda siguen cargados
+    entre peticiones, y varias herramientas locales comparten la misma
+    instancia. Los métodos son las órdenes de `services.ordenes` (`crear`,
+    `leer`, `listar`, `buscar`...), con parámetros por nombre o por posición
+    y el mismo significado que en la línea de órdenes, más `stats`.
+
+    Escucha en un socket Unix (un mensaje JSON por línea) y, si se pide, en
+    HTTP solo local (`POST` con el mensaje en el cuerpo). Cada mensaje puede
+    ser una petición o un lote (una lista), cuyas peticiones se ejecutan en
+    paralelo. Cada conexión atiende sus mensajes en orden, así que un
+    cliente puede encadenar peticiones sin esperar las respuestas
+    (pipelining) y las recibe en el mismo orden. Las conexiones se atienden
+    a la vez, sobre el pool acotado de `AsyncGestorNotas`, que además
+    serializa por nota las órdenes que la modifican.
+
+    Una orden que responde `(False, mensaje)` se devuelve como error
+    `jsonrpc.ERROR_OPERACION` con ese mensaje (y los datos, si no es texto).
+    """
+
+    def __init__(self, gestor=None, max_hilos=4, max_pendientes=64, tiempo_limite=None, **opciones):
+        self.asincrono = AsyncGestorNotas(
+            gestor, max_hilos=max_hilos, max_pendientes=max_pendientes, tiempo_limite=tiempo_limite, **opciones
+        )
+        self.gestor = self.asincrono.gestor
+        self.ruta_socket = None
+        self.puerto_http = None
+        self._servidores = []
+        self._inicio = time.monotonic()
+        self._conexiones = set()
+        self._conexiones_totales = 0
+        self._metricas = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    async def iniciar(self, ruta_socket=None, puerto_http=None, host="127.0.0.1"):
+        """
+        Empieza a escuchar en `ruta_socket` y/o en `host:puerto_http`
+        (`0` elige un puerto libre, que queda en `self.puerto_http`).
+        """
+        if ruta_socket is not None:
+            await self._liberar_socket(ruta_socket)
+            servidor = await asyncio.start_unix_server(
+                self._atender_socket, path=ruta_socket, limit=TAMANO_MAXIMO_PETICION
+            )
+            # El socket da acceso completo a las notas: solo para el usuario actual.
+            os.chmod(ruta_socket, 0o600)
+            self.ruta_socket = ruta_socket
+            self._servidores.append(servidor)
+        if puerto_http is not None:
+            servidor = await asyncio.start_server(self._atender_http, host, puerto_http)
+            self.puerto_http = servidor.sockets[0].getsockname()[1]
+            self._servidores.append(servidor)
+        return self
+
+    async def _liberar_socket(self, ruta):
+        """Borra el socket que dejó un servidor anterior; falla si sigue atendiendo."""
+        if not os.path.exists(ruta):
+            return
+        try:
+            _, escritor = await asyncio.open_unix_connection(ruta)
+        except OSError:
+            os.unlink(ruta)
+            return
+        escritor.close()
+        raise OSError(f"Ya hay un servidor atendiendo en {ruta}.")
+
+    async def servir(self):
+        """Atiende conexiones hasta que se cancele la tarea."""
+        await asyncio.gather(*(servidor.serve_forever() for servidor in self._servidores))
+
+    async def cerrar(self):
+        """Deja de escuchar, espera a las operaciones en curso y cierra el gestor."""
+        for servidor in self._servidores:
+            servidor.close()
+        # Las conexiones abiertas quedarían esperando el siguiente mensaje.
+        for escritor in list(self._conexiones):
+            escritor.close()
+        for servidor in self._servidores:
+            await servidor.wait_closed()
+        self._servidores = []
+        if self.ruta_socket is not None and os.path.exists(self.ruta_socket):
+            os.unlink(self.ruta_socket)
+        await self.asincrono.cerrar()
+
+    def estadisticas(self):
+        """Estado del servidor: conexiones, peticiones por método, caché del gestor y notas."""
+        metodos = {
+            metodo: {
+                "llamadas": datos["llamadas"],
+                "errores": datos["errores"],
+                "media_ms": round(datos["segundos"] / datos["llamadas"] * 1000, 4),
+            }
+            for metodo, datos in self._metricas.items()
+        }
+        instrumentacion = self.gestor.instrumentacion
+        return {
+            "segundos_activo": round(time.monotonic() - self._inicio, 3),
+            "conexiones_activas": len(self._conexiones),
+            "conexiones_totales": self._conexiones_totales,
+            "peticiones": sum(datos["llamadas"] for datos in metodos.values()),
+            "errores": sum(datos["errores"] for datos in metodos.values()),
+            "metodos": metodos,
+            "notas": len(self.gestor.catalogo.entradas),
+            "cache": self.gestor.cache.estadisticas(),
+            "instrumentacion": instrumentacion.estadisticas() if instrumentacion is not None else None,
+        }
+
+    async def atender(self, carga):
+        """Responde a una petición o lote ya decodificado; `None` si solo había notificaciones."""
+        if isinstance(carga, list):
+            if not carga:
+                return jsonrpc.error(None, jsonrpc.PETICION_INVALIDA, "El lote está vacío.")
+            respuestas = await asyncio.gather(*(self._atender_peticion(peticion) for peticion in carga))
+            return [respuesta for respuesta in respuestas if respuesta is not None] or None
+        return await self._atender_peticion(carga)
+
+    async def _atender_texto(self, datos):
+        try:
+            carga = json.loads(datos)
+        except ValueError:
+            return jsonrpc.error(None, jsonrpc.ERROR_ANALISIS, "El mensaje no es JSON válido.")
+        return await self.atender(carga)
+
+    async def _atender_peticion(self, peticion):
+        if (
+            not isinstance(peticion, dict)
+            or peticion.get("jsonrpc") != "2.0"
+            or not isinstance(peticion.get("method"), str)
+        ):
+            identificador = peticion.get("id") if isinstance(peticion, dict) else None
+            return jsonrpc.error(identificador, jsonrpc.PETICION_INVALIDA, "Petición JSON-RPC no válida.")
+
+        identificador = peticion.get("id")
+        metodo = peticion["method"]
+        inicio = time.perf_counter()
+        try:
+            resultado = jsonrpc.respuesta(identificador, await self._llamar(metodo, peticion.get("params", {})))
+        except jsonrpc.ErrorRemoto as fallo:
+            resultado = jsonrpc.error(identificador, fallo.codigo, fallo.mensaje, fallo.datos)
+        except asyncio.TimeoutError:
+            resultado = jsonrpc.error(identificador, jsonrpc.TIEMPO_AGOTADO, "Se agotó el tiempo límite de la operación.")
+        except Exception:
+            # Un fallo inesperado de una orden no debe tumbar el servidor ni la conexión.
+            resultado = jsonrpc.error(identificador, jsonrpc.ERROR_INTERNO, "Error interno del servidor.")
+        self._medir(metodo, time.perf_counter() - inicio, "error" in resultado)
+        # Las peticiones sin `id` son notificaciones: se ejecutan pero no se responden.
+        return resultado if "id" in peticion else None
+
+    async def _llamar(self, metodo, parametros):
+        if metodo == "stats":
+            return self.estadisticas()
+        if metodo not in ordenes.ORDENES:
+            raise jsonrpc.ErrorRemoto(jsonrpc.METODO_INEXISTENTE, f"Método desconocido: {metodo}.")
+        if isinstance(parametros, list):
+            posicionales, argumentos = tuple(parametros), {}
+        elif isinstance(parametros, dict):
+            posicionales, argumentos = (), parametros
+        else:
+            raise jsonrpc.ErrorRemoto(jsonrpc.PARAMETROS_INVALIDOS, "Los parámetros deben ser un objeto o una lista.")
+
+        nombre = None
+        if metodo in ordenes.ORDENES_DE_ESCRITURA:
+            nombre = posicionales[0] if posicionales else argumentos.get("nombre")
+            nombre = nombre if isinstance(nombre, str) else None
+        try:
+            exito, resultado = await self.asincrono.ejecutar(
+                ordenes.ejecutar_orden, self.gestor, metodo, argumentos, posicionales, nombre=nombre
+            )
+        except ordenes.OrdenInvalida as fallo:
+            raise jsonrpc.ErrorRemoto(jsonrpc.PARAMETROS_INVALIDOS, str(fallo)) from None
+        if not exito:
+            if isinstance(resultado, str):
+                raise jsonrpc.ErrorRemoto(jsonrpc.ERROR_OPERACION, resultado)
+            raise jsonrpc.ErrorRemoto(jsonrpc.ERROR_OPERACION, "La operación no se completó.", resultado)
+        return resultado
+
+    def _medir(self, metodo, segundos, fallida):
+        # Solo se llama desde el bucle de eventos, así que no necesita cerrojo.
+        metricas = self._metricas.get(metodo)
+        if metricas is None:
+            if metodo != "stats" and metodo not in ordenes.ORDENES:
+                metodo = "<desconocido>"
+            metricas = self._metricas.setdefault(metodo, {"llamadas": 0, "errores": 0, "segundos": 0.0})
+        metricas["llamadas"] += 1
+        metricas["errores"] += int(fallida)
+        metricas["segundos"] += segundos
+
+    async def _atender_socket(self, lector, escritor):
+        self._conexiones.add(escritor)
+        self._conexiones_totales += 1
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:
+                    # Línea por encima del límite: el resto del flujo ya no es fiable.
+                    escritor.write(jsonrpc.serializar(
+                        jsonrpc.error(None, jsonrpc.PETICION_INVALIDA, "El mensaje es demasiado grande.")
+                    ) + b"\n")
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                respuesta = await self._atender_texto(linea)
+                if respuesta is not None:
+                    escritor.write(jsonrpc.serializar(respuesta) + b"\n")
+                    await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._conexiones.discard(escritor)
+            escritor.close()
+
+    async def _atender_http(self, lector, escritor):
+        self._conexiones.add(escritor)
+        self._conexiones_totales += 1
+        try:
+            while await self._atender_mensaje_http(lector, escritor):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Conexión cortada a medias o cabeceras por encima del límite del lector.
+            pass
+        finally:
+            self._conexiones.discard(escritor)
+            escritor.close()
+
+    async def _atender_mensaje_http(self, lector, escritor):
+        """Atiende una petición HTTP/1.1; devuelve si la conexión sigue abierta."""
+        linea = await lector.readline()
+        if not linea.strip():
+            return False
+        partes = linea.decode("latin-1").split()
+        if len(partes) != 3:
+            await self._responder_http(escritor, 400, None, False)
+            return False
+        metodo_http, ruta, version = partes
+        cabeceras = {}
+        while True:
+            linea = await lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            clave, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[clave.strip().lower()] = valor.strip()
+
+        conexion = cabeceras.get("connection", "").lower()
+        mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+        # Sin `Host` local una página web podría llegar aquí con un nombre que resuelve a 127.0.0.1.
+        if not _host_local(cabeceras.get("host", "")):
+            await self._responder_http(escritor, 403, None, False)
+            return False
+        if "transfer-encoding" in cabeceras:
+            await self._responder_http(escritor, 411, None, False)
+            return False
+        try:
+            longitud = int(cabeceras.get("content-length", "0"))
+        except ValueError:
+            await self._responder_http(escritor, 400, None, False)
+            return False
+        if longitud > TAMANO_MAXIMO_PETICION:
+            await self._responder_http(escritor, 413, None, False)
+            return False
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+
+        if metodo_http == "GET" and ruta == "/stats":
+            await self._responder_http(escritor, 200, self.estadisticas(), mantener)
+        elif metodo_http != "POST":
+            await self._responder_http(escritor, 405, None, mantener)
+        elif cabeceras.get("content-type", "").split(";")[0].strip() != "application/json":
+            # Un navegador no puede enviar `application/json` a otro origen sin una
+            # consulta previa CORS que este servidor nunca aprueba.
+            await self._responder_http(escritor, 415, None, mantener)
+        else:
+            respuesta = await self._atender_texto(cuerpo)
+            await self._responder_http(escritor, 200 if respuesta is not None else 204, respuesta, mantener)
+        return mantener
+
+    async def _responder_http(self, escritor, estado, contenido, mantener):
+        cuerpo = jsonrpc.serializar(contenido) if contenido is not None else b""
+        cabeceras = [
+            f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}",
+            f"Content-Length: {len(cuerpo)}",
+            f"Connection: {'keep-alive' if mantener else 'close'}",
+        ]
+        if contenido is not None:
+            cabeceras.append("Content-Type: application/json")
+        escritor.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+
+async def servir(ruta_socket=None, puerto_http=None, host="127.0.0.1", vigilar=True, **opciones):
+    """
+    Arranca un `ServidorNotas` (las `opciones` van a su constructor) y lo
+    atiende hasta que se cancele la tarea; al salir lo cierra ordenadamente.
+    Con `vigilar` el gestor detecta los cambios hechos en la carpeta por
+    otras herramientas, para que el estado en memoria no quede atrasado.
+    """
+    servidor = ServidorNotas(**opciones)
+    try:
+        if vigilar:
+            servidor.gestor.vigilar()
+        await servidor.iniciar(ruta_socket, puerto_http, host)
+        await servidor.servir()
+    finally:
+        await servidor.cerrar()
@@ -0,0 +1,266 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+
+EventoCambio = namedtuple("EventoCambio", ["tipo", "nombre"])
+"""Cambio detectado: `tipo` es "creada", "modificada", "eliminada" o "resincronizar"."""
+
+MODOS_VIGILANCIA = ("inotify", "sondeo")
+
+# Constantes de <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+MASCARA_CARPETAS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+CABECERA_INOTIFY = struct.Struct("iIII")
+
+
+def _cargar_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _cargar_libc()
+
+
+def inotify_disponible():
+    """Indica si el sistema ofrece inotify (solo Linux)."""
+    return _libc is not None
+
+
+class Vigilante:
+    """
+    Hilo en segundo plano que detecta cambios en las notas y los entrega en
+    grupos a `al_cambiar(eventos)`, una lista de `EventoCambio` sin nombres
+    repetidos (para cada nota solo cuenta el último cambio del grupo).
+
+    Las subclases implementan `_ejecutar`; una excepción de `al_cambiar` no
+    detiene la vigilancia y queda en `ultimo_error`.
+    """
+
+    modo = None
+
+    def __init__(self, almacenamiento, al_cambiar):
+        self.almacenamiento = almacenamiento
+        self.al_cambiar = al_cambiar
+        self.ultimo_error = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        """Prepara la vigilancia y lanza el hilo; los cambios previos a la llamada no se notifican."""
+        self._preparar()
+        self._hilo = threading.Thread(target=self._ejecutar, name=f"vigilante-{self.modo}", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self, tiempo_limite=5.0):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(tiempo_limite)
+            self._hilo = None
+
+    def _preparar(self):
+        pass
+
+    def _ejecutar(self):
+        raise NotImplementedError
+
+    def _entregar(self, pendientes):
+        if not pendientes:
+            return
+        eventos = [EventoCambio(tipo, nombre) for nombre, tipo in pendientes.items()]
+        pendientes.clear()
+        try:
+            self.al_cambiar(eventos)
+        except Exception as error:
+            self.ultimo_error = error
+
+
+class VigilanteSondeo(Vigilante):
+    """
+    Vigilancia por sondeo: cada `intervalo` segundos recorre las entradas del
+    almacenamiento (con `os.scandir` en los backends de archivos) y compara
+    el mtime y el tamaño de cada nota con la pasada anterior. Funciona con
+    cualquier backend, incluido SQLite.
+    """
+
+    modo = "sondeo"
+
+    def __init__(self, almacenamiento, al_cambiar, intervalo=1.0):
+        super().__init__(almacenamiento, al_cambiar)
+        self.intervalo = intervalo
+        self._estados = {}
+
+    def _preparar(self):
+        self._estados = dict(self.almacenamiento.entradas())
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                estados = dict(self.almacenamiento.entradas())
+            except OSError:
+                continue
+            pendientes = {}
+            for nombre, estado in estados.items():
+                previo = self._estados.get(nombre)
+                if previo is None:
+                    pendientes[nombre] = "creada"
+                elif previo != estado:
+                    pendientes[nombre] = "modificada"
+            for nombre in self._estados.keys() - estados.keys():
+                pendientes[nombre] = "eliminada"
+            self._estados = estados
+            self._entregar(pendientes)
+
+
+class VigilanteInotify(Vigilante):
+    """
+    Vigilancia con inotify mediante `ctypes`, sin dependencias externas.
+
+    Observa las carpetas que devuelve `almacenamiento.carpetas_vigiladas()`
+    y traduce cada ruta a una nota con `almacenamiento.nombre_en_ruta`, así
+    que los temporales, el diario o el historial se ignoran. Las carpetas
+    que aparecen después (subcarpetas de fragmentos) se añaden al vuelo. Los
+    eventos se agrupan durante `espera` segundos; si el núcleo pierde eventos
+    (desbordamiento de la cola) se emite un único "resincronizar".
+    """
+
+    modo = "inotify"
+
+    def __init__(self, almacenamiento, al_cambiar, espera=0.05):
+        if _libc is None:
+            raise OSError("inotify no está disponible en este sistema.")
+        super().__init__(almacenamiento, al_cambiar)
+        self.espera = espera
+        self._descriptor = None
+        self._carpetas = {}
+
+    def _preparar(self):
+        descriptor = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if descriptor < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero))
+        self._descriptor = descriptor
+        try:
+            for carpeta in self.almacenamiento.carpetas_vigiladas():
+                self._observar(carpeta)
+        except OSError:
+            os.close(descriptor)
+            self._descriptor = None
+            raise
+
+    def _observar(self, carpeta):
+        vigilancia = _libc.inotify_add_watch(self._descriptor, os.fsencode(carpeta), MASCARA_CARPETAS)
+        if vigilancia < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero), carpeta)
+        self._carpetas[vigilancia] = carpeta
+
+    def _observar_nueva(self, carpeta, pendientes):
+        # Lo creado antes de añadir la vigilancia no genera eventos: se recorre a mano.
+        for nueva in self.almacenamiento.carpetas_vigiladas(carpeta):
+            try:
+                self._observar(nueva)
+                with os.scandir(nueva) as entradas:
+                    for entrada in entradas:
+                        nombre = self.almacenamiento.nombre_en_ruta(entrada.path)
+                        if nombre is not None:
+                            pendientes[nombre] = "creada"
+            except OSError:
+                continue
+
+    def _ejecutar(self):
+        pendientes = {}
+        primer_evento = 0.0
+        try:
+            while not self._detener.is_set():
+                listos, _, _ = select.select([self._descriptor], [], [], self.espera if pendientes else 0.2)
+                # Una ráfaga continua de eventos no debe retrasar la entrega indefinidamente.
+                if not listos or (pendientes and time.monotonic() - primer_evento > 10 * self.espera):
+                    self._entregar(pendientes)
+                if not listos:
+                    continue
+                try:
+                    datos = os.read(self._descriptor, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if not pendientes:
+                    primer_evento = time.monotonic()
+                self._procesar(datos, pendientes)
+        finally:
+            os.close(self._descriptor)
+            self._descriptor = None
+
+    def _procesar(self, datos, pendientes):
+        posicion = 0
+        while posicion + CABECERA_INOTIFY.size <= len(datos):
+            vigilancia, mascara, _, longitud = CABECERA_INOTIFY.unpack_from(datos, posicion)
+            inicio = posicion + CABECERA_INOTIFY.size
+            nombre_archivo = os.fsdecode(datos[inicio:inicio + longitud].rstrip(b"\0"))
+            posicion = inicio + longitud
+
+            if mascara & IN_Q_OVERFLOW:
+                pendientes.clear()
+                pendientes[None] = "resincronizar"
+                continue
+            if mascara & IN_IGNORED:
+                self._carpetas.pop(vigilancia, None)
+                continue
+            carpeta = self._carpetas.get(vigilancia)
+            if carpeta is None or not nombre_archivo:
+                continue
+            ruta = os.path.join(carpeta, nombre_archivo)
+            if mascara & IN_ISDIR:
+                if mascara & (IN_CREATE | IN_MOVED_TO):
+                    self._observar_nueva(ruta, pendientes)
+                continue
+            nombre = self.almacenamiento.nombre_en_ruta(ruta)
+            if nombre is None or pendientes.get(None) == "resincronizar":
+                continue
+            if mascara & (IN_DELETE | IN_MOVED_FROM):
+                pendientes[nombre] = "eliminada"
+            elif mascara & IN_CREATE:
+                pendientes[nombre] = "creada"
+            else:
+                pendientes[nombre] = "modificada"
+
+
+def crear_vigilante(almacenamiento, al_cambiar, modo=None, intervalo=1.0):
+    """
+    Construye el vigilante adecuado sin iniciarlo. Sin `modo` se usa inotify
+    cuando el sistema lo ofrece y el backend guarda las notas en carpetas, y
+    el sondeo en cualquier otro caso.
+    """
+    if modo not in (None, *MODOS_VIGILANCIA):
+        raise ValueError(f"Modo de vigilancia desconocido: {modo}")
+    if modo is None:
+        modo = "inotify" if inotify_disponible() and almacenamiento.carpetas_vigiladas() else "sondeo"
+    if modo == "inotify":
+        return VigilanteInotify(almacenamiento, al_cambiar)
+    return VigilanteSondeo(almacenamiento, al_cambiar, intervalo)
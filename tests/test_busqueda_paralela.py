@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.busqueda_paralela import BuscadorParalelo, Comparador
+from services.gestor_notas import GestorNotas
+
+
+class ComparadorTestCase(unittest.TestCase):
+    """Pruebas de la búsqueda por bloques sin distinguir mayúsculas."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.temp_dir.name, "nota.txt")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _escribir(self, texto):
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+
+    def test_encuentra_coincidencias_que_cruzan_bloques(self):
+        self._escribir("x" * 14 + "PaLaBrA" + "y" * 20)
+
+        self.assertTrue(Comparador("palabra", tamano_bloque=16).contiene(self.ruta))
+        self.assertFalse(Comparador("palabras", tamano_bloque=16).contiene(self.ruta))
+
+    def test_palabras_no_ascii(self):
+        self._escribir("á" * 10 + "CANCIÓN" + "é" * 10)
+
+        self.assertTrue(Comparador("canción", tamano_bloque=8).contiene(self.ruta))
+        self.assertFalse(Comparador("cancion", tamano_bloque=8).contiene(self.ruta))
+
+
+class BusquedaParalelaTestCase(unittest.TestCase):
+    """Pruebas del recorrido con varios procesos desde `GestorNotas`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, procesos_busqueda=2)
+        self.gestor.buscador.tamano_particion = 4
+        self.gestor.guardar_lote(
+            Nota(f"nota{numero:02d}", "Objetivo encontrado" if numero % 3 == 0 else "sin nada")
+            for numero in range(30)
+        )
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_recorrido_coincide_con_el_indice(self):
+        esperado = [f"nota{numero:02d}" for numero in range(0, 30, 3)]
+
+        self.assertEqual(self.gestor.buscar("objetivo", recorrer=True), esperado)
+        self.assertEqual(self.gestor.buscar("objetivo"), esperado)
+        self.assertIsNotNone(self.gestor.buscador._pool)
+
+    def test_limite_detiene_el_recorrido(self):
+        encontrados = list(self.gestor.buscar_recorriendo("objetivo", limite=3))
+
+        self.assertEqual(len(encontrados), 3)
+        self.assertTrue(all(int(nombre[4:]) % 3 == 0 for nombre in encontrados))
+
+    def test_un_proceso_no_arranca_pool(self):
+        buscador = BuscadorParalelo(procesos=1)
+        rutas = [(nombre, self.gestor.almacenamiento.ruta_archivo(nombre)) for nombre in ("nota00", "nota01")]
+
+        self.assertEqual(list(buscador.buscar(rutas, "OBJETIVO")), ["nota00"])
+        self.assertIsNone(buscador._pool)
+
+    def test_sqlite_recorre_en_el_proceso(self):
+        gestor = GestorNotas(carpeta=os.path.join(self.temp_dir.name, "bd"), almacenamiento="sqlite")
+        try:
+            gestor.guardar(Nota("guardada", "Objetivo en la base"))
+            gestor.guardar(Nota("otra", "sin nada"))
+
+            self.assertIsNone(gestor.almacenamiento.ruta_archivo("guardada"))
+            self.assertEqual(gestor.buscar("objetivo", recorrer=True), ["guardada"])
+            self.assertIsNone(gestor._buscador)
+        finally:
+            gestor.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models.nota import Nota
+from services.almacenamiento import EstadoNota
+from services.cache_lectura import CacheLectura
+from services.gestor_notas import GestorNotas
+
+
+class CacheLecturaTestCase(unittest.TestCase):
+    """Pruebas de la caché LRU acotada por bytes."""
+
+    def test_expulsa_las_menos_usadas_al_superar_la_capacidad(self):
+        cache = CacheLectura(capacidad_bytes=10)
+        estado = EstadoNota(1, 4)
+        cache.guardar("a", estado, "aaaa", 4)
+        cache.guardar("b", estado, "bbbb", 4)
+        self.assertEqual(cache.obtener("a", estado), "aaaa")
+
+        cache.guardar("c", estado, "cccc", 4)
+
+        self.assertIsNone(cache.obtener("b", estado))
+        self.assertEqual(cache.obtener("a", estado), "aaaa")
+        self.assertEqual(cache.expulsiones, 1)
+        self.assertEqual(cache.bytes_ocupados, 8)
+
+    def test_descarta_entradas_con_estado_distinto(self):
+        cache = CacheLectura()
+        cache.guardar("a", EstadoNota(1, 4), "aaaa", 4)
+
+        self.assertIsNone(cache.obtener("a", EstadoNota(2, 4)))
+        self.assertEqual(cache.estadisticas()["entradas"], 0)
+        self.assertEqual(cache.invalidaciones, 1)
+
+
+class GestorNotasCacheTestCase(unittest.TestCase):
+    """Pruebas de la caché de lectura integrada en `GestorNotas`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        self.gestor.guardar(Nota("caliente", "contenido original"))
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_lecturas_repetidas_no_abren_el_archivo(self):
+        primera = self.gestor.leer("caliente")
+        with patch.object(self.gestor.almacenamiento, "leer", side_effect=AssertionError("lectura inesperada")):
+            segunda = self.gestor.leer("caliente")
+
+        self.assertEqual(primera, segunda)
+        self.assertEqual(self.gestor.cache.aciertos, 1)
+
+    def test_editar_y_eliminar_invalidan_la_cache(self):
+        self.gestor.leer("caliente")
+        self.gestor.editar("caliente", "contenido nuevo")
+        self.assertIn("contenido nuevo", self.gestor.leer("caliente"))
+
+        self.gestor.eliminar("caliente")
+        self.assertEqual(self.gestor.leer("caliente"), "Nota no encontrada.")
+
+    def test_detecta_modificaciones_externas(self):
+        self.gestor.leer("caliente")
+        ruta = os.path.join(self.temp_dir.name, "caliente.txt")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("Fecha: 2024-01-01 00:00:00\n\ncambio externo")
+        os.utime(ruta, ns=(1, 1))
+
+        self.assertIn("cambio externo", self.gestor.leer("caliente"))
+
+    def test_cuenta_bytes_y_no_caracteres(self):
+        self.gestor.guardar(Nota("acentos", "ñandú " * 100))
+        texto = self.gestor.leer("acentos")
+
+        self.assertEqual(self.gestor.cache.bytes_ocupados, len(texto.encode("utf-8")))
+        self.assertGreater(self.gestor.cache.bytes_ocupados, len(texto))
+
+
+if __name__ == "__main__":
+    unittest.main()
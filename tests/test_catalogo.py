@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+
+
+class CatalogoNotasTestCase(unittest.TestCase):
+    """Pruebas del catálogo en memoria que respalda `listar` y `contar`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_listar_y_contar_sin_recorrer_la_carpeta(self):
+        self.gestor.guardar(Nota("uno", "contenido"))
+        self.gestor.guardar(Nota("dos", "contenido"))
+
+        with patch("os.scandir", side_effect=AssertionError("recorrido inesperado")), \
+                patch("os.listdir", side_effect=AssertionError("recorrido inesperado")):
+            self.assertEqual(self.gestor.contar(), 2)
+            exito, listado = self.gestor.listar()
+
+        self.assertTrue(exito)
+        self.assertCountEqual(listado, ["uno", "dos"])
+
+    def test_catalogo_guarda_metadatos(self):
+        nota = Nota("metadatos", "contenido")
+        self.gestor.guardar(nota)
+
+        entrada = self.gestor.catalogo.entradas["metadatos"]
+        self.assertEqual(entrada["fecha"], nota.fecha)
+        ruta = os.path.join(self.temp_dir.name, "metadatos.txt")
+        self.assertEqual(entrada["tamano"], os.path.getsize(ruta))
+
+        self.gestor.eliminar("metadatos")
+        self.assertNotIn("metadatos", self.gestor.catalogo.entradas)
+
+    def test_detecta_notas_creadas_externamente(self):
+        self.gestor.catalogo.intervalo_verificacion = 0
+        ruta = os.path.join(self.temp_dir.name, "externa.txt")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("Fecha: 2024-01-01 10:00:00\n\ncontenido externo")
+
+        self.assertEqual(self.gestor.contar(), 1)
+        self.assertEqual(self.gestor.catalogo.entradas["externa"]["fecha"], "2024-01-01 10:00:00")
+        self.assertEqual(self.gestor.buscar("externo"), ["externa"])
+
+    def test_instantanea_reutilizada_al_reiniciar(self):
+        self.gestor.guardar(Nota("persistente", "contenido"))
+        self.gestor.cerrar()
+
+        with patch.object(GestorNotas, "_leer_fecha", side_effect=AssertionError("lectura inesperada")):
+            nuevo = GestorNotas(carpeta=self.temp_dir.name)
+
+        self.assertEqual(nuevo.contar(), 1)
+        nuevo.cerrar()
+
+    def test_detecta_ediciones_externas_en_su_sitio(self):
+        self.gestor.guardar(Nota("a", "contenido de la nota a"))
+        self.gestor.guardar(Nota("b", "contenido de la nota b"))
+        self.assertEqual(self.gestor.buscar("contenido"), ["a", "b"])
+        # Una carpeta sin cambios recientes tiene una firma fiable, que se guarda al cerrar.
+        antes = time.time() - 60
+        os.utime(self.temp_dir.name, (antes, antes))
+        self.gestor.catalogo.sincronizar(forzar=True)
+        self.gestor.cerrar()
+
+        # Reescribir un archivo existente no cambia el mtime de la carpeta.
+        ruta = os.path.join(self.temp_dir.name, "b.txt")
+        firma = os.stat(self.temp_dir.name).st_mtime_ns
+        with open(ruta, "a", encoding="utf-8") as archivo:
+            archivo.write(" zanahoria")
+        self.assertEqual(os.stat(self.temp_dir.name).st_mtime_ns, firma)
+
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        self.assertEqual(self.gestor.buscar("zanahoria"), ["b"])
+        self.assertEqual(self.gestor.consultar("zanahoria")[1]["total"], 1)
+        self.assertEqual(self.gestor.catalogo.entradas["b"]["tamano"], os.path.getsize(ruta))
+
+        # Con el servicio abierto la verificación periódica no recorre las
+        # notas mientras la carpeta no cambie; hace falta resincronizar.
+        self.gestor.catalogo.intervalo_verificacion = 0
+        with open(os.path.join(self.temp_dir.name, "a.txt"), "a", encoding="utf-8") as archivo:
+            archivo.write(" pepino")
+        os.utime(self.temp_dir.name, (antes, antes))
+        with patch.object(self.gestor.almacenamiento, "entradas", side_effect=AssertionError("recorrido inesperado")):
+            self.assertEqual(self.gestor.contar(), 2)
+        self.assertTrue(self.gestor.resincronizar())
+        self.assertEqual(self.gestor.buscar("pepino"), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import main
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LineaOrdenesTestCase(unittest.TestCase):
+    """Pruebas de las subórdenes y los lotes de `main.py`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _ejecutar(self, *argumentos):
+        salida = io.StringIO()
+        with redirect_stdout(salida):
+            codigo = main.main(["--carpeta", self.temp_dir.name, *argumentos])
+        return codigo, salida.getvalue()
+
+    def test_ordenes_sueltas_con_salida_json(self):
+        self.assertEqual(self._ejecutar("crear", "receta", "harina, huevos y leche")[0], 0)
+
+        codigo, salida = self._ejecutar("buscar", "HUEVOS", "--json")
+        self.assertEqual(codigo, 0)
+        self.assertEqual(json.loads(salida), {"exito": True, "resultado": ["receta"]})
+
+        codigo, salida = self._ejecutar("--json", "leer", "inexistente")
+        self.assertEqual(codigo, 1)
+        self.assertFalse(json.loads(salida)["exito"])
+
+    def test_lote_ejecuta_todas_las_operaciones_en_un_proceso(self):
+        ruta = os.path.join(self.temp_dir.name, "lote.jsonl")
+        operaciones = [
+            {"orden": "crear", "nombre": "a", "contenido": "primera nota del lote"},
+            {"orden": "crear", "nombre": "b", "contenido": "segunda nota del lote"},
+            {"orden": "editar", "nombre": "a", "contenido": "primera nota cambiada", "id": "x1"},
+            {"orden": "contar"},
+            {"orden": "versiones", "nombre": "a"},
+            {"orden": "leer"},
+            {"orden": "volar"},
+        ]
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.writelines(json.dumps(operacion) + "\n" for operacion in operaciones)
+            archivo.write("no es json\n")
+
+        codigo, salida = self._ejecutar("lote", ruta, "--json")
+        respuestas = [json.loads(linea) for linea in salida.splitlines()]
+
+        self.assertEqual(codigo, 1)
+        self.assertEqual([respuesta["exito"] for respuesta in respuestas], [True] * 5 + [False] * 3)
+        self.assertEqual(respuestas[2]["id"], "x1")
+        self.assertEqual(respuestas[3]["resultado"], 2)
+        self.assertEqual(respuestas[4]["resultado"][0]["version"], 1)
+
+    def test_lote_sigue_tras_argumentos_de_tipo_incorrecto(self):
+        ruta = os.path.join(self.temp_dir.name, "tipos.jsonl")
+        operaciones = [
+            {"orden": "listar", "limite": "5"},
+            {"orden": "crear", "nombre": 5, "contenido": "x"},
+            {"orden": "crear", "nombre": "valida", "contenido": "nota tras los errores"},
+            {"orden": "contar"},
+        ]
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.writelines(json.dumps(operacion) + "\n" for operacion in operaciones)
+
+        codigo, salida = self._ejecutar("lote", ruta, "--json")
+        respuestas = [json.loads(linea) for linea in salida.splitlines()]
+
+        self.assertEqual(codigo, 1)
+        self.assertEqual([respuesta["exito"] for respuesta in respuestas], [False, False, True, True])
+        self.assertIn("limite", respuestas[0]["resultado"])
+        self.assertIn("nombre", respuestas[1]["resultado"])
+        self.assertEqual(respuestas[3]["resultado"], 1)
+
+        codigo, salida = self._ejecutar("lote", ruta, "--json", "--parar-en-error")
+        self.assertEqual(len(salida.splitlines()), 1)
+
+    def test_importar_main_no_carga_el_servicio(self):
+        codigo = "import sys, main; print('services.gestor_notas' in sys.modules)"
+        resultado = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(resultado.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.compresion import MAGIA, CompresionNotas
+from services.gestor_notas import GestorNotas
+from services.migracion import comprimir
+
+CUERPOS = [
+    f"Reunión del equipo de producto número {numero}. Pendientes: revisar el presupuesto, "
+    f"actualizar la planificación trimestral y enviar el resumen a dirección."
+    for numero in range(40)
+]
+
+
+class CompresionNotasTestCase(unittest.TestCase):
+    """Pruebas del formato comprimido autodescrito de las notas."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cada_metodo_se_lee_con_cualquier_configuracion(self):
+        texto = "Fecha: 2024-01-01 00:00:00\n\n" + "texto repetido " * 50
+        lector = CompresionNotas(self.temp_dir.name)
+        for metodo in ("zlib", "lzma"):
+            datos = CompresionNotas(self.temp_dir.name, metodo).comprimir(texto)
+            self.assertTrue(datos.startswith(MAGIA))
+            self.assertLess(len(datos), len(texto))
+            self.assertEqual(lector.descomprimir(datos), texto)
+        self.assertEqual(lector.descomprimir(b"Fecha: x\r\n\r\nplano"), "Fecha: x\n\nplano")
+
+    def test_diccionario_compartido_reduce_las_notas_pequenas(self):
+        sin_diccionario = CompresionNotas(self.temp_dir.name, "zlib")
+        con_diccionario = CompresionNotas(self.temp_dir.name, "zlib")
+        con_diccionario.entrenar(CUERPOS[:30])
+
+        nota = CUERPOS[35]
+        comprimida = con_diccionario.comprimir(nota)
+
+        self.assertLess(len(comprimida), len(sin_diccionario.comprimir(nota)))
+        self.assertEqual(CompresionNotas(self.temp_dir.name).descomprimir(comprimida), nota)
+
+
+class GestorComprimidoTestCase(unittest.TestCase):
+    """Pruebas de `GestorNotas` con notas comprimidas y exportaciones comprimidas."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        plano = GestorNotas(carpeta=self.temp_dir.name)
+        plano.guardar(Nota("plana", "nota guardada sin comprimir " * 5))
+        plano.cerrar()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, compresion="zlib", procesos_busqueda=2)
+        self.gestor.buscador.tamano_particion = 4
+        self.gestor.guardar_lote(Nota(f"reunion{numero:02d}", cuerpo) for numero, cuerpo in enumerate(CUERPOS))
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_carpeta_mezclada_se_lee_y_busca(self):
+        with open(self.gestor.almacenamiento.ruta("reunion00"), "rb") as archivo:
+            self.assertTrue(archivo.read().startswith(MAGIA))
+        self.assertIn("sin comprimir", self.gestor.leer("plana"))
+        self.assertIn("presupuesto", self.gestor.leer("reunion07"))
+        encabezado = self.gestor.almacenamiento.leer_encabezado("reunion07")
+        self.assertEqual(encabezado, f"Fecha: {self.gestor.catalogo.entradas['reunion07']['fecha']}")
+
+        self.assertEqual(len(self.gestor.buscar("PRESUPUESTO", recorrer=True)), 40)
+        self.assertEqual(self.gestor.buscar("planificación", recorrer=True)[:1], ["reunion00"])
+        self.assertEqual(self.gestor.buscar("COMPRIMIR", recorrer=True), ["plana"])
+
+    def test_migracion_comprime_y_descomprime_la_carpeta(self):
+        self.gestor.cerrar()
+
+        self.assertEqual(comprimir(self.temp_dir.name, "lzma"), 41)
+        with open(os.path.join(self.temp_dir.name, "plana.txt"), "rb") as archivo:
+            self.assertTrue(archivo.read().startswith(MAGIA))
+        self.assertEqual(comprimir(self.temp_dir.name, None), 41)
+
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        with open(os.path.join(self.temp_dir.name, "reunion03.txt"), "r", encoding="utf-8") as archivo:
+            self.assertIn("número 3", archivo.read())
+
+    def test_exportaciones_comprimidas(self):
+        self.assertTrue(self.gestor.exportar_json(comprimir="gz"))
+        with gzip.open(os.path.join(self.temp_dir.name, "exports", "notas.json.gz"), "rt", encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        self.assertEqual(len(datos), 41)
+
+        self.assertTrue(self.gestor.exportar_pickle(archivo_salida="notas.pkl.xz"))
+        nota = self.gestor.obtener_desde_pickle("reunion05", archivo_salida="notas.pkl.xz")
+        self.assertIn("número 5", nota["contenido"])
+        self.gestor.editar("reunion05", "cambiada")
+        self.assertTrue(self.gestor.exportar_pickle(archivo_salida="notas.pkl.xz"))
+        self.assertEqual(
+            self.gestor.obtener_desde_pickle("reunion05", archivo_salida="notas.pkl.xz")["contenido"], "cambiada"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
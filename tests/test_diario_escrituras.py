@@ -0,0 +1,156 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from models.nota import Nota
+from services.almacenamiento_texto import AlmacenamientoTexto
+from services.diario_escrituras import DiarioEscrituras
+from services.gestor_notas import GestorNotas
+
+
+def _simular_fin_de_proceso(diario):
+    """Suelta el cerrojo de vida del diario como si su proceso hubiera muerto sin cerrarlo."""
+    if diario._vivo is not None:
+        os.close(diario._vivo)
+        diario._vivo = None
+
+
+class DiarioEscriturasTestCase(unittest.TestCase):
+    """Pruebas del diario de escritura anticipada del backend de texto."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.temp_dir.name, "escrituras.wal")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ignora_cola_truncada_y_registros_cerrados(self):
+        diario = DiarioEscrituras(self.ruta)
+        publicada, pendiente, fallida = diario.registrar([
+            {"op": "escribir", "nombre": "a", "texto": "uno"},
+            {"op": "escribir", "nombre": "b", "texto": "dos"},
+            {"op": "escribir", "nombre": "c", "texto": "tres"},
+        ])
+        diario.confirmar([publicada], [])
+        diario.descartar([fallida])
+        diario._archivo.close()
+        with open(self.ruta, "ab") as archivo:
+            archivo.write(b"\x10\x00\x00\x00corte")
+
+        reabierto = DiarioEscrituras(self.ruta)
+        registros = reabierto.leer()
+        reabierto.cerrar()
+
+        self.assertEqual([registro["nombre"] for registro in registros], ["b"])
+        self.assertEqual(registros[0]["secuencia"], pendiente)
+
+    def test_procesos_que_comparten_el_diario_no_se_pisan(self):
+        primero = DiarioEscrituras(self.ruta)
+        segundo = DiarioEscrituras(self.ruta)
+        (en_vuelo,) = primero.registrar([{"op": "escribir", "nombre": "a", "texto": "uno"}])
+        (publicada,) = segundo.registrar([{"op": "escribir", "nombre": "b", "texto": "dos"}])
+        # Cada uno numera por su cuenta: la marca del segundo no cierra el registro del primero.
+        self.assertEqual(en_vuelo, publicada)
+        segundo.confirmar([publicada], [])
+
+        self.assertFalse(segundo.vaciar())
+        self.assertEqual([registro["nombre"] for registro in segundo.leer()], ["a"])
+
+        primero.confirmar([en_vuelo], [])
+        self.assertTrue(segundo.vaciar())
+        self.assertEqual(os.path.getsize(self.ruta), 0)
+        primero.cerrar()
+        segundo.cerrar()
+
+    def test_recuperar_no_toca_las_escrituras_de_un_proceso_vivo(self):
+        primero = DiarioEscrituras(self.ruta)
+        primero.registrar([{"op": "escribir", "nombre": "a", "texto": "uno"}])
+        recibidos = []
+
+        def reaplicar(registros):
+            recibidos.extend(registros)
+            return []
+
+        segundo = DiarioEscrituras(self.ruta)
+        segundo.recuperar(reaplicar)
+        self.assertEqual(recibidos, [])
+        self.assertEqual([registro["nombre"] for registro in segundo.leer()], ["a"])
+
+        # Cuando su proceso muere sin cerrar el diario, sus registros quedan abandonados.
+        _simular_fin_de_proceso(primero)
+        tercero = DiarioEscrituras(self.ruta)
+        tercero.recuperar(reaplicar)
+        self.assertEqual([registro["nombre"] for registro in recibidos], ["a"])
+        self.assertEqual(tercero.leer(), [])
+        for diario in (primero, segundo, tercero):
+            diario.cerrar()
+
+    def test_agrupa_sincronizaciones_de_escrituras_simultaneas(self):
+        diario = DiarioEscrituras(self.ruta, espera_grupo=0.05)
+        hilos = [
+            threading.Thread(target=diario.registrar, args=([{"op": "eliminar", "nombre": str(numero)}],))
+            for numero in range(8)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertLess(diario.sincronizaciones, 8)
+        self.assertEqual(len(diario.leer()), 8)
+        diario.cerrar()
+
+
+class RecuperacionTestCase(unittest.TestCase):
+    """Pruebas de la recuperación tras un corte."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_reaplica_escrituras_no_publicadas_al_iniciar(self):
+        gestor = self.gestor
+        gestor.guardar(Nota("previa", "contenido previo"))
+
+        # Corte simulado: el registro llegó al diario pero la nota no se publicó.
+        with patch.object(AlmacenamientoTexto, "_escribir_atomico", side_effect=KeyboardInterrupt), \
+                patch.object(DiarioEscrituras, "descartar"):
+            with self.assertRaises(KeyboardInterrupt):
+                gestor.almacenamiento.escribir("cortada", "Fecha: 2024-01-01 00:00:00\n\nsin publicar")
+        _simular_fin_de_proceso(gestor.almacenamiento.diario)
+
+        recuperado = GestorNotas(carpeta=self.temp_dir.name)
+
+        self.assertIn("sin publicar", recuperado.leer("cortada"))
+        self.assertIn("contenido previo", recuperado.leer("previa"))
+        self.assertEqual(recuperado.almacenamiento.diario.leer(), [])
+        recuperado.cerrar()
+
+    def test_no_resucita_notas_borradas_fuera_tras_publicarse(self):
+        self.gestor.guardar(Nota("a", "contenido de a"))
+        self.gestor.guardar(Nota("b", "contenido de b"))
+        # Sin `cerrar()` el diario conserva los registros publicados.
+        os.remove(self.gestor.almacenamiento.ruta("a"))
+        ruta_b = self.gestor.almacenamiento.ruta("b")
+        with open(ruta_b, "w", encoding="utf-8") as archivo:
+            archivo.write("Fecha: 2024-01-01 00:00:00\n\nversión sincronizada")
+        # Una herramienta de sincronización puede conservar un mtime anterior.
+        os.utime(ruta_b, ns=(1, 1))
+
+        recuperado = GestorNotas(carpeta=self.temp_dir.name)
+
+        self.assertEqual(recuperado.listar(), (True, ["b"]))
+        self.assertFalse(os.path.exists(self.gestor.almacenamiento.ruta("a")))
+        self.assertIn("versión sincronizada", recuperado.leer("b"))
+        recuperado.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
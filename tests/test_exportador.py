@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.exportador import ExportadorStreaming, procesar_en_paralelo
+from services.gestor_notas import GestorNotas
+
+
+class ExportadorStreamingTestCase(unittest.TestCase):
+    """Pruebas de la exportación en streaming con lecturas en paralelo."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        for indice in range(25):
+            self.gestor.guardar(Nota(f"nota{indice:02d}", f"contenido número {indice}"))
+        self.ruta_exports = os.path.join(self.temp_dir.name, "exports")
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_json_equivale_a_json_dump(self):
+        self.assertTrue(self.gestor.exportar_json(hilos=3))
+
+        with open(os.path.join(self.ruta_exports, "notas.json"), "r", encoding="utf-8") as archivo:
+            texto = archivo.read()
+        datos = json.loads(texto)
+
+        self.assertEqual(texto, json.dumps(datos, indent=4, ensure_ascii=False))
+        self.assertEqual([nota["nombre"] for nota in datos], list(self.gestor.catalogo.entradas))
+        self.assertEqual(datos[3]["contenido"], "contenido número 3")
+
+    def test_json_lines_y_progreso(self):
+        avances = []
+        exito = self.gestor.exportar_json(formato="jsonl", progreso=avances.append)
+
+        self.assertTrue(exito)
+        with open(os.path.join(self.ruta_exports, "notas.jsonl"), "r", encoding="utf-8") as archivo:
+            lineas = [json.loads(linea) for linea in archivo]
+        self.assertEqual(len(lineas), 25)
+        self.assertEqual(avances[-1]["procesadas"], 25)
+        self.assertEqual(avances[-1]["total"], 25)
+        self.assertIn("notas_por_segundo", self.gestor.ultima_exportacion)
+
+    def test_formato_o_compresion_desconocidos_devuelven_false(self):
+        self.assertFalse(self.gestor.exportar_json(formato="csv"))
+        self.assertFalse(self.gestor.exportar_json(comprimir="zip"))
+        self.assertFalse(os.path.exists(self.ruta_exports))
+
+    def test_exportar_sin_notas_genera_arreglo_vacio(self):
+        ruta = os.path.join(self.temp_dir.name, "vacio.json")
+        exportador = ExportadorStreaming(lambda nombre: "", lambda n, t: {})
+
+        estadisticas = exportador.exportar([], ruta)
+
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            self.assertEqual(json.load(archivo), [])
+        self.assertEqual(estadisticas["procesadas"], 0)
+
+    def test_procesar_en_paralelo_conserva_orden_y_omite_errores(self):
+        def leer(nombre):
+            if nombre == 3:
+                raise OSError("ilegible")
+            return nombre * 2
+
+        resultado = list(procesar_en_paralelo(range(10), leer, hilos=4, ventana=2))
+
+        self.assertEqual([nombre for nombre, _ in resultado], [0, 1, 2, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(resultado[-1], (9, 18))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+
+from models.nota import Nota
+from services.gestor_async import AsyncGestorNotas
+from services.gestor_notas import GestorNotas
+
+
+class AsyncGestorNotasTestCase(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la fachada asíncrona sobre `GestorNotas`."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = AsyncGestorNotas(GestorNotas(carpeta=self.temp_dir.name), max_hilos=4)
+
+    async def asyncTearDown(self):
+        await self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def instrumentar_editar(self, demora):
+        """Sustituye `editar` por una versión lenta que mide la concurrencia por nota."""
+        original = self.gestor.gestor.editar
+        activas = {}
+        maximas = {}
+        cerrojo = threading.Lock()
+
+        def editar(nombre, contenido):
+            with cerrojo:
+                activas[nombre] = activas.get(nombre, 0) + 1
+                maximas[nombre] = max(maximas.get(nombre, 0), activas[nombre])
+            time.sleep(demora)
+            try:
+                return original(nombre, contenido)
+            finally:
+                with cerrojo:
+                    activas[nombre] -= 1
+
+        self.gestor.gestor.editar = editar
+        return maximas
+
+    async def test_operaciones_basicas(self):
+        exito, _ = await self.gestor.guardar(Nota("async", "contenido asíncrono"))
+
+        self.assertTrue(exito)
+        self.assertIn("asíncrono", await self.gestor.leer("async"))
+        self.assertEqual(await self.gestor.contar(), 1)
+        self.assertEqual(await self.gestor.buscar("asíncrono"), ["async"])
+        self.assertEqual(await self.gestor.listar(), (True, ["async"]))
+        self.assertTrue(await self.gestor.exportar_json())
+        self.assertEqual(await self.gestor.eliminar("async"), (True, "Nota eliminada correctamente."))
+
+    async def test_ediciones_de_la_misma_nota_se_serializan(self):
+        await self.gestor.guardar(Nota("a", "inicial"))
+        await self.gestor.guardar(Nota("b", "inicial"))
+        maximas = self.instrumentar_editar(0.02)
+
+        await asyncio.gather(
+            *(self.gestor.editar("a", f"version {i}") for i in range(4)),
+            *(self.gestor.editar("b", f"version {i}") for i in range(4)),
+        )
+
+        self.assertEqual(maximas, {"a": 1, "b": 1})
+
+    async def test_tiempo_limite_libera_el_cerrojo_al_terminar(self):
+        await self.gestor.guardar(Nota("lenta", "inicial"))
+        self.instrumentar_editar(0.2)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.gestor.editar("lenta", "nuevo", tiempo_limite=0.01)
+
+        exito, _ = await self.gestor.editar("lenta", "definitivo", tiempo_limite=2)
+        self.assertTrue(exito)
+        self.assertIn("definitivo", await self.gestor.leer("lenta"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,8 @@ import unittest
 from unittest.mock import patch
 
 from models.nota import Nota
+from services.almacenamiento_fragmentado import AlmacenamientoFragmentado
+from services.almacenamiento_sqlite import AlmacenamientoSQLite
 from services.gestor_notas import GestorNotas
 from services.pickle_repository import PickleRepository
 
@@ -17,6 +19,7 @@ class GestorNotasTestCase(unittest.TestCase):
         self.gestor = GestorNotas(carpeta=self.temp_dir.name)
 
     def tearDown(self):
+        self.gestor.cerrar()
         self.temp_dir.cleanup()
 
     def test_guardar_y_leer_nota(self):
@@ -48,7 +51,7 @@ class GestorNotasTestCase(unittest.TestCase):
         coincidencias = self.gestor.buscar("especial")
         self.assertEqual(coincidencias, ["primera"])
 
-    def test_editar_actualiza_contenido_y_crea_respaldo(self):
+    def test_editar_actualiza_contenido_y_guarda_version(self):
         self.gestor.guardar(Nota("editable", "texto original"))
 
         exito, mensaje = self.gestor.editar("editable", "nuevo texto")
@@ -58,8 +61,23 @@ class GestorNotasTestCase(unittest.TestCase):
         contenido = self.gestor.leer("editable")
         self.assertIn("nuevo texto", contenido)
 
-        respaldo = os.path.join(self.temp_dir.name, "editable_bak.txt")
-        self.assertTrue(os.path.exists(respaldo))
+        exito, versiones = self.gestor.versiones("editable")
+        self.assertTrue(exito)
+        self.assertEqual([version["version"] for version in versiones], [1])
+        self.assertIn("texto original", self.gestor.leer_version("editable", 1)[1])
+
+    def test_revertir_recupera_version_y_conserva_la_actual(self):
+        self.gestor.guardar(Nota("reversible", "primera"))
+        self.gestor.editar("reversible", "segunda")
+        self.gestor.editar("reversible", "tercera")
+
+        exito, _ = self.gestor.revertir("reversible", 1)
+
+        self.assertTrue(exito)
+        self.assertIn("primera", self.gestor.leer("reversible"))
+        self.assertEqual(self.gestor.buscar("primera"), ["reversible"])
+        self.assertIn("tercera", self.gestor.leer_version("reversible", 3)[1])
+        self.assertFalse(self.gestor.revertir("reversible", 9)[0])
 
     def test_editar_nota_inexistente(self):
         exito, mensaje = self.gestor.editar("falta", "contenido")
@@ -82,7 +100,7 @@ class GestorNotasTestCase(unittest.TestCase):
         self.assertFalse(exito)
         self.assertIn("No se encontró la nota.", mensaje)
 
-    def test_contar_excluye_respaldo(self):
+    def test_contar_excluye_historial(self):
         self.gestor.guardar(Nota("contable", "contenido"))
         self.gestor.editar("contable", "contenido actualizado")
 
@@ -145,28 +163,68 @@ class GestorNotasTestCase(unittest.TestCase):
         self.assertIn("persistente", datos)
         self.assertEqual(datos["persistente"]["contenido"], "contenido estable")
 
-    def test_editar_restaura_contenido_si_falla_escritura(self):
+    def test_editar_conserva_contenido_si_falla_escritura(self):
         self.gestor.guardar(Nota("fallar", "texto original"))
-        ruta = os.path.join(self.temp_dir.name, "fallar.txt")
-        respaldo = os.path.join(self.temp_dir.name, "fallar_bak.txt")
-        real_open = open
-
-        def fake_open(path, mode="r", *args, **kwargs):
-            if path == ruta and "w" in mode:
-                raise OSError("fallo simulado")
-            return real_open(path, mode, *args, **kwargs)
 
-        with patch("builtins.open", side_effect=fake_open):
+        with patch.object(
+            self.gestor.almacenamiento, "escribir", side_effect=OSError("fallo simulado")
+        ):
             exito, mensaje = self.gestor.editar("fallar", "contenido nuevo")
 
         self.assertFalse(exito)
         self.assertIn("No fue posible editar la nota", mensaje)
+        self.assertIn("texto original", self.gestor.leer("fallar"))
+        self.assertIn("texto original", self.gestor.leer_version("fallar", 1)[1])
+
+
+class GestorNotasSQLiteTestCase(GestorNotasTestCase):
+    """Ejecuta la misma batería contra el backend SQLite."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, almacenamiento="sqlite")
+
+    def test_almacena_en_un_unico_archivo(self):
+        self.gestor.guardar(Nota("unica", "contenido"))
+
+        self.assertIsInstance(self.gestor.almacenamiento, AlmacenamientoSQLite)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "unica.txt")))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "notas.db")))
+
+    def test_buscar_subcadena_corta_y_acentos(self):
+        self.gestor.guardar(Nota("acentos", "Canción ÁRBOL"))
+
+        self.assertEqual(self.gestor.buscar("ó"), ["acentos"])
+        self.assertEqual(self.gestor.buscar("árbol"), ["acentos"])
+
+
+class GestorNotasFragmentadoTestCase(GestorNotasTestCase):
+    """Ejecuta la misma batería con la distribución en subcarpetas por hash."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, almacenamiento="fragmentado")
+
+    def test_notas_en_subcarpetas(self):
+        self.gestor.guardar(Nota("repartida", "contenido"))
+        self.gestor.editar("repartida", "contenido nuevo")
+
+        almacenamiento = self.gestor.almacenamiento
+        self.assertIsInstance(almacenamiento, AlmacenamientoFragmentado)
+        ruta = almacenamiento.ruta("repartida")
+        self.assertEqual(os.path.relpath(ruta, self.temp_dir.name).count(os.sep), 2)
+        self.assertTrue(os.path.exists(ruta))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "repartida.txt")))
+
+    def test_detecta_la_distribucion_al_reabrir(self):
+        self.gestor.guardar(Nota("persistente", "contenido"))
+        self.gestor.cerrar()
 
-        with open(ruta, "r", encoding="utf-8") as archivo:
-            contenido = archivo.read()
+        reabierto = GestorNotas(carpeta=self.temp_dir.name)
 
-        self.assertIn("texto original", contenido)
-        self.assertTrue(os.path.exists(respaldo))
+        self.assertIsInstance(reabierto.almacenamiento, AlmacenamientoFragmentado)
+        self.assertEqual(reabierto.listar(), (True, ["persistente"]))
+        reabierto.cerrar()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models.nota import Nota
+from services.almacenamiento_texto import AlmacenamientoTexto
+from services.gestor_notas import GestorNotas
+
+
+class GuardarLoteTestCase(unittest.TestCase):
+    """Pruebas del guardado y la restauración en bloque."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_guardar_lote_desde_generador(self):
+        notas = (Nota(f"nota{indice}", f"contenido {indice}") for indice in range(50))
+
+        resumen = self.gestor.guardar_lote(notas, hilos=3, tamano_lote=7)
+
+        self.assertEqual(resumen["guardadas"], 50)
+        self.assertEqual(resumen["fallidas"], 0)
+        self.assertEqual([r[0] for r in resumen["resultados"]], [f"nota{i}" for i in range(50)])
+        self.assertGreaterEqual(resumen["segundos"], 0)
+        self.assertEqual(self.gestor.contar(), 50)
+        self.assertEqual(self.gestor.buscar("contenido 42"), ["nota42"])
+        self.assertFalse([a for a in os.listdir(self.temp_dir.name) if a.endswith(".tmp")])
+
+    def test_guardar_lote_informa_notas_fallidas(self):
+        original = AlmacenamientoTexto._escribir_atomico
+
+        def escribir_atomico(almacenamiento, nombre, texto):
+            if nombre == "mala":
+                raise OSError("fallo simulado")
+            return original(almacenamiento, nombre, texto)
+
+        with patch.object(AlmacenamientoTexto, "_escribir_atomico", escribir_atomico):
+            resumen = self.gestor.guardar_lote(
+                [Nota("buena", "texto"), Nota("mala", "texto"), Nota("otra", "texto")]
+            )
+
+        self.assertEqual(resumen["guardadas"], 2)
+        self.assertEqual(resumen["fallidas"], 1)
+        fallida = [r for r in resumen["resultados"] if not r[1]]
+        self.assertEqual(fallida[0][0], "mala")
+        self.assertEqual(self.gestor.leer("mala"), "Nota no encontrada.")
+
+    def test_restaurar_desde_pickle_preserva_fecha(self):
+        nota = Nota("historica", "contenido antiguo")
+        nota.fecha = "2020-05-05 10:00:00"
+        self.gestor.guardar(nota)
+        self.gestor.exportar_pickle()
+        self.gestor.eliminar("historica")
+
+        resumen = self.gestor.restaurar_desde_pickle()
+
+        self.assertEqual(resumen["guardadas"], 1)
+        self.assertTrue(self.gestor.leer("historica").startswith("Fecha: 2020-05-05 10:00:00"))
+
+    def test_guardar_lote_en_sqlite(self):
+        gestor = GestorNotas(carpeta=os.path.join(self.temp_dir.name, "db"), almacenamiento="sqlite")
+        resumen = gestor.guardar_lote(Nota(f"n{indice}", "texto") for indice in range(20))
+
+        self.assertEqual(resumen["guardadas"], 20)
+        self.assertEqual(gestor.contar(), 20)
+        gestor.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from services.historial import HistorialNotas, aplicar_delta, calcular_delta
+
+
+def _texto(numero, lineas=200):
+    """Nota de muchas líneas en la que solo cambia la línea `numero`."""
+    return "".join(
+        f"línea {indice} editada {numero}\n" if indice == numero else f"línea {indice} sin cambios\n"
+        for indice in range(lineas)
+    )
+
+
+class HistorialNotasTestCase(unittest.TestCase):
+    """Pruebas del historial de versiones con deltas y puntos completos."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.historial = HistorialNotas(self.temp_dir.name, intervalo_completa=5, max_versiones=8)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_delta_reconstruye_el_texto(self):
+        base = "uno\ndos\ntres\n"
+        nuevo = "cero\nuno\ntres\ncuatro"
+
+        self.assertEqual(aplicar_delta(base, calcular_delta(base, nuevo)), nuevo)
+
+    def test_reconstruye_cada_version_y_guarda_deltas_compactos(self):
+        for numero in range(4):
+            self.historial.registrar("nota", _texto(numero))
+
+        for numero in range(4):
+            self.assertEqual(self.historial.leer("nota", numero + 1), _texto(numero))
+        self.assertIsNone(self.historial.leer("nota", 9))
+        tamano = os.path.getsize(self.historial._ruta("nota"))
+        self.assertLess(tamano, 2 * len(_texto(0).encode("utf-8")))
+
+    def test_notas_de_una_linea_guardan_deltas_por_palabras(self):
+        # Como las notas creadas desde el menú: un único párrafo largo.
+        historial = HistorialNotas(self.temp_dir.name)
+        palabras = [f"palabra{indice % 97}" for indice in range(450)]
+        versiones = []
+        for numero in range(6):
+            palabras[numero * 70] = f"editada{numero}"
+            versiones.append("Fecha: 2024-01-01 10:00:00\n\n" + " ".join(palabras))
+            historial.registrar("linea", versiones[-1])
+
+        for numero, texto in enumerate(versiones, start=1):
+            self.assertEqual(historial.leer("linea", numero), texto)
+        tamano = os.path.getsize(historial._ruta("linea"))
+        self.assertLess(tamano, 1.5 * len(versiones[0].encode("utf-8")))
+
+        base = "uno dos  tres\tcuatro"
+        nuevo = " cero uno tres\tcuatro cinco"
+        self.assertEqual(aplicar_delta(base, calcular_delta(base, nuevo, "palabras"), "palabras"), nuevo)
+
+    def test_retencion_descarta_las_versiones_mas_antiguas(self):
+        for numero in range(12):
+            self.historial.registrar("nota", _texto(numero), marca=numero)
+
+        self.assertTrue(self.historial.compactar("nota"))
+
+        versiones = self.historial.versiones("nota")
+        self.assertEqual([version["version"] for version in versiones], list(range(5, 13)))
+        self.assertEqual(self.historial.leer("nota", 5), _texto(4))
+        self.assertEqual(self.historial.leer("nota", 12), _texto(11))
+
+    def test_ignora_ultima_linea_truncada(self):
+        self.historial.registrar("nota", "primera")
+        with open(self.historial._ruta("nota"), "a", encoding="utf-8") as archivo:
+            archivo.write('{"v": 2, "marca"')
+
+        self.assertEqual([version["version"] for version in self.historial.versiones("nota")], [1])
+        self.assertEqual(self.historial.leer("nota", 1), "primera")
+        self.assertEqual(self.historial.registrar("nota", "segunda"), 2)
+        self.assertEqual(self.historial.leer("nota", 2), "segunda")
+
+
+if __name__ == "__main__":
+    unittest.main()
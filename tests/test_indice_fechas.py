@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+from services.indice_fechas import IndiceFechas, limite_de_fecha
+
+
+def marca(texto):
+    return limite_de_fecha(texto)
+
+
+class IndiceFechasTestCase(unittest.TestCase):
+    """Pruebas del índice ordenado por fecha."""
+
+    def test_rangos_limites_y_orden(self):
+        indice = IndiceFechas([(30, "c"), (10, "a"), (20, "b2"), (20, "b1")])
+        indice.actualizar("d", 40)
+        indice.actualizar("a", 50)
+        indice.eliminar("b2")
+
+        self.assertEqual(indice.rango(), ["b1", "c", "d", "a"])
+        self.assertEqual(indice.rango(20, 40), ["b1", "c", "d"])
+        self.assertEqual(indice.rango(limite=2, orden="desc"), ["a", "d"])
+        self.assertEqual(indice.rango(desde=25, limite=1), ["c"])
+        self.assertEqual(list(indice.marcas), [20, 30, 40, 50])
+
+    def test_limites_de_fecha(self):
+        dia = datetime(2024, 3, 5)
+        self.assertEqual(limite_de_fecha("2024-03-05"), int(dia.timestamp()))
+        self.assertEqual(limite_de_fecha("2024-03-05", final=True), marca("2024-03-05 23:59:59"))
+        self.assertEqual(limite_de_fecha(dia), int(dia.timestamp()))
+        with self.assertRaises(ValueError):
+            limite_de_fecha("ayer")
+
+
+class ListarPorFechaTestCase(unittest.TestCase):
+    """Pruebas de `listar` y las exportaciones filtradas por fecha."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        self.gestor.guardar_lote(
+            Nota(f"dia{dia:02d}", f"nota del día {dia}", marca=marca(f"2024-01-{dia:02d} 12:00:00"))
+            for dia in range(1, 11)
+        )
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_listar_por_rango_y_recientes(self):
+        self.assertEqual(
+            self.gestor.listar(desde="2024-01-03", hasta="2024-01-05"),
+            (True, ["dia03", "dia04", "dia05"]),
+        )
+        self.assertEqual(self.gestor.listar(limite=2, orden="desc"), (True, ["dia10", "dia09"]))
+        self.assertFalse(self.gestor.listar(desde="mañana")[0])
+
+        self.gestor.eliminar("dia10")
+        self.gestor.guardar(Nota("nueva", "creada ahora mismo"))
+        self.gestor.editar("dia01", "contenido cambiado")
+        self.assertEqual(self.gestor.listar(limite=2, orden="desc"), (True, ["nueva", "dia09"]))
+        self.assertEqual(self.gestor.listar(hasta="2024-01-01")[1], ["dia01"])
+
+    def test_indice_se_reconstruye_al_reabrir(self):
+        self.gestor.cerrar()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+
+        self.assertEqual(self.gestor.listar(desde="2024-01-09")[1], ["dia09", "dia10"])
+
+    def test_exportaciones_filtradas(self):
+        self.assertTrue(self.gestor.exportar_json(desde="2024-01-08"))
+        with open(os.path.join(self.temp_dir.name, "exports", "notas.json"), encoding="utf-8") as archivo:
+            self.assertEqual([nota["nombre"] for nota in json.load(archivo)], ["dia08", "dia09", "dia10"])
+
+        self.assertTrue(self.gestor.exportar_pickle(hasta="2024-01-02"))
+        self.assertEqual(sorted(self.gestor.cargar_desde_pickle()), ["dia01", "dia02"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+from services.indice_invertido import IndiceInvertido
+
+
+class IndiceInvertidoTestCase(unittest.TestCase):
+    """Pruebas del índice invertido persistente usado por `buscar`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_guardar_indexa_con_posiciones(self):
+        self.gestor.guardar(Nota("primera", "hola mundo hola"))
+
+        posiciones = self.gestor.indice.terminos["hola"]["primera"]
+        self.assertEqual(len(posiciones), 2)
+        self.assertLess(posiciones[0], posiciones[1])
+
+    def test_buscar_subcadena_y_frase(self):
+        self.gestor.guardar(Nota("primera", "un contenido especial"))
+        self.gestor.guardar(Nota("segunda", "otro contenido"))
+
+        self.assertEqual(self.gestor.buscar("ESPEC"), ["primera"])
+        self.assertEqual(self.gestor.buscar("contenido esp"), ["primera"])
+        self.assertEqual(self.gestor.buscar("tenido"), ["primera", "segunda"])
+
+    def test_editar_y_eliminar_actualizan_indice(self):
+        self.gestor.guardar(Nota("nota", "texto viejo"))
+        self.gestor.editar("nota", "texto nuevo")
+        self.assertEqual(self.gestor.buscar("viejo"), [])
+        self.assertEqual(self.gestor.buscar("nuevo"), ["nota"])
+
+        self.gestor.eliminar("nota")
+        self.assertEqual(self.gestor.buscar("nuevo"), [])
+        self.assertNotIn("nota", self.gestor.indice.documentos)
+
+    def test_indice_persiste_entre_instancias(self):
+        self.gestor.guardar(Nota("persistente", "palabra rara"))
+
+        indice = IndiceInvertido(os.path.join(self.temp_dir.name, ".indice"))
+        self.assertIn("persistente", indice.terminos["rara"])
+
+    def test_detecta_modificaciones_externas(self):
+        self.gestor.guardar(Nota("externa", "texto inicial"))
+        ruta = os.path.join(self.temp_dir.name, "externa.txt")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("Fecha: 2024-01-01 00:00:00\n\ntexto inicial cambiado")
+
+        nuevo = GestorNotas(carpeta=self.temp_dir.name)
+        self.assertEqual(nuevo.buscar("cambiado"), ["externa"])
+        nuevo.cerrar()
+
+    def test_reindexar_reconstruye_desde_disco(self):
+        self.gestor.guardar(Nota("uno", "alfa"))
+        self.gestor.indice.limpiar()
+
+        self.assertTrue(self.gestor.reindexar())
+        self.assertEqual(self.gestor.buscar("alfa"), ["uno"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+from services.instrumentacion import Instrumentacion
+
+
+class InstrumentacionTestCase(unittest.TestCase):
+    """Pruebas del registro opcional de tiempos y E/S de `GestorNotas`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.instrumentacion = Instrumentacion()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, instrumentacion=self.instrumentacion)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def test_registra_llamadas_bytes_y_fallos(self):
+        self.gestor.guardar(Nota("medida", "contenido medido"))
+        texto = self.gestor.leer("medida")
+        self.gestor.eliminar("inexistente")
+
+        estadisticas = self.instrumentacion.estadisticas()
+        self.assertEqual(estadisticas["guardar"]["llamadas"], 1)
+        self.assertEqual(estadisticas["guardar"]["bytes_escritos"], len(texto.encode("utf-8")))
+        self.assertEqual(estadisticas["leer"]["bytes_leidos"], len(texto.encode("utf-8")))
+        self.assertEqual(estadisticas["leer"]["aperturas"], 1)
+        self.assertEqual(estadisticas["eliminar"]["fallidas"], 1)
+
+    def test_atribuye_lecturas_en_paralelo_y_avisa_a_los_ganchos(self):
+        for numero in range(5):
+            self.gestor.guardar(Nota(f"nota{numero}", "contenido"))
+        eventos = []
+        self.instrumentacion.agregar_gancho(eventos.append)
+
+        self.assertTrue(self.gestor.exportar_json(hilos=3))
+
+        self.assertEqual([evento.metodo for evento in eventos], ["exportar_json"])
+        self.assertEqual(eventos[0].aperturas, 5)
+        self.assertTrue(eventos[0].exito)
+
+    def test_perfil_captura_las_llamadas(self):
+        self.instrumentacion.perfilar(True)
+        self.gestor.guardar(Nota("perfilada", "contenido"))
+
+        self.assertIn("guardar", self.instrumentacion.informe_perfil())
+
+
+if __name__ == "__main__":
+    unittest.main()
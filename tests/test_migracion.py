@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.almacenamiento_sqlite import AlmacenamientoSQLite
+from services.almacenamiento_texto import AlmacenamientoTexto
+from services.gestor_notas import GestorNotas
+from services.almacenamiento_fragmentado import AlmacenamientoFragmentado
+from services.migracion import fragmentar, main, migrar
+
+
+class MigracionTestCase(unittest.TestCase):
+    """Pruebas de la migración entre backends de almacenamiento."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_migrar_texto_a_sqlite_conserva_contenido(self):
+        gestor = GestorNotas(carpeta=self.temp_dir.name)
+        gestor.guardar(Nota("uno", "contenido uno"))
+        gestor.guardar(Nota("dos", "contenido dos"))
+        original = gestor.leer("uno")
+        gestor.cerrar()
+
+        origen = AlmacenamientoTexto(self.temp_dir.name)
+        destino = AlmacenamientoSQLite(self.temp_dir.name)
+        migradas = migrar(origen, destino, tamano_lote=1)
+
+        self.assertEqual(migradas, 2)
+        self.assertEqual(destino.leer("uno"), original)
+        origen.cerrar()
+        destino.cerrar()
+
+        gestor_sqlite = GestorNotas(carpeta=self.temp_dir.name, almacenamiento="sqlite")
+        self.assertEqual(gestor_sqlite.contar(), 2)
+        self.assertEqual(gestor_sqlite.buscar("dos"), ["dos"])
+        gestor_sqlite.cerrar()
+
+    def test_comando_migra_sqlite_a_texto(self):
+        gestor = GestorNotas(carpeta=self.temp_dir.name, almacenamiento="sqlite")
+        gestor.guardar(Nota("nota", "desde sqlite"))
+        gestor.cerrar()
+
+        codigo = main(["--carpeta", self.temp_dir.name, "--desde", "sqlite", "--hacia", "texto"])
+
+        self.assertEqual(codigo, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "nota.txt")))
+
+    def test_fragmentar_mueve_notas_sin_reindexar(self):
+        gestor = GestorNotas(carpeta=self.temp_dir.name)
+        gestor.guardar(Nota("uno", "contenido uno"))
+        gestor.guardar(Nota("dos", "contenido dos"))
+        gestor.editar("dos", "contenido editado")
+        gestor.cerrar()
+
+        movidas = fragmentar(self.temp_dir.name)
+
+        self.assertEqual(movidas, 2)
+        self.assertFalse([archivo for archivo in os.listdir(self.temp_dir.name) if archivo.endswith(".txt")])
+        reabierto = GestorNotas(carpeta=self.temp_dir.name)
+        self.assertIsInstance(reabierto.almacenamiento, AlmacenamientoFragmentado)
+        self.assertEqual(reabierto.contar(), 2)
+        self.assertIn("contenido editado", reabierto.leer("dos"))
+        self.assertIn("contenido dos", reabierto.leer_version("dos", 1)[1])
+        self.assertEqual(reabierto.buscar("uno"), ["uno"])
+        reabierto.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
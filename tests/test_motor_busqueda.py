@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+
+
+class MotorBusquedaTestCase(unittest.TestCase):
+    """Pruebas de las consultas con ranking expuestas por `GestorNotas.consultar`."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name)
+        self.gestor.guardar(Nota("python", "python es un lenguaje y python es flexible"))
+        self.gestor.guardar(Nota("rust", "rust es un lenguaje de sistemas"))
+        self.gestor.guardar(Nota("cocina", "receta de tortilla con patatas"))
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def nombres(self, consulta, **kwargs):
+        exito, resultado = self.gestor.consultar(consulta, **kwargs)
+        self.assertTrue(exito, resultado)
+        return [r["nombre"] for r in resultado["resultados"]]
+
+    def test_operadores_booleanos(self):
+        self.assertEqual(self.nombres("lenguaje AND rust"), ["rust"])
+        self.assertCountEqual(self.nombres("tortilla OR sistemas"), ["cocina", "rust"])
+        self.assertEqual(self.nombres("lenguaje NOT python"), ["rust"])
+        self.assertEqual(self.nombres("(python OR rust) NOT sistemas"), ["python"])
+
+    def test_frase_y_prefijo(self):
+        self.assertEqual(self.nombres('"un lenguaje de"'), ["rust"])
+        self.assertEqual(self.nombres('"lenguaje un"'), [])
+        self.assertEqual(self.nombres("pata*"), ["cocina"])
+
+    def test_ranking_bm25_prioriza_frecuencia(self):
+        self.assertEqual(self.nombres("python OR rust"), ["python", "rust"])
+
+    def test_paginacion_y_fragmentos(self):
+        exito, resultado = self.gestor.consultar("es", limite=1, desplazamiento=1)
+
+        self.assertTrue(exito)
+        self.assertEqual(resultado["total"], 2)
+        self.assertEqual(len(resultado["resultados"]), 1)
+        primera = self.nombres("es", limite=1)
+        self.assertNotEqual(primera[0], resultado["resultados"][0]["nombre"])
+        self.assertIn("es", resultado["resultados"][0]["fragmento"])
+
+    def test_paginacion_negativa(self):
+        self.assertFalse(self.gestor.consultar("es", limite=-1)[0])
+        exito, mensaje = self.gestor.consultar("es", desplazamiento=-2)
+
+        self.assertFalse(exito)
+        self.assertIn("negativos", mensaje)
+
+    def test_consulta_invalida(self):
+        exito, mensaje = self.gestor.consultar("(python")
+
+        self.assertFalse(exito)
+        self.assertIn("Consulta no válida", mensaje)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+
+
+class NotaTestCase(unittest.TestCase):
+    """Pruebas del modelo compacto `Nota` y de la carga diferida de cuerpos."""
+
+    def test_usa_slots_y_marca_entera(self):
+        nota = Nota(" nombre ", " cuerpo ")
+
+        self.assertFalse(hasattr(nota, "__dict__"))
+        self.assertIsInstance(nota.marca, int)
+        self.assertEqual(nota.nombre, "nombre")
+        self.assertEqual(str(nota), f"Fecha: {nota.fecha}\n\ncuerpo")
+
+    def test_fecha_se_convierte_a_marca_y_vuelve(self):
+        nota = Nota("nota", "texto")
+        nota.fecha = "2021-03-04 05:06:07"
+
+        self.assertEqual(nota.fecha, "2021-03-04 05:06:07")
+        otra = Nota("otra", "texto", marca=nota.marca)
+        self.assertEqual(otra.fecha, "2021-03-04 05:06:07")
+
+    def test_fecha_no_estandar_se_conserva(self):
+        nota = Nota("nota", "texto")
+        nota.fecha = "ayer por la tarde"
+
+        self.assertEqual(nota.fecha, "ayer por la tarde")
+
+    def test_contenido_diferido(self):
+        llamadas = []
+
+        def cargador(nombre):
+            llamadas.append(nombre)
+            return "cuerpo diferido"
+
+        nota = Nota.desde_encabezado("perezosa", "2022-01-01 00:00:00", cargador)
+        self.assertFalse(nota.cargada)
+        self.assertEqual(nota.contenido, "cuerpo diferido")
+        self.assertEqual(nota.contenido, "cuerpo diferido")
+        self.assertEqual(llamadas, ["perezosa"])
+
+    def test_iterar_encabezados_no_lee_cuerpos(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            gestor = GestorNotas(carpeta=carpeta)
+            gestor.guardar(Nota("uno", "primer cuerpo"))
+            gestor.guardar(Nota("dos", "segundo cuerpo"))
+
+            with patch.object(gestor.almacenamiento, "leer", side_effect=AssertionError):
+                notas = sorted(gestor.iterar_encabezados(), key=lambda nota: nota.nombre)
+            self.assertEqual([nota.nombre for nota in notas], ["dos", "uno"])
+            self.assertFalse(any(nota.cargada for nota in notas))
+            self.assertEqual(notas[1].contenido, "primer cuerpo")
+            gestor.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
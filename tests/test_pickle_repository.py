@@ -0,0 +1,119 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from services.pickle_repository import PickleRepository
+
+
+class PickleRepositoryTestCase(unittest.TestCase):
+    """Pruebas del formato pickle segmentado y sus exportaciones incrementales."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.temp_dir.name, "exports", "notas.pkl")
+        self.repositorio = PickleRepository(self.ruta, notas_por_segmento=4)
+        self.notas = {
+            f"nota{indice}": {"fecha": "2024-01-01 00:00:00", "contenido": f"texto {indice}"}
+            for indice in range(20)
+        }
+        self.mtimes = {nombre: 1 for nombre in self.notas}
+        self.leidas = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def cargar_nota(self, nombre):
+        self.leidas.append(nombre)
+        return self.notas.get(nombre)
+
+    def test_guardar_y_obtener_una_nota(self):
+        self.assertTrue(self.repositorio.guardar(self.notas, self.mtimes))
+
+        self.assertEqual(self.repositorio.obtener("nota7"), self.notas["nota7"])
+        self.assertIsNone(self.repositorio.obtener("inexistente"))
+        self.assertEqual(self.repositorio.cargar(), self.notas)
+
+    def test_actualizar_solo_relee_notas_modificadas(self):
+        self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+        self.leidas.clear()
+
+        self.notas["nota3"] = {"fecha": "2024-02-02 00:00:00", "contenido": "cambiado"}
+        self.mtimes["nota3"] = 2
+        self.notas["nueva"] = {"fecha": "2024-03-03 00:00:00", "contenido": "nueva"}
+        self.mtimes["nueva"] = 1
+        del self.mtimes["nota5"]
+
+        self.assertTrue(self.repositorio.actualizar(self.mtimes, self.cargar_nota))
+
+        self.assertCountEqual(self.leidas, ["nota3", "nueva"])
+        datos = PickleRepository(self.ruta).cargar()
+        self.assertEqual(datos["nota3"]["contenido"], "cambiado")
+        self.assertIn("nueva", datos)
+        self.assertNotIn("nota5", datos)
+        self.assertEqual(len(datos), 20)
+
+    def test_actualizacion_fallida_no_deja_el_indice_en_cache_a_medias(self):
+        self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+        anterior = dict(self.notas["nota3"])
+        self.mtimes["nota3"] = 2
+
+        def fallar(nombre):
+            raise OSError(nombre)
+
+        self.assertFalse(self.repositorio.actualizar(self.mtimes, fallar))
+
+        self.assertEqual(self.repositorio.obtener("nota3"), anterior)
+        self.assertEqual(dict(self.repositorio.iterar())["nota3"], anterior)
+
+    def test_actualizar_sin_cambios_no_escribe(self):
+        self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+        tamano = os.path.getsize(self.ruta)
+
+        self.assertTrue(self.repositorio.actualizar(self.mtimes, self.cargar_nota))
+        self.assertEqual(os.path.getsize(self.ruta), tamano)
+
+    def test_compacta_cuando_crece_el_espacio_muerto(self):
+        self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+        tamano_inicial = os.path.getsize(self.ruta)
+
+        for version in range(2, 12):
+            self.mtimes = {nombre: version for nombre in self.notas}
+            self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+
+        self.assertLess(os.path.getsize(self.ruta), tamano_inicial * 2)
+        self.assertEqual(self.repositorio.cargar(), self.notas)
+
+    def test_actualizacion_interrumpida_conserva_la_exportacion_anterior(self):
+        self.repositorio.actualizar(self.mtimes, self.cargar_nota)
+        tamano = os.path.getsize(self.ruta)
+        anteriores = {nombre: dict(campos) for nombre, campos in self.notas.items()}
+
+        self.notas["nota3"] = {"fecha": "2024-02-02 00:00:00", "contenido": "cambiado"}
+        self.mtimes["nota3"] = 2
+        self.assertTrue(self.repositorio.actualizar(self.mtimes, self.cargar_nota))
+        # Un corte a mitad de la actualización deja solo parte de lo añadido.
+        with open(self.ruta, "r+b") as archivo:
+            archivo.truncate(tamano + 40)
+
+        repositorio = PickleRepository(self.ruta, notas_por_segmento=4)
+        self.assertEqual(repositorio.cargar(), anteriores)
+        self.assertEqual(repositorio.obtener("nota3"), anteriores["nota3"])
+
+        self.assertTrue(repositorio.actualizar(self.mtimes, self.cargar_nota))
+        self.assertEqual(PickleRepository(self.ruta).cargar(), self.notas)
+
+    def test_lee_formato_antiguo(self):
+        os.makedirs(os.path.dirname(self.ruta))
+        with open(self.ruta, "wb") as archivo:
+            pickle.dump(self.notas, archivo)
+
+        self.assertEqual(self.repositorio.cargar(), self.notas)
+        self.assertEqual(self.repositorio.obtener("nota1"), self.notas["nota1"])
+
+        self.assertTrue(self.repositorio.actualizar(self.mtimes, self.cargar_nota))
+        self.assertEqual(dict(self.repositorio.iterar()), self.notas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.rendimiento import comparar, ejecutar_banco, percentil
+
+
+class BancoRendimientoTestCase(unittest.TestCase):
+    """Prueba de humo del banco de rendimiento con un corpus mínimo."""
+
+    def test_percentil_por_rango_mas_cercano(self):
+        muestras = list(range(1, 101))
+        self.assertEqual(percentil(muestras, 50), 50)
+        self.assertEqual(percentil(muestras, 99), 99)
+        self.assertEqual(percentil([], 50), 0.0)
+
+    def test_informe_cubre_operaciones_en_frio_y_en_caliente(self):
+        informe = ejecutar_banco(
+            30,
+            tamano_cuerpo=64,
+            repeticiones=2,
+            operaciones=("inicializar", "leer", "buscar", "exportar_pickle"),
+        )
+
+        self.assertEqual(informe["metadatos"]["notas"], 30)
+        resultados = informe["resultados"]
+        self.assertIsNone(resultados["inicializar"]["caliente"])
+        for operacion in ("leer", "buscar", "exportar_pickle"):
+            self.assertIn("p99_ms", resultados[operacion]["frio"])
+            self.assertEqual(resultados[operacion]["caliente"]["muestras"], 2)
+            # `ru_maxrss` es un máximo acumulado: solo tiene sentido para todo el proceso.
+            self.assertNotIn("pico_rss_kb", resultados[operacion])
+        self.assertIn("pico_rss_kb", informe)
+        self.assertEqual(set(comparar(informe, informe).values()), {1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
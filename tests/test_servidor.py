@@ -0,0 +1,127 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from services.cliente import ClienteNotas
+from services.jsonrpc import METODO_INEXISTENTE, PARAMETROS_INVALIDOS, ErrorRemoto
+from services.servidor import ServidorNotas
+
+
+class ServidorNotasTestCase(unittest.TestCase):
+    """Pruebas del servidor JSON-RPC y su cliente, con el servidor en un hilo propio."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ruta_socket = os.path.join(self.temp_dir.name, "servidor.sock")
+        self.bucle = asyncio.new_event_loop()
+        self.servidor = ServidorNotas(carpeta=os.path.join(self.temp_dir.name, "notas"))
+        self.bucle.run_until_complete(self.servidor.iniciar(self.ruta_socket, puerto_http=0))
+        self.hilo = threading.Thread(target=self.bucle.run_forever, daemon=True)
+        self.hilo.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.servidor.cerrar(), self.bucle).result(10)
+        self.bucle.call_soon_threadsafe(self.bucle.stop)
+        self.hilo.join(10)
+        self.bucle.close()
+        self.temp_dir.cleanup()
+
+    def test_ordenes_por_socket(self):
+        with ClienteNotas(self.ruta_socket) as cliente:
+            self.assertTrue(cliente.crear("receta", "harina, huevos y leche")[0])
+            exito, texto = cliente.leer(nombre="receta")
+            self.assertTrue(exito)
+            self.assertTrue(texto.endswith("harina, huevos y leche"))
+            self.assertEqual(cliente.buscar("huevos"), (True, ["receta"]))
+            exito, mensaje = cliente.leer("no_existe")
+            self.assertFalse(exito)
+            self.assertIsInstance(mensaje, str)
+
+            with self.assertRaises(ErrorRemoto) as contexto:
+                cliente.borrar_todo()
+            self.assertEqual(contexto.exception.codigo, METODO_INEXISTENTE)
+            with self.assertRaises(ErrorRemoto) as contexto:
+                cliente.leer(titulo="receta")
+            self.assertEqual(contexto.exception.codigo, PARAMETROS_INVALIDOS)
+
+            exito, estadisticas = cliente.stats()
+            self.assertTrue(exito)
+            self.assertEqual(estadisticas["notas"], 1)
+            self.assertEqual(estadisticas["metodos"]["leer"]["llamadas"], 3)
+            self.assertEqual(estadisticas["metodos"]["leer"]["errores"], 2)
+
+    def test_canalizar_y_lotes(self):
+        with ClienteNotas(self.ruta_socket) as cliente:
+            creadas = cliente.canalizar(
+                [("crear", {"nombre": f"nota{numero}", "contenido": f"contenido {numero}"}) for numero in range(20)],
+                ventana=8,
+            )
+            self.assertTrue(all(exito for exito, _ in creadas))
+            # En orden dentro de la conexión: el último `contar` ve todas las notas.
+            self.assertEqual(cliente.canalizar([("eliminar", {"nombre": "nota0"}), ("contar", {})])[-1], (True, 19))
+
+            resultados = cliente.lote([("leer", {"nombre": "nota3"}), ("leer", {"nombre": "nota0"}), ("contar", None)])
+            self.assertTrue(resultados[0][1].endswith("contenido 3"))
+            self.assertFalse(resultados[1][0])
+            self.assertEqual(resultados[2], (True, 19))
+
+    def test_http(self):
+        url = f"http://127.0.0.1:{self.servidor.puerto_http}/"
+        with ClienteNotas(url=url) as cliente:
+            self.assertTrue(cliente.crear("web", "creada por HTTP")[0])
+            [(exito, texto)] = cliente.lote([("leer", {"nombre": "web"})])
+            self.assertTrue(exito)
+            self.assertTrue(texto.endswith("creada por HTTP"))
+            self.assertEqual(cliente.canalizar([("contar", {})]), [(True, 1)])
+
+        conexion = http.client.HTTPConnection("127.0.0.1", self.servidor.puerto_http, timeout=10)
+        peticion = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "contar"})
+        conexion.request("POST", "/", peticion, {"Content-Type": "text/plain"})
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        self.assertEqual(respuesta.status, 415)
+        conexion.request("POST", "/", peticion, {"Content-Type": "application/json", "Host": "ataque.example"})
+        self.assertEqual(conexion.getresponse().status, 403)
+        conexion.close()
+
+        conexion = http.client.HTTPConnection("127.0.0.1", self.servidor.puerto_http, timeout=10)
+        conexion.request("GET", "/stats")
+        respuesta = conexion.getresponse()
+        self.assertEqual(respuesta.status, 200)
+        self.assertEqual(json.loads(respuesta.read())["notas"], 1)
+        conexion.close()
+
+    def test_clientes_concurrentes(self):
+        errores = []
+
+        def trabajar(cliente_id):
+            try:
+                with ClienteNotas(self.ruta_socket) as cliente:
+                    for numero in range(10):
+                        nombre = f"c{cliente_id}_{numero}"
+                        if not cliente.crear(nombre, f"nota de {cliente_id}")[0]:
+                            errores.append(nombre)
+                        exito, texto = cliente.leer(nombre)
+                        if not exito or not texto.endswith(f"nota de {cliente_id}"):
+                            errores.append(nombre)
+            except Exception as error:
+                errores.append(error)
+
+        hilos = [threading.Thread(target=trabajar, args=(cliente_id,)) for cliente_id in range(6)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(30)
+
+        self.assertEqual(errores, [])
+        with ClienteNotas(self.ruta_socket) as cliente:
+            self.assertEqual(cliente.contar(), (True, 60))
+            self.assertGreaterEqual(cliente.stats()[1]["conexiones_totales"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+
+from models.nota import Nota
+from services.gestor_notas import GestorNotas
+from services.vigilante import inotify_disponible
+
+
+def esperar(condicion, tiempo_limite=5.0):
+    """Espera a que `condicion()` sea verdadera; devuelve su último valor."""
+    limite = time.monotonic() + tiempo_limite
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.02)
+    return condicion()
+
+
+class VigilanteSondeoTestCase(unittest.TestCase):
+    """Pruebas de la actualización incremental ante cambios externos."""
+
+    modo = "sondeo"
+    almacenamiento = "texto"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.gestor = GestorNotas(carpeta=self.temp_dir.name, almacenamiento=self.almacenamiento)
+        self.gestor.guardar(Nota("previa", "contenido previo"))
+        self.vigilante = self.gestor.vigilar(modo=self.modo, intervalo=0.05)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+        self.temp_dir.cleanup()
+
+    def _escribir_externo(self, nombre, cuerpo):
+        ruta = self.gestor.almacenamiento.ruta(nombre)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(f"Fecha: 2024-01-01 00:00:00\n\n{cuerpo}")
+
+    def test_altas_modificaciones_y_bajas_externas_actualizan_el_indice(self):
+        self.assertEqual(self.vigilante.modo, self.modo)
+        self._escribir_externo("externa", "palabra insolita")
+        self.assertTrue(esperar(lambda: "externa" in self.gestor.indice.documentos))
+        self.assertEqual(self.gestor.catalogo.entradas["externa"]["fecha"], "2024-01-01 00:00:00")
+
+        self._escribir_externo("previa", "contenido reescrito y mas largo")
+        self.assertTrue(esperar(lambda: self.gestor.indice.candidatos("reescrito")[0] == {"previa"}))
+
+        os.remove(self.gestor.almacenamiento.ruta("externa"))
+        self.assertTrue(esperar(lambda: "externa" not in self.gestor.catalogo.entradas))
+        self.assertNotIn("externa", self.gestor.indice.documentos)
+        self.assertIsNone(self.vigilante.ultimo_error)
+
+
+@unittest.skipUnless(inotify_disponible(), "inotify solo está disponible en Linux")
+class VigilanteInotifyTestCase(VigilanteSondeoTestCase):
+    """Misma batería con inotify."""
+
+    modo = "inotify"
+
+
+@unittest.skipUnless(inotify_disponible(), "inotify solo está disponible en Linux")
+class VigilanteInotifyFragmentadoTestCase(VigilanteSondeoTestCase):
+    """Con inotify y subcarpetas por hash, que se vigilan a medida que aparecen."""
+
+    modo = "inotify"
+    almacenamiento = "fragmentado"
+
+
+if __name__ == "__main__":
+    unittest.main()